@@ -0,0 +1,10 @@
+# __init__.py
+# 매장/공공기관/기업 통계 기능이 함께 사용하는 분석 모듈
+from .stats_store import UtteranceStatsStore, csv_sources
+from .tokenizer import TokenizerService, get_tokenizer
+from .normalize import TokenCache, get_token_cache, normalize_utterances
+from .render import ChartRenderer, get_chart_renderer
+from .ingest import CsvUtteranceStream, iter_csv_chunks, iter_csv_rows, source_csv_files
+from .question_log import build_question_rows, extract_questions, fetch_questions, prepare_question_log_table, question_sources
+from .utterances import count_utterances
+from .service import StatisticsResult, StatisticsService, get_statistics_service
@@ -0,0 +1,82 @@
+# ingest.py
+# 대화 기록 CSV 스트리밍 수집: 필요한 열(agent_id, user_utterances)만 청크 단위로 읽음
+import glob
+import logging
+import os
+import pandas as pd
+
+logger = logging.getLogger('faq')
+
+# 한 번에 메모리에 올리는 최대 행 수. 수집 중 최대 메모리는 이 청크 크기와 서로 다른 발화 수에 비례
+CHUNK_ROWS = int(os.environ.get('UTTERANCE_CSV_CHUNK_ROWS', 5000))
+
+# 예전 통계 API가 만들어 둔 병합 결과 파일은 원본이 아니므로 수집에서 제외
+MERGED_OUTPUT_PREFIXES = ('merged_output_', 'public_merged_output_')
+
+# 2열(agent_id), 6열(user_utterances)
+USECOLS = [1, 5]
+
+
+def source_csv_files(folder_path):
+    """
+    폴더 내 원본 대화 기록 CSV 파일 경로 목록을 반환하는 함수. (병합 결과 파일 제외)
+    """
+    return [
+        file_path
+        for file_path in sorted(glob.glob(os.path.join(folder_path, '*.csv')))
+        if not os.path.basename(file_path).startswith(MERGED_OUTPUT_PREFIXES)
+    ]
+
+
+def iter_csv_chunks(file_path, chunksize=CHUNK_ROWS, raise_errors=False):
+    """
+    CSV 파일을 agent_id, user_utterances 열만 청크 단위로 읽어 반환하는 제너레이터.
+
+    :param file_path: CSV 파일 경로
+    :param chunksize: 청크당 행 수
+    :param raise_errors: True면 읽기 오류를 호출자에게 그대로 전달, False면 로그만 남기고 건너뜀
+    """
+    try:
+        reader = pd.read_csv(file_path, encoding='utf-8', usecols=USECOLS, dtype=str, chunksize=chunksize)
+        with reader:
+            for chunk in reader:
+                yield chunk
+    except pd.errors.EmptyDataError:
+        logger.warning(f"빈 파일입니다: {file_path}")
+    except Exception as e:
+        if raise_errors:
+            raise
+        if isinstance(e, FileNotFoundError):
+            logger.error(f"파일을 찾을 수 없습니다: {file_path}")
+        elif isinstance(e, ValueError):
+            logger.error(f"열 인덱스가 잘못되었습니다. 파일을 확인해주세요: {file_path}, 오류 메시지: {e}")
+        else:
+            logger.error(f"파일을 읽는 중 오류 발생: {file_path}, 오류 메시지: {e}")
+
+
+def iter_csv_rows(file_paths, chunksize=CHUNK_ROWS):
+    """
+    여러 CSV 파일의 (agent_id, user_utterances) 행을 순서대로 반환하는 제너레이터.
+    파일 전체나 병합 DataFrame을 메모리에 올리지 않는다.
+    """
+    for file_path in file_paths:
+        for chunk in iter_csv_chunks(file_path, chunksize):
+            chunk = chunk.dropna(subset=['user_utterances'])
+            yield from zip(chunk['agent_id'], chunk['user_utterances'])
+
+
+class CsvUtteranceStream:
+    """
+    CSV 파일 하나의 발화를 청크 단위로 반환하는 이터러블.
+    순회하는 동안 발견한 agent_id를 agent_ids에 모은다.
+    """
+
+    def __init__(self, file_path, chunksize=CHUNK_ROWS):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.agent_ids = set()
+
+    def __iter__(self):
+        for chunk in iter_csv_chunks(self.file_path, self.chunksize, raise_errors=True):
+            self.agent_ids.update(chunk['agent_id'].dropna().unique())
+            yield from chunk['user_utterances'].dropna()
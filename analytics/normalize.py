@@ -0,0 +1,187 @@
+# normalize.py
+# 발화 정규화 계층: 중복 발화를 제거한 뒤 배치로 토큰화하고, 정규화 결과를 영구 캐시에 보관
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from .tokenizer import get_tokenizer
+
+logger = logging.getLogger('faq')
+
+DEFAULT_CACHE_PATH = os.path.join('conversation_history', '.token_cache.sqlite3')
+DEFAULT_MAX_ENTRIES = 200_000
+
+# 토큰화 방식(어근 추출 여부 등)이 바뀌면 값을 올려 기존 캐시를 무효화
+CACHE_KEY_VERSION = 'okt-morphs-stem-v1'
+
+# SQLite 바인딩 변수 개수 제한을 넘지 않도록 나누어 조회
+SQLITE_BATCH_SIZE = 500
+
+
+def text_key(text):
+    """
+    캐시 키로 사용할 텍스트 해시를 반환하는 함수.
+    """
+    return hashlib.sha1(f"{CACHE_KEY_VERSION}\0{text}".encode('utf-8')).hexdigest()
+
+
+class TokenCache:
+    """
+    텍스트 해시 → 정규화 결과를 저장하는 SQLite 기반 영구 캐시.
+    항목 수가 max_entries를 넘으면 마지막 사용 시각이 오래된 항목부터 제거한다.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS token_cache ("
+                        "key TEXT PRIMARY KEY, normalized TEXT NOT NULL, last_used INTEGER NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE INDEX IF NOT EXISTS token_cache_last_used ON token_cache (last_used)"
+                    )
+                    conn.commit()
+                    self._initialized = True
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, keys):
+        """
+        여러 키를 한 번에 조회하고, 조회된 항목의 마지막 사용 시각을 갱신하는 함수.
+
+        :param keys: 텍스트 해시 목록
+        :return: {키: 정규화 결과}
+        """
+        found = {}
+        keys = list(keys)
+        if not keys:
+            return found
+
+        now = int(time.time())
+        with self._transaction() as conn:
+            for i in range(0, len(keys), SQLITE_BATCH_SIZE):
+                chunk = keys[i:i + SQLITE_BATCH_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT key, normalized FROM token_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    hit_keys = [key for key, _ in rows]
+                    conn.execute(
+                        f"UPDATE token_cache SET last_used = ? WHERE key IN ({', '.join('?' for _ in hit_keys)})",
+                        [now, *hit_keys],
+                    )
+        return found
+
+    def set_many(self, items):
+        """
+        정규화 결과를 저장하고, 최대 항목 수를 넘으면 오래된 항목을 제거하는 함수.
+
+        :param items: {키: 정규화 결과}
+        """
+        if not items:
+            return
+
+        now = int(time.time())
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO token_cache (key, normalized, last_used) VALUES (?, ?, ?)",
+                [(key, normalized, now) for key, normalized in items.items()],
+            )
+            total = conn.execute("SELECT COUNT(*) FROM token_cache").fetchone()[0]
+            if total > self.max_entries:
+                # 매번 제거하지 않도록 최대 크기의 90%까지 한 번에 줄임
+                evict_count = total - int(self.max_entries * 0.9)
+                conn.execute(
+                    "DELETE FROM token_cache WHERE key IN ("
+                    "SELECT key FROM token_cache ORDER BY last_used ASC LIMIT ?)",
+                    (evict_count,),
+                )
+                logger.debug(f"토큰 캐시 항목 {evict_count}개를 제거했습니다.")
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    """
+    프로세스 공용 TokenCache 인스턴스를 반환하는 함수.
+    경로와 최대 항목 수는 settings.TOKEN_CACHE_PATH, settings.TOKEN_CACHE_MAX_ENTRIES로 변경 가능.
+    """
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                from django.conf import settings
+                path = getattr(settings, 'TOKEN_CACHE_PATH', DEFAULT_CACHE_PATH)
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                _token_cache = TokenCache(
+                    path=path,
+                    max_entries=getattr(settings, 'TOKEN_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+                )
+    return _token_cache
+
+
+def normalize_utterances(texts, tokenizer=None, cache=None):
+    """
+    발화 목록을 어근 추출 기반으로 정규화하는 함수.
+
+    - 같은 문장은 한 번만 처리한다.
+    - 캐시에 없는 문장만 배치로 토큰화하고, 결과를 캐시에 저장한다.
+    - 캐시를 사용할 수 없는 경우에도 토큰화 결과는 정상 반환한다.
+
+    :param texts: 발화 목록
+    :return: 입력과 같은 순서의 정규화된 문장 목록
+    """
+    texts = [str(text) for text in texts]
+    if not texts:
+        return []
+
+    tokenizer = tokenizer or get_tokenizer()
+    unique_texts = list(dict.fromkeys(texts))
+    keys = {text: text_key(text) for text in unique_texts}
+
+    try:
+        cache = cache or get_token_cache()
+        cached = cache.get_many(keys.values())
+    except sqlite3.Error as e:
+        logger.warning(f"토큰 캐시를 조회할 수 없어 캐시 없이 정규화합니다: {e}")
+        cache, cached = None, {}
+
+    normalized = {text: cached[keys[text]] for text in unique_texts if keys[text] in cached}
+    missing = [text for text in unique_texts if text not in normalized]
+
+    if missing:
+        tokenized = tokenizer.morphs_batch(missing, stem=True)
+        fresh = {text: ' '.join(tokens) for text, tokens in zip(missing, tokenized)}
+        normalized.update(fresh)
+        if cache is not None:
+            try:
+                cache.set_many({keys[text]: value for text, value in fresh.items()})
+            except sqlite3.Error as e:
+                logger.warning(f"토큰 캐시를 저장할 수 없습니다: {e}")
+
+    return [normalized[text] for text in texts]
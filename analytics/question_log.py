@@ -0,0 +1,122 @@
+# question_log.py
+# webhook_questionlog 조회 모듈: Django DB 설정과 연결 관리를 그대로 사용
+import hashlib
+import json
+import logging
+import pandas as pd
+
+logger = logging.getLogger('faq')
+
+QUESTION_LOG_TABLE = 'webhook_questionlog'
+
+# 항상 같은 SQL 문을 사용하여 DB 드라이버의 prepared statement 캐시를 재사용
+FETCH_QUESTIONS_SQL = f"SELECT questions FROM {QUESTION_LOG_TABLE} WHERE agent_id = %s LIMIT 1"
+
+
+def _database_alias():
+    from django.conf import settings
+
+    # 질문 로그가 기본 DB가 아닌 곳에 있으면 settings.QUESTION_LOG_DATABASE로 지정
+    return getattr(settings, 'QUESTION_LOG_DATABASE', 'default')
+
+
+def prepare_question_log_table(alias=None, enable_wal=False):
+    """
+    webhook_questionlog에 agent_id 인덱스를 만드는 함수. (관리 명령 prepare_question_log에서 배포 시 한 번 실행)
+    요청 처리 중에는 스키마나 DB 설정을 바꾸지 않도록 조회 함수에서는 호출하지 않는다.
+
+    :param enable_wal: True면 SQLite DB의 저널 모드를 WAL로 바꿈 (통계 조회와 웹훅 저장이 서로 막지 않도록)
+    :return: 실제로 적용한 작업 목록
+    """
+    from django.db import connections
+
+    connection = connections[alias or _database_alias()]
+    applied = []
+    with connection.cursor() as cursor:
+        if enable_wal and connection.vendor == 'sqlite':
+            cursor.execute("PRAGMA journal_mode=WAL")
+            applied.append('journal_mode=WAL')
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {QUESTION_LOG_TABLE}_agent_id_idx "
+            f"ON {QUESTION_LOG_TABLE} (agent_id)"
+        )
+        applied.append(f'{QUESTION_LOG_TABLE}_agent_id_idx')
+    return applied
+
+
+def fetch_questions(agent_ids):
+    """
+    agent_id별 질문 로그(questions JSON 문자열)를 조회하는 함수.
+    agent_id마다 첫 번째 로그만 사용한다.
+
+    :param agent_ids: agent_id 목록
+    :return: {agent_id: questions JSON 문자열}
+    """
+    agent_ids = [str(agent_id) for agent_id in dict.fromkeys(agent_ids) if agent_id is not None]
+    if not agent_ids:
+        return {}
+
+    from django.db import connections
+
+    questions_by_agent = {}
+    with connections[_database_alias()].cursor() as cursor:
+        for agent_id in agent_ids:
+            cursor.execute(FETCH_QUESTIONS_SQL, [agent_id])
+            row = cursor.fetchone()
+            if row:
+                questions_by_agent[agent_id] = row[0]
+    return questions_by_agent
+
+
+def extract_questions(questions_json):
+    """
+    questions 필드의 JSON 문자열에서 question 값만 추출하는 함수.
+    """
+    try:
+        questions_list = json.loads(questions_json)
+        # questions_list가 리스트일 경우, 각 항목에서 question 키 추출
+        if isinstance(questions_list, list):
+            return [item.get("question", "") for item in questions_list if isinstance(item, dict)]
+        return []
+    except (json.JSONDecodeError, TypeError):
+        logger.warning(f"JSON 형식이 올바르지 않거나 데이터가 누락되었습니다: {questions_json}")
+        return []
+
+
+def question_rows_from_logs(questions_by_agent):
+    """
+    agent_id별 질문 로그({agent_id: questions JSON})를 (agent_id, user_utterances) DataFrame으로 펼치는 함수.
+    """
+    if not questions_by_agent:
+        return pd.DataFrame(columns=['agent_id', 'user_utterances'])
+
+    webhook_data = pd.DataFrame(list(questions_by_agent.items()), columns=['agent_id', 'questions'])
+    webhook_data['user_utterances'] = webhook_data['questions'].map(extract_questions)
+    question_rows = webhook_data[['agent_id', 'user_utterances']].explode('user_utterances')
+    return question_rows.dropna(subset=['user_utterances']).reset_index(drop=True)
+
+
+def build_question_rows(agent_ids):
+    """
+    여러 agent_id의 질문 로그를 조회하여 (agent_id, user_utterances) DataFrame으로 만드는 함수.
+    """
+    agent_ids = [agent_id for agent_id in agent_ids if pd.notna(agent_id)]
+    return question_rows_from_logs(fetch_questions(agent_ids))
+
+
+def question_sources(agent_ids):
+    """
+    agent_id별 질문 로그를 증분 통계 저장소의 소스 목록으로 변환하는 함수.
+
+    :return: (agent_id, 지문, loader) 튜플 리스트
+    """
+    sources = []
+    for agent_id, questions_json in fetch_questions(agent_ids).items():
+        # 질문 로그 내용이 바뀐 경우에만 다시 집계되도록 내용 해시를 지문으로 사용
+        fingerprint = hashlib.sha1((questions_json or '').encode('utf-8')).hexdigest()
+        sources.append((
+            agent_id,
+            fingerprint,
+            lambda agent_id=agent_id, questions_json=questions_json: ([agent_id], extract_questions(questions_json)),
+        ))
+    return sources
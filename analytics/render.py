@@ -0,0 +1,162 @@
+# render.py
+# 통계 그래프 렌더링 서비스: 요청 스레드 밖(프로세스 풀)에서 그래프를 그리고, 데이터가 같으면 다시 그리지 않음
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+
+logger = logging.getLogger('faq')
+
+FONT_PATH = '/usr/share/fonts/truetype/nanum/NanumGothic.ttf'
+DEFAULT_MAX_WORKERS = int(os.environ.get('CHART_RENDER_MAX_WORKERS', 1))
+
+# 라벨이 이 길이를 넘으면 줄바꿈
+LABEL_WRAP = 10
+
+
+@lru_cache(maxsize=1)
+def _font_properties():
+    """
+    NanumGothic 폰트를 프로세스당 한 번만 찾아 FontProperties로 반환하는 함수. 폰트가 없으면 None.
+    """
+    from matplotlib import font_manager
+
+    if os.path.exists(FONT_PATH):
+        return font_manager.FontProperties(fname=FONT_PATH)
+    return None
+
+
+def data_digest(data):
+    """
+    상위 N개 집계 데이터의 해시를 반환하는 함수. 같은 데이터면 같은 이미지가 그려진다.
+    """
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _digest_path(output_image_path):
+    return f"{output_image_path}.sha256"
+
+
+def _is_up_to_date(output_image_path, digest):
+    try:
+        with open(_digest_path(output_image_path), 'r') as f:
+            return f.read().strip() == digest and os.path.exists(output_image_path)
+    except OSError:
+        return False
+
+
+def _wrap_label(label):
+    if len(label) <= LABEL_WRAP:
+        return label
+    return '\n'.join(label[i:i + LABEL_WRAP] for i in range(0, len(label), LABEL_WRAP))
+
+
+def render_chart(data, output_image_path, digest):
+    """
+    가장 많이 질문한 내용 막대 그래프를 PNG로 저장하는 함수.
+    pyplot 전역 상태를 사용하지 않고 Figure 객체에 직접 그린다. (프로세스 풀에서 실행)
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    font = _font_properties()
+    text_kwargs = {'fontproperties': font} if font else {}
+
+    labels = [_wrap_label(item['utterance']) for item in data]
+    counts = [item['count'] for item in data]
+
+    fig = Figure(figsize=(8, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(range(len(labels)), counts)
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, **text_kwargs)
+    ax.set_xlabel('질문', color='blue', **text_kwargs)
+    ax.set_ylabel('질문 횟수', color='green', **text_kwargs)
+    ax.set_title('가장 많이 질문한 내용', **text_kwargs)
+
+    # 렌더링 도중의 이미지가 노출되지 않도록 임시 파일에 그린 뒤 교체
+    tmp_path = f"{output_image_path}.tmp.png"
+    fig.savefig(tmp_path, format='png')
+    os.replace(tmp_path, output_image_path)
+    with open(_digest_path(output_image_path), 'w') as f:
+        f.write(digest)
+    return output_image_path
+
+
+class ChartRenderer:
+    """
+    통계 그래프를 프로세스 풀에서 렌더링하는 서비스.
+
+    - 같은 데이터로 이미 그려진 이미지(해시 일치)가 있으면 렌더링을 건너뛴다.
+    - 같은 경로에 대해 진행 중인 렌더링이 있으면 새로 제출하지 않는다.
+    - 프로세스 풀은 처음 렌더링이 필요할 때 spawn 방식으로 생성된다.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            # 요청 처리 스레드와 JVM이 있는 워커 프로세스를 fork하지 않도록 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    def submit(self, data, output_image_path):
+        """
+        그래프 렌더링을 제출하는 함수. 요청 스레드를 막지 않는다.
+
+        :param data: [{"utterance": ..., "count": ...}, ...]
+        :param output_image_path: 저장할 PNG 경로
+        :return: 렌더링 Future (이미 최신이면 완료된 Future)
+        """
+        digest = data_digest(data)
+        if _is_up_to_date(output_image_path, digest):
+            done = Future()
+            done.set_result(output_image_path)
+            return done
+
+        with self._lock:
+            in_flight = self._in_flight.get(output_image_path)
+            if in_flight and in_flight[0] == digest and not in_flight[1].done():
+                return in_flight[1]
+
+            future = self._get_executor().submit(render_chart, data, output_image_path, digest)
+            self._in_flight[output_image_path] = (digest, future)
+
+        def _on_done(f, path=output_image_path):
+            with self._lock:
+                if self._in_flight.get(path, (None, None))[1] is f:
+                    del self._in_flight[path]
+            if f.exception():
+                logger.error(f"통계 그래프 렌더링 실패: {path}, 오류: {f.exception()}")
+
+        future.add_done_callback(_on_done)
+        return future
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_chart_renderer():
+    """
+    프로세스 공용 ChartRenderer 인스턴스를 반환하는 함수.
+    """
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ChartRenderer()
+    return _renderer
@@ -0,0 +1,123 @@
+# service.py
+# 매장(store)/공공기관(public)/기업(corp) 공용 발화 통계 서비스
+import logging
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from .question_log import question_sources
+from .render import data_digest
+from .stats_store import UtteranceStatsStore, csv_sources
+from .utterances import count_utterances, save_most_common_utterances_graph
+
+logger = logging.getLogger('faq')
+
+TENANTS = ('store', 'public', 'corp')
+
+DEFAULT_HISTORY_ROOT = 'conversation_history'
+DEFAULT_STATISTICS_ROOT = os.path.join('media', 'statistics')
+DEFAULT_STATISTICS_URL = '/media/statistics'
+STATISTICS_IMAGE_NAME = 'most_common_utterances.png'
+# 그래프 렌더링을 기다리는 최대 시간(초). 넘으면 image_url 없이 응답하고 렌더링은 계속 진행
+RENDER_TIMEOUT = float(os.environ.get('CHART_RENDER_TIMEOUT', 20))
+
+# status: 'success', 'no folder'(사용자 폴더 없음), 'no file'(집계할 CSV 없음)
+# image_url: 렌더링이 끝난 그래프 URL. 렌더링이 실패했거나 RENDER_TIMEOUT 안에 끝나지 않으면 None
+StatisticsResult = namedtuple('StatisticsResult', ['status', 'data', 'image_url'])
+
+
+class StatisticsService:
+    """
+    사용자별 대화 기록 폴더에서 가장 많이 언급된 발화를 집계하고 그래프를 만드는 서비스.
+
+    - CSV 파일과 질문 로그는 UtteranceStatsStore로 증분 집계된다.
+    - 집계 상태 파일과 그래프는 통계 대상(tenant)별로 따로 저장된다. 매장/공공기관/기업 사용자 ID가 겹쳐도
+      서로의 집계나 그래프를 덮어쓰지 않는다.
+    - 그래프는 ChartRenderer에 제출되어 프로세스 풀에서 렌더링된다. 데이터가 같으면 다시 그리지 않으므로
+      대부분의 요청은 기다리지 않고, 새로 그려야 하는 경우에만 렌더링이 끝난 뒤 URL을 반환한다.
+    """
+
+    def __init__(self, tenant, history_root=DEFAULT_HISTORY_ROOT,
+                 statistics_root=DEFAULT_STATISTICS_ROOT, statistics_url=DEFAULT_STATISTICS_URL, top_n=5):
+        if tenant not in TENANTS:
+            raise ValueError(f"지원하지 않는 통계 대상입니다: {tenant}")
+        self.tenant = tenant
+        self.history_root = history_root
+        self.statistics_root = statistics_root
+        self.statistics_url = statistics_url.rstrip('/')
+        self.top_n = top_n
+
+    def user_folder(self, user_id):
+        return os.path.join(self.history_root, str(user_id))
+
+    def state_path(self, user_id):
+        # 발화 집계가 담겨 있으므로 미디어 폴더가 아닌 대화 기록 폴더에 대상별 파일로 저장
+        return os.path.join(self.user_folder(user_id), f".utterance_stats.{self.tenant}.json")
+
+    def image_path(self, user_id):
+        return os.path.join(self.statistics_root, self.tenant, str(user_id), STATISTICS_IMAGE_NAME)
+
+    def image_url(self, user_id, digest=None):
+        url = f"{self.statistics_url}/{self.tenant}/{user_id}/{STATISTICS_IMAGE_NAME}"
+        # 데이터가 바뀌면 URL도 바뀌도록 해시를 붙여 브라우저가 이전 그래프를 보여주지 않게 함
+        return f"{url}?v={digest[:12]}" if digest else url
+
+    def collect(self, user_id):
+        """
+        사용자의 발화 통계를 집계하고 그래프 렌더링을 제출하는 함수.
+
+        :return: StatisticsResult
+        """
+        folder_path = self.user_folder(user_id)
+        if not os.path.exists(folder_path):
+            logger.debug(f"{folder_path} 경로가 존재하지 않습니다.")
+            return StatisticsResult('no folder', None, None)
+
+        # CSV 파일과 질문 로그 중 새로 생기거나 바뀐 것만 증분 집계에 반영
+        stats_store = UtteranceStatsStore(folder_path, state_path=self.state_path(user_id))
+        stats_store.sync('csv', csv_sources(folder_path), count_utterances)
+
+        if not stats_store.has_sources('csv'):
+            logger.debug("집계할 CSV 파일이 존재하지 않습니다.")
+            return StatisticsResult('no file', None, None)
+
+        stats_store.sync('questions', question_sources(stats_store.agent_ids()), count_utterances)
+        most_common_utterances = stats_store.most_common(self.top_n)
+
+        output_image_path = self.image_path(user_id)
+        os.makedirs(os.path.dirname(output_image_path), exist_ok=True)
+        future = save_most_common_utterances_graph(most_common_utterances, output_image_path)
+        try:
+            future.result(timeout=RENDER_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning(f"통계 그래프 렌더링이 {RENDER_TIMEOUT}초 안에 끝나지 않았습니다: {output_image_path}")
+            return StatisticsResult('success', most_common_utterances, None)
+        except Exception as e:
+            logger.error(f"통계 그래프 렌더링 실패: {output_image_path}, 오류: {e}")
+            return StatisticsResult('success', most_common_utterances, None)
+
+        return StatisticsResult(
+            'success', most_common_utterances, self.image_url(user_id, data_digest(most_common_utterances))
+        )
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_statistics_service(tenant):
+    """
+    통계 대상별 공용 StatisticsService 인스턴스를 반환하는 함수.
+    대화 기록 폴더는 settings.STATISTICS_HISTORY_ROOTS({tenant: 경로})로 대상별로 지정할 수 있다.
+    """
+    service = _services.get(tenant)
+    if service is None:
+        with _services_lock:
+            service = _services.get(tenant)
+            if service is None:
+                from django.conf import settings
+                history_roots = getattr(settings, 'STATISTICS_HISTORY_ROOTS', {})
+                service = _services[tenant] = StatisticsService(
+                    tenant, history_root=history_roots.get(tenant, DEFAULT_HISTORY_ROOT),
+                )
+    return service
@@ -0,0 +1,173 @@
+# stats_store.py
+# 사용자별 발화 통계를 소스(CSV 파일, 질문 로그) 단위로 증분 집계하여 보관하는 저장소
+import json
+import logging
+import os
+from collections import Counter
+import pandas as pd
+from filelock import FileLock
+from .ingest import CsvUtteranceStream, source_csv_files
+
+logger = logging.getLogger('faq')
+
+STATE_FILENAME = '.utterance_stats.json'
+STATE_VERSION = 1
+
+
+def csv_sources(folder_path):
+    """
+    폴더 내 CSV 파일을 증분 저장소의 소스 목록으로 변환하는 함수.
+    파일 내용은 지문(mtime, size)이 바뀐 경우에만 loader를 통해 청크 단위로 읽힌다.
+
+    :param folder_path: 사용자별 대화 기록 폴더
+    :return: (소스 키, 지문, loader) 튜플 리스트
+    """
+    sources = []
+    for file_path in source_csv_files(folder_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        fingerprint = {'mtime': stat.st_mtime, 'size': stat.st_size}
+        sources.append((os.path.basename(file_path), fingerprint, lambda path=file_path: _csv_loader(path)))
+    return sources
+
+
+def _csv_loader(file_path):
+    stream = CsvUtteranceStream(file_path)
+    # agent_ids는 stream을 순회하는 동안 채워짐
+    return stream.agent_ids, stream
+
+
+class UtteranceStatsStore:
+    """
+    사용자 폴더의 발화 집계를 소스 단위로 보관하는 증분 저장소.
+
+    - 소스별로 지문과 정규화된 발화 카운터를 저장하고, 전체 합계(totals)를 함께 유지한다.
+    - 새로 생기거나 지문이 바뀐 소스만 다시 읽고, 사라진 소스는 합계에서 뺀다.
+    - 소스 키는 네임스페이스('csv', 'questions' 등)별로 관리되어 서로의 소스를 지우지 않는다.
+    - 상태 파일은 파일 락으로 보호되며 임시 파일 교체 방식으로 원자적으로 저장된다.
+    """
+
+    def __init__(self, folder_path, state_path=None):
+        self.folder_path = folder_path
+        self.state_path = state_path or os.path.join(folder_path, STATE_FILENAME)
+        self.lock = FileLock(f"{self.state_path}.lock")
+        self._state = None
+
+    def _empty_state(self):
+        return {'version': STATE_VERSION, 'sources': {}, 'totals': {}}
+
+    def load(self):
+        """
+        저장된 집계 상태를 읽어오는 함수. 상태 파일이 없거나 손상된 경우 빈 상태를 반환.
+        """
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return self._empty_state()
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"통계 상태 파일을 읽을 수 없어 새로 집계합니다: {self.state_path}, 오류: {e}")
+            return self._empty_state()
+
+        if state.get('version') != STATE_VERSION:
+            return self._empty_state()
+        return state
+
+    def _save(self, state):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def sync(self, namespace, sources, count_utterances):
+        """
+        네임스페이스에 속한 소스 목록과 저장된 상태를 비교하여 변경분만 집계에 반영하는 함수.
+
+        :param namespace: 소스 네임스페이스 (예: 'csv', 'questions')
+        :param sources: (소스 키, 지문, loader) 튜플 리스트.
+            loader는 (agent_id 집합, 발화 이터러블)을 반환하며, agent_id 집합은 발화를 순회한 뒤 확정된다.
+        :param count_utterances: 발화 목록을 정규화된 발화 Counter로 변환하는 함수
+        :return: 반영된(추가/변경/삭제) 소스 개수
+        """
+        with self.lock:
+            state = self.load()
+            stored = state['sources']
+            totals = Counter(state['totals'])
+            prefix = f"{namespace}:"
+            seen = set()
+            changed = 0
+
+            for key, fingerprint, loader in sources:
+                source_key = prefix + key
+                seen.add(source_key)
+                record = stored.get(source_key)
+                if record and record['fingerprint'] == fingerprint:
+                    continue
+
+                try:
+                    agent_ids, utterances = loader()
+                    counts = count_utterances(utterances)
+                except FileNotFoundError:
+                    logger.error(f"파일을 찾을 수 없습니다: {key}")
+                    continue
+                except pd.errors.EmptyDataError:
+                    logger.warning(f"빈 파일입니다: {key}")
+                    agent_ids, counts = [], Counter()
+                except ValueError as ve:
+                    logger.error(f"열 인덱스가 잘못되었습니다. 파일을 확인해주세요: {key}, 오류 메시지: {ve}")
+                    continue
+                except Exception as e:
+                    logger.error(f"소스를 읽는 중 오류 발생: {key}, 오류 메시지: {e}")
+                    continue
+
+                if record:
+                    totals.subtract(record['counts'])
+                totals.update(counts)
+                stored[source_key] = {
+                    'fingerprint': fingerprint,
+                    'agent_ids': sorted(str(agent_id) for agent_id in agent_ids),
+                    'counts': dict(counts),
+                }
+                changed += 1
+
+            for source_key in [k for k in stored if k.startswith(prefix) and k not in seen]:
+                totals.subtract(stored.pop(source_key)['counts'])
+                changed += 1
+
+            if changed:
+                state['totals'] = {utterance: count for utterance, count in totals.items() if count > 0}
+                self._save(state)
+            self._state = state
+            return changed
+
+    def _current_state(self):
+        # 같은 요청 안에서는 sync 직후의 상태를 재사용하여 상태 파일을 다시 읽지 않음
+        if self._state is None:
+            self._state = self.load()
+        return self._state
+
+    def agent_ids(self, namespace='csv'):
+        """
+        네임스페이스에 속한 소스에서 발견된 agent_id 목록을 반환하는 함수.
+        """
+        prefix = f"{namespace}:"
+        agent_ids = set()
+        for source_key, record in self._current_state()['sources'].items():
+            if source_key.startswith(prefix):
+                agent_ids.update(record['agent_ids'])
+        return sorted(agent_ids)
+
+    def has_sources(self, namespace='csv'):
+        prefix = f"{namespace}:"
+        return any(key.startswith(prefix) for key in self._current_state()['sources'])
+
+    def most_common(self, n=5):
+        """
+        누적 집계에서 가장 많이 언급된 발화 상위 n개를 반환하는 함수.
+
+        :return: [{"utterance": ..., "count": ...}, ...]
+        """
+        totals = Counter(self._current_state()['totals'])
+        return [{"utterance": utterance, "count": count} for utterance, count in totals.most_common(n)]
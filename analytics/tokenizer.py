@@ -0,0 +1,142 @@
+# tokenizer.py
+# 형태소 분석기(Okt)를 처음 사용할 때 시작하는 프로세스 공용 토크나이저 서비스
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('faq')
+
+# 워커 수와 배치 크기는 환경 변수로 조정 가능
+DEFAULT_MAX_WORKERS = int(os.environ.get('TOKENIZER_MAX_WORKERS', 2))
+DEFAULT_BATCH_SIZE = int(os.environ.get('TOKENIZER_BATCH_SIZE', 256))
+
+
+def current_rss_kb():
+    """
+    현재 프로세스의 RSS(KB)를 반환하는 함수. /proc을 읽을 수 없는 환경에서는 최대 RSS를 반환.
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class TokenizerService:
+    """
+    Okt 형태소 분석기를 감싸는 프로세스 공용 토크나이저 서비스.
+
+    - JVM(JPype)은 import 시점이 아니라 첫 토큰화 요청 시점에 한 번만 시작된다.
+    - 토큰화는 크기가 제한된 스레드 풀에서 배치 단위로 실행된다.
+    - 시작 시간과 시작 전후 RSS를 stats()로 확인할 수 있다.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_BATCH_SIZE):
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self._okt = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'started': False,
+            'startup_seconds': None,
+            'rss_before_kb': None,
+            'rss_after_kb': None,
+        }
+
+    def _ensure_started(self):
+        if self._okt is not None:
+            return
+
+        with self._lock:
+            if self._okt is not None:
+                return
+
+            from konlpy.tag import Okt  # JVM 시작 비용을 실제 사용 시점까지 미룸
+
+            rss_before = current_rss_kb()
+            started_at = time.perf_counter()
+            okt = Okt()
+            startup_seconds = time.perf_counter() - started_at
+            rss_after = current_rss_kb()
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='tokenizer'
+            )
+            self._metrics.update({
+                'started': True,
+                'startup_seconds': round(startup_seconds, 3),
+                'rss_before_kb': rss_before,
+                'rss_after_kb': rss_after,
+            })
+            self._okt = okt
+            logger.info(
+                f"형태소 분석기 시작 완료 (pid={os.getpid()}, {startup_seconds:.2f}s, "
+                f"RSS {rss_before}KB -> {rss_after}KB)"
+            )
+
+    def _morphs_chunk(self, texts, stem):
+        return [self._okt.morphs(text, stem=stem) for text in texts]
+
+    def morphs(self, text, stem=True):
+        """
+        단일 문장을 형태소 단위로 분리하는 함수.
+        """
+        self._ensure_started()
+        return self._okt.morphs(text, stem=stem)
+
+    def morphs_batch(self, texts, stem=True):
+        """
+        여러 문장을 배치로 나누어 스레드 풀에서 형태소 분석하는 함수.
+
+        :param texts: 문장 목록
+        :param stem: 어근 추출 여부
+        :return: 입력 순서와 같은 순서의 토큰 리스트 목록
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        self._ensure_started()
+        if len(texts) <= self.batch_size:
+            return self._morphs_chunk(texts, stem)
+
+        chunks = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = []
+        for tokens in self._executor.map(lambda chunk: self._morphs_chunk(chunk, stem), chunks):
+            results.extend(tokens)
+        return results
+
+    def stats(self):
+        """
+        시작 여부, 시작 시간, 시작 전후 RSS, 현재 RSS를 반환하는 함수.
+        """
+        return {
+            **self._metrics,
+            'max_workers': self.max_workers,
+            'batch_size': self.batch_size,
+            'rss_current_kb': current_rss_kb(),
+        }
+
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """
+    프로세스 공용 TokenizerService 인스턴스를 반환하는 함수. 생성만 하며 JVM은 시작하지 않음.
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = TokenizerService()
+    return _tokenizer
@@ -0,0 +1,43 @@
+# utterances.py
+# 발화 정규화/집계와 통계 그래프 저장 함수
+import re
+from collections import Counter
+from .normalize import normalize_utterances
+from .render import get_chart_renderer
+
+# 집계에서 제외할 발화 (정규화 결과 기준)
+EXCLUDED_UTTERANCES = ('안녕', 'HOME')
+
+
+def normalize_texts(texts):
+    """
+    여러 문장을 중복 제거 후 배치로 정규화하는 함수. (정규화 결과는 영구 캐시에 보관)
+    """
+    return normalize_utterances(texts)
+
+
+def count_utterances(utterances):
+    """
+    발화 목록을 정규화한 뒤 문장별 언급 횟수를 집계하는 함수.
+    같은 문장은 한 번만 정규화하고 원문 기준 횟수를 더한다.
+    """
+    raw_counts = Counter(str(utterance) for utterance in utterances)
+    normalized_utterances = normalize_texts(raw_counts.keys())
+
+    utterance_counts = Counter()
+    for normalized, count in zip(normalized_utterances, raw_counts.values()):
+        # 특정 단어 필터링 및 특수 문자 제거
+        if normalized in EXCLUDED_UTTERANCES:
+            continue
+        utterance_counts[re.sub(r'[^가-힣a-zA-Z\s]', '', normalized)] += count
+    return utterance_counts
+
+
+def save_most_common_utterances_graph(data, output_image_path):
+    """
+    가장 많이 언급된 발화 그래프 렌더링을 제출하는 함수.
+    렌더링은 프로세스 풀에서 실행되며, 같은 데이터로 이미 그려진 이미지가 있으면 다시 그리지 않는다.
+
+    :return: 렌더링 Future. 이미지 URL을 응답하기 전에 완료를 기다려야 한다.
+    """
+    return get_chart_renderer().submit(data, output_image_path)
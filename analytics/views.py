@@ -0,0 +1,39 @@
+# views.py
+# 매장/공공기관/기업 통계 API 공통 뷰. 각 앱은 인증 방식과 tenant만 지정하여 상속
+import logging
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .service import get_statistics_service
+
+logger = logging.getLogger('faq')
+
+
+class BaseStatisticsView(APIView):
+    permission_classes = [IsAuthenticated]  # 인증된 사용자만 접근 가능
+    tenant = None
+
+    def post(self, request, *args, **kwargs):
+        try:
+            result = get_statistics_service(self.tenant).collect(request.user.user_id)
+
+            if result.status == 'no folder':
+                return Response({"status": "no folder", "message": "사용자 데이터 폴더가 존재하지 않습니다."})
+
+            if result.status == 'no file':
+                return Response({"status": "no file", "message": "해당 파일이 존재하지 않습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+            # 이미지 URL을 응답에 포함
+            response_data = {
+                "status": "success",
+                "data": result.data,
+                "image_url": result.image_url
+            }
+
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            # 오류 메시지 로그 출력
+            logger.error(f"오류 발생: {str(e)}")
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
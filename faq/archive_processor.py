@@ -0,0 +1,194 @@
+# archive_processor.py
+# ZIP 업로드를 전체 해제하지 않고 항목(member)별로 스트리밍 처리: 이미지는 저장소로, 엑셀은 메뉴 등록으로 전달
+import io
+import logging
+import os
+import zipfile
+from django.core.files import File
+from django.core.files.storage import default_storage
+from .excel_processor import ExcelImportError, process_excel_and_save_to_db
+from .models import Menu
+
+logger = logging.getLogger('faq')
+
+# 압축 파일 제한 (환경 변수로 조정 가능)
+MAX_ENTRIES = int(os.environ.get('ZIP_MAX_ENTRIES', 500))
+MAX_MEMBER_SIZE = int(os.environ.get('ZIP_MAX_MEMBER_SIZE', 20 * 1024 * 1024))  # 항목당 20MB
+MAX_TOTAL_SIZE = int(os.environ.get('ZIP_MAX_TOTAL_SIZE', 200 * 1024 * 1024))  # 해제 후 전체 200MB
+MAX_COMPRESSION_RATIO = 100  # 압축률이 비정상적으로 높은 항목(압축 폭탄) 거부
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+READ_CHUNK_SIZE = 64 * 1024
+
+# 메뉴에 연결되지 않은 업로드 이미지를 보관하는 매장 업로드 폴더 (탈퇴 시 uploads/store_<id>와 함께 삭제)
+UPLOAD_IMAGE_DIR = 'uploads/store_{store_id}/images'
+
+
+class ArchiveLimitError(ValueError):
+    """
+    압축 파일이 항목 수/크기 제한을 넘은 경우.
+    """
+
+
+class _BoundedReader:
+    """
+    최대 limit 바이트까지만 읽을 수 있는 스트림. ZIP 헤더의 크기 정보와 실제 크기가 달라도 제한을 지킨다.
+    """
+
+    def __init__(self, raw, limit, name):
+        self.raw = raw
+        self.limit = limit
+        self.name = name
+        self.read_bytes = 0
+
+    def read(self, size=-1):
+        size = READ_CHUNK_SIZE if size is None or size < 0 else size
+        data = self.raw.read(min(size, self.limit + 1 - self.read_bytes))
+        self.read_bytes += len(data)
+        if self.read_bytes > self.limit:
+            raise ArchiveLimitError(f"압축 파일 항목이 너무 큽니다: {self.name}")
+        return data
+
+
+def _validate_entries(entries):
+    if len(entries) > MAX_ENTRIES:
+        raise ArchiveLimitError(f"압축 파일 항목이 너무 많습니다. (최대 {MAX_ENTRIES}개)")
+
+    total_size = 0
+    for info in entries:
+        if info.file_size > MAX_MEMBER_SIZE:
+            raise ArchiveLimitError(f"압축 파일 항목이 너무 큽니다: {info.filename}")
+        if info.compress_size and info.file_size / info.compress_size > MAX_COMPRESSION_RATIO:
+            raise ArchiveLimitError(f"압축률이 비정상적인 항목이 있습니다: {info.filename}")
+        total_size += info.file_size
+    if total_size > MAX_TOTAL_SIZE:
+        raise ArchiveLimitError("압축 해제 후 전체 크기가 제한을 넘습니다.")
+
+
+def _archive_entries(zip_ref):
+    """
+    처리 대상 항목(폴더, 숨김 파일, macOS 메타데이터 제외)을 반환하는 함수.
+    """
+    entries = []
+    for info in zip_ref.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        entries.append(info)
+    return entries
+
+
+def _store_image(zip_ref, info, store):
+    """
+    이미지 항목을 디스크에 풀지 않고 메뉴 이미지 저장소로 바로 저장하는 함수.
+
+    :return: 저장소에 저장된 파일 이름
+    """
+    image_field = Menu._meta.get_field('image')
+    # 메뉴 이미지 업로드 경로 규칙(menu_images/store_<id>/)을 그대로 사용
+    upload_name = image_field.generate_filename(Menu(store=store), os.path.basename(info.filename))
+
+    with zip_ref.open(info) as member:
+        reader = _BoundedReader(member, MAX_MEMBER_SIZE, info.filename)
+        content = File(reader, name=os.path.basename(info.filename))
+        content.size = info.file_size
+        return image_field.storage.save(upload_name, content)
+
+
+def keep_upload_image(store_id, file_name, content):
+    """
+    메뉴에 연결되지 않은 업로드 이미지를 매장 업로드 폴더에 보관하는 함수. (관리자가 확인 후 직접 등록)
+    같은 이름의 파일이 있으면 저장소가 다른 이름을 붙인다.
+
+    :return: 저장된 파일 경로
+    """
+    name = os.path.basename(file_name)
+    return default_storage.save(f"{UPLOAD_IMAGE_DIR.format(store_id=store_id)}/{name}", content)
+
+
+def _read_member(zip_ref, info):
+    """
+    항목을 크기 제한이 있는 메모리 버퍼로 읽는 함수.
+    """
+    buffer = io.BytesIO()
+    with zip_ref.open(info) as member:
+        reader = _BoundedReader(member, MAX_MEMBER_SIZE, info.filename)
+        for chunk in iter(lambda: reader.read(READ_CHUNK_SIZE), b''):
+            buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+
+def process_archive(file_path, store):
+    """
+    ZIP 파일의 항목을 하나씩 처리하는 함수.
+
+    - 이미지 항목을 먼저 메뉴 이미지 저장소에 저장한다.
+    - 엑셀 항목은 메모리 버퍼로 읽어 메뉴를 등록하며, 엑셀의 '사진' 열에 적힌 파일 이름이
+      같은 압축 파일 안의 이미지와 일치하면 저장된 이미지를 그대로 연결한다.
+    - 지원하지 않는 형식의 항목은 건너뛴다.
+    - 이미지를 저장하며 생긴 참조는 끝날 때(실패 포함) 해제한다. 메뉴가 연결된 이미지는 메뉴마다 참조가 더해져
+      있으므로 남는다. 어떤 메뉴도 연결하지 않았거나 엑셀 등록에 실패한 이미지는 매장 업로드 폴더에 보관하고
+      (keep_upload_image) 결과 메시지에 표시한다. 보관하지 못한 이미지는 skipped로 표시하고 images에서 뺀다.
+
+    :return: {"images": 보관된 이미지 수, "created_count": 생성된 메뉴 수, "entries": 항목별 결과 목록}
+    """
+    entry_results = []
+    image_lookup = {}
+    # 폴더만 다르고 이름이 같은 이미지도 모두 해제할 수 있도록 저장한 이미지를 전부 기록: (항목 결과, 저장소 이름)
+    stored_images = []
+    created_count = 0
+
+    try:
+        with zipfile.ZipFile(file_path, 'r') as zip_ref:
+            entries = _archive_entries(zip_ref)
+            _validate_entries(entries)
+
+            for info in entries:
+                if info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    name = _store_image(zip_ref, info, store)
+                    image_lookup[os.path.basename(info.filename)] = name
+                    entry_result = {"file": info.filename, "status": "success", "message": "이미지를 저장했습니다."}
+                    entry_results.append(entry_result)
+                    stored_images.append((entry_result, name))
+
+            for info in entries:
+                if info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if not info.filename.lower().endswith(EXCEL_EXTENSIONS):
+                    entry_results.append({"file": info.filename, "status": "skipped", "message": "지원되지 않는 파일 형식입니다."})
+                    continue
+
+                try:
+                    result = process_excel_and_save_to_db(_read_member(zip_ref, info), store.store_id, image_lookup=image_lookup)
+                    created_count += result["created_count"]
+                    entry_results.append({"file": info.filename, "status": "success", "message": "엑셀 파일이 성공적으로 처리되었습니다.", **result})
+                except ExcelImportError as e:
+                    logger.warning(f"엑셀 데이터 검증 실패: {info.filename}, 오류: {e.errors}")
+                    entry_results.append({"file": info.filename, "status": "error", "message": str(e), "errors": e.errors})
+    finally:
+        _release_stored_images(store, stored_images)
+
+    images = sum(1 for entry_result, _ in stored_images if entry_result["status"] == "success")
+    return {"images": images, "created_count": created_count, "entries": entry_results}
+
+
+def _release_stored_images(store, stored_images):
+    """
+    압축 파일에서 저장한 이미지의 참조를 해제하는 함수. 메뉴에 연결되지 않은 이미지는 해제 전에 업로드 폴더에 보관한다.
+    """
+    storage = Menu._meta.get_field('image').storage
+    names = [name for _, name in stored_images]
+    linked = set(Menu.objects.filter(store=store, image__in=names).values_list('image', flat=True)) if names else set()
+
+    for entry_result, name in stored_images:
+        if name not in linked:
+            try:
+                with storage.open(name, 'rb') as image_file:
+                    keep_upload_image(store.store_id, entry_result["file"], File(image_file))
+                entry_result["message"] = "메뉴에 연결되지 않은 이미지를 업로드 폴더에 보관했습니다."
+            except Exception as e:
+                logger.error(f"압축 파일 이미지 보관 실패: {entry_result['file']}, 오류: {e}")
+                entry_result.update(status="skipped", message="메뉴에 연결되지 않은 이미지를 보관하지 못했습니다.")
+        storage.delete(name)
@@ -2,7 +2,6 @@
 import os
 import sys
 import django
-import requests
 from django.db import transaction
 from django.utils import timezone
 
@@ -16,7 +15,7 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "faq_backend.settings")
 # ✅ Django 초기화
 django.setup()
 
-from faq.utils import get_portone_access_token
+from faq.gateways import GatewayError, get_portone_gateway
 from faq.models import BillingKey, Subscription, PaymentHistory, User
 from faq.views.auth_views import DeactivateAccountView
 
@@ -31,17 +30,15 @@ def deactivate_expired_billing_keys():
         print("✅ 비활성화할 BillingKey가 없습니다.")
         return
 
-    access_token = get_portone_access_token()
+    gateway = get_portone_gateway()
 
     with transaction.atomic():
         for key in expired_keys:
-            cancel_url = "https://api.iamport.kr/subscribe/payments/unschedule"
-            cancel_response = requests.post(
-                cancel_url,
-                json={"customer_uid": key.customer_uid},
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            print(f"🛑 포트원 예약 결제 취소 응답: {cancel_response.json()}")
+            try:
+                gateway.unschedule_payments(key.customer_uid)
+                print(f"🛑 포트원 예약 결제 취소 완료: {key.customer_uid}")
+            except GatewayError as e:
+                print(f"🛑 포트원 예약 결제 취소 응답: {e}")
 
             canceled_payments = PaymentHistory.objects.filter(
                 user=key.user, billing_key=key, status="scheduled"
@@ -1,94 +1,177 @@
 import os
-import shutil
+from collections import Counter
+from decimal import Decimal
 from django.core.files import File
+from django.db import transaction
 import pandas as pd
+from .image_variants import schedule_menu_image_variants
 from .models import Menu, Store
+from .menu_snapshot import rebuild_menu_price
 import logging
-import json  # JSON 변환을 위한 import
-from django.conf import settings
 
 # 디버깅을 위한 로거 설정
 logger = logging.getLogger('faq')
 
-def process_excel_and_save_to_db(file_path, store_id):
+# 엑셀 열 이름 → Menu 필드
+REQUIRED_COLUMNS = ['메뉴명', '가격']
+OPTIONAL_COLUMNS = {
+    '간단한 소개(50자 이내)': 'menu_introduction',
+    '알레르기 유발물질': 'allergy',
+    '원산지': 'origin',
+}
+DEFAULT_CATEGORY = "기본 카테고리"  # 카테고리가 한 번도 지정되지 않은 경우 사용할 값
+SPICY_VALUES = {value for value, _ in Menu.SPICY_CATEGORIES}
+BULK_CREATE_BATCH_SIZE = 500
+
+
+class ExcelImportError(ValueError):
+    """
+    엑셀 데이터 검증 실패. errors에 행별 오류 메시지 목록을 담는다.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"엑셀 데이터 {len(errors)}건의 오류가 있습니다.")
+
+
+def _text_or_none(value):
+    return None if pd.isna(value) else str(value).strip()
+
+
+def _spicy_value(value):
+    # 엑셀에서 숫자로 읽힌 값(1, 1.0)도 "1"로 변환
+    if pd.isna(value) or value == '':
+        return "0"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def load_menu_rows(file_path):
+    """
+    엑셀 파일(경로 또는 파일 객체)을 읽어 검증된 메뉴 행 DataFrame을 반환하는 함수.
+
+    - 메뉴명이 없는 행은 건너뛴다.
+    - 카테고리가 비어 있으면 이전 행의 카테고리를, 이전 행도 없으면 기본 카테고리를 사용한다.
+    - 모든 행을 먼저 검증하고, 오류가 하나라도 있으면 ExcelImportError를 발생시킨다.
+    """
+    # 첫 번째 시트를 기준으로, 두 번째 행을 헤더로 처리
+    df = pd.read_excel(file_path, header=1)
+
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing_columns:
+        raise ExcelImportError([f"필수 열이 없습니다: {', '.join(missing_columns)}"])
+
+    df = df[df['메뉴명'].notna()].copy()
+    # 엑셀 행 번호(헤더 2행 + 1부터 시작)를 오류 메시지에 사용
+    df['row_number'] = df.index + 3
+
+    category = df['카테고리'] if '카테고리' in df.columns else pd.Series(index=df.index, dtype=object)
+    df['category'] = category.ffill().fillna(DEFAULT_CATEGORY).astype(str).str.strip()
+    df['name'] = df['메뉴명'].astype(str).str.strip()
+    df['price'] = pd.to_numeric(df['가격'], errors='coerce')
+    df['spicy'] = df['맵기'].map(_spicy_value) if '맵기' in df.columns else "0"
+    for column, field in OPTIONAL_COLUMNS.items():
+        df[field] = df[column].map(_text_or_none) if column in df.columns else None
+    df['image_path'] = df['사진'].map(_text_or_none) if '사진' in df.columns else None
+
+    checks = [
+        (df['price'].isna() | (df['price'] < 0), "가격이 올바르지 않습니다."),
+        (df['name'].str.len() > Menu._meta.get_field('name').max_length, "메뉴명이 너무 깁니다."),
+        (df['category'].str.len() > Menu._meta.get_field('category').max_length, "카테고리가 너무 깁니다."),
+        (~df['spicy'].isin(SPICY_VALUES), "맵기 값은 0~5 중 하나여야 합니다."),
+    ]
+    errors = sorted(
+        (row_number, message)
+        for invalid, message in checks
+        for row_number in df.loc[invalid, 'row_number']
+    )
+    if errors:
+        raise ExcelImportError([f"{row_number}행: {message}" for row_number, message in errors])
+
+    return df
+
+
+def _attach_images(menus, image_paths, image_lookup=None):
+    """
+    메뉴 이미지를 저장소에 한 번씩만 복사하는 함수. 같은 이미지를 쓰는 메뉴는 저장된 파일을 공유한다.
+    image_lookup({파일 이름: 저장소 파일 이름})에 있는 이미지는 복사하지 않고 저장된 파일을 연결한다.
+
+    :return: 새로 저장된 파일 이름 목록 (파일마다 참조 하나. DB 저장 실패 시 정리용)
+    """
+    image_lookup = image_lookup or {}
+    stored_names = {}
+    for menu, image_path in zip(menus, image_paths):
+        if not image_path:
+            continue
+        if os.path.basename(image_path) in image_lookup:
+            menu.image.name = image_lookup[os.path.basename(image_path)]
+            continue
+        if not os.path.exists(image_path):
+            continue
+
+        if image_path not in stored_names:
+            with open(image_path, 'rb') as image_file:
+                menu.image.save(os.path.basename(image_path), File(image_file), save=False)
+            stored_names[image_path] = menu.image.name
+        else:
+            menu.image.name = stored_names[image_path]
+    return list(stored_names.values())
+
+
+def _retain_shared_images(menus, stored_images):
+    """
+    메뉴마다 이미지 참조를 하나씩 갖도록 참조를 더하는 함수.
+    새로 저장한 파일은 저장할 때 생긴 참조 하나를 첫 메뉴가 갖고, 나머지 메뉴와 image_lookup으로 연결한 메뉴의 참조를 더한다.
+    """
+    extra_refs = Counter(menu.image.name for menu in menus if menu.image)
+    extra_refs.subtract(stored_images)
+    storage = Menu._meta.get_field('image').storage
+    for name, count in extra_refs.items():
+        storage.retain(name, count)
+
+
+def process_excel_and_save_to_db(file_path, store_id, image_lookup=None):
     """
     엑셀 파일을 읽어와서 DB에 저장하는 함수.
-    엑셀 파일에 이미지 경로가 포함되어 있다면 해당 이미지를 /media/menu_images/로 복사하여 DB에 저장.
+    엑셀 파일에 이미지 경로가 포함되어 있다면 해당 이미지를 메뉴 이미지 저장소로 복사하여 DB에 저장.
+    메뉴는 한 트랜잭션에서 bulk_create로 저장하고, Store.menu_price는 마지막에 한 번만 다시 만든다.
+
+    :param file_path: 엑셀 파일 경로 또는 파일 객체
+    :param image_lookup: 이미 저장소에 저장된 이미지 {파일 이름: 저장소 파일 이름} (ZIP 업로드)
+    :return: {"created_count": 생성된 메뉴 수}
     """
+    store = Store.objects.get(store_id=store_id)
+    df = load_menu_rows(file_path)
+
+    menus = [
+        Menu(
+            store=store,
+            name=row.name,
+            price=Decimal(str(row.price)),
+            category=row.category,
+            menu_introduction=row.menu_introduction,
+            spicy=row.spicy,
+            allergy=row.allergy,
+            origin=row.origin,
+        )
+        for row in df.itertuples()
+    ]
+
+    stored_images = _attach_images(menus, df['image_path'], image_lookup)
     try:
-        # 엑셀 파일을 읽어오기 (첫 번째 시트를 기준으로, 첫 번째 행은 헤더로 처리)
-        df = pd.read_excel(file_path, header=1)
-        #logger.debug(f"df.head(): {df.head()}")
-
-        # store 객체 가져오기
-        store = Store.objects.get(store_id=store_id)
-
-        # 기존의 menu_price 데이터를 불러오기 (비어있을 경우 빈 리스트로 처리)
-        if store.menu_price:
-            try:
-                menu_list = json.loads(store.menu_price)
-            except json.JSONDecodeError:
-                logger.error("menu_price 필드가 유효한 JSON 형식이 아닙니다. 빈 리스트로 초기화합니다.")
-                menu_list = []
-        else:
-            menu_list = []
-
-        # 기본값 설정
-        default_category = "기본 카테고리"  # 기본값으로 사용할 카테고리 이름
-        last_category = default_category  # 이전 행의 카테고리 값을 저장
-
-        # 엑셀 데이터 행별로 처리하여 Menu 테이블에 저장
-        for _, row in df.iterrows():
-            #logger.debug(f"Processing row: {row}")  # 각 행의 데이터 출력
-            if pd.isnull(row['메뉴명']):
-                continue  # '메뉴명'이 없는 경우 해당 행을 건너뜀
-
-            # 카테고리 값이 비어 있으면 이전 행의 카테고리 값 사용, 이전 행도 없으면 기본값 사용
-            category = row['카테고리'] if pd.notna(row['카테고리']) else last_category
-            last_category = category  # 다음 행을 위해 현재 행의 카테고리 값을 저장
-
-            menu = Menu(
-                store=store,
-                name=row['메뉴명'],
-                price=row['가격'],
-                category=category,  # 수정된 카테고리 값 사용
-                menu_introduction=row['간단한 소개(50자 이내)'],
-                spicy=row['맵기'],
-                allergy=row['알레르기 유발물질'],
-                origin=row['원산지']
-            )
-
-            # 이미지 경로가 있을 경우 처리
-            image_path = row.get('사진', None)  # '사진' 열에서 이미지 경로를 가져옴
-            if pd.notna(image_path) and isinstance(image_path, str) and os.path.exists(image_path):
-                # 이미지 파일을 /media/menu_images/로 복사하여 Django ImageField에 저장
-                new_image_path = os.path.join('menu_images', os.path.basename(image_path))
-                destination_path = os.path.join(settings.MEDIA_ROOT, new_image_path)
-                
-                # 이미지 복사
-                shutil.copy(image_path, destination_path)
-
-                # 파일을 ImageField에 저장
-                with open(destination_path, 'rb') as image_file:
-                    menu.image.save(os.path.basename(image_path), File(image_file), save=False)
-
-            # 메뉴 객체를 저장
-            menu.save()
-            #logger.debug(f"Saved menu: {menu}")
-
-            # 새로운 메뉴 정보를 리스트에 추가
-            menu_list.append({
-                'name': menu.name,
-                'price': menu.price,
-                'category': menu.category
-            })
-
-        # 업데이트된 메뉴 리스트를 JSON으로 변환하여 store의 menu_price에 저장
-        store.menu_price = json.dumps(menu_list, ensure_ascii=False)  # ensure_ascii=False로 한글도 처리 가능
-        store.save()
-        #logger.debug(f"메뉴 정보를 store.menu_price에 저장: {store.menu_price}")
-
-        #logger.debug(f"엑셀 데이터를 성공적으로 처리하고 저장했습니다.")
-
-    except Exception as e:
-        logger.debug(f"엑셀 파일 처리 중 오류 발생: {e}")
+        with transaction.atomic():
+            Menu.objects.bulk_create(menus, batch_size=BULK_CREATE_BATCH_SIZE)
+            # 트랜잭션 안에서 더하므로 저장에 실패하면 함께 롤백됨
+            _retain_shared_images(menus, stored_images)
+            rebuild_menu_price(store)
+            schedule_menu_image_variants(menus)
+    except Exception:
+        # DB 저장에 실패하면 복사해 둔 이미지의 참조도 함께 해제
+        storage = Menu._meta.get_field('image').storage
+        for name in stored_images:
+            storage.delete(name)
+        raise
+
+    logger.debug(f"엑셀 메뉴 {len(menus)}개를 저장했습니다. (store_id={store_id})")
+    return {"created_count": len(menus)}
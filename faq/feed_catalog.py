@@ -0,0 +1,165 @@
+# feed_catalog.py
+# 매장 피드 이미지 목록(FeedImage) 관리. 업로드/이름 변경/삭제 시 갱신하고, 목록은 DB에서 페이지 단위로 조회
+import logging
+import os
+import uuid
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Max
+from .image_variants import variant_urls
+from .media_storage import media_storage
+from .models import FeedImage
+
+logger = logging.getLogger('faq')
+
+FEED_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 200
+
+
+def feed_dir(store_id):
+    """
+    MEDIA_ROOT 기준 피드 폴더 상대 경로를 반환하는 함수.
+    """
+    return f"uploads/store_{store_id}/feed"
+
+
+def feed_image_entry(image):
+    """
+    FeedImage를 목록 응답 항목(dict)으로 변환하는 함수.
+    """
+    return {
+        'id': str(image.image_uuid),
+        'name': image.name,
+        'ext': image.ext,
+        'path': image.path,
+        'stored_name': os.path.basename(image.path),
+        'size': image.size,
+        'width': image.width,
+        'height': image.height,
+        'order': image.sort_order,
+        'variants': variant_urls(image.path),
+    }
+
+
+def image_dimensions(file_path):
+    """
+    이미지의 (가로, 세로) 크기를 반환하는 함수. 읽을 수 없으면 (None, None).
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(file_path) as image:
+            return image.size
+    except (OSError, UnidentifiedImageError):
+        return None, None
+
+
+def _next_sort_order(store_id):
+    last = FeedImage.objects.filter(store_id=store_id).aggregate(last=Max('sort_order'))['last']
+    return 0 if last is None else last + 1
+
+
+def save_feed_image(store_id, file):
+    """
+    업로드된 피드 이미지를 저장하고 FeedImage를 생성하는 함수.
+
+    :param file: request.FILES의 UploadedFile
+    :return: 생성된 FeedImage
+    """
+    name, ext = os.path.splitext(os.path.basename(file.name))
+    image_uuid = uuid.uuid4()
+    # 같은 내용의 이미지는 한 파일만 저장 (faq.media_storage)
+    relative_path = media_storage.save(f"{feed_dir(store_id)}/{name}_{image_uuid}{ext}", file)
+
+    width, height = image_dimensions(media_storage.path(relative_path))
+    return FeedImage.objects.create(
+        store_id=store_id,
+        image_uuid=image_uuid,
+        name=name,
+        ext=ext,
+        path=relative_path,
+        size=file.size,
+        width=width,
+        height=height,
+        sort_order=_next_sort_order(store_id),
+    )
+
+
+def find_feed_image(store_id, image_id):
+    """
+    피드 이미지 id(uuid) 또는 저장된 파일 이름으로 FeedImage를 찾는 함수. 없으면 None.
+    """
+    try:
+        return FeedImage.objects.filter(store_id=store_id, image_uuid=uuid.UUID(str(image_id))).first()
+    except ValueError:
+        return FeedImage.objects.filter(store_id=store_id, path__endswith=f"/{os.path.basename(image_id)}").first()
+
+
+def delete_feed_image(image):
+    """
+    FeedImage를 삭제하고 파일 참조를 해제하는 함수. (다른 곳에서 같은 파일을 참조하면 파일은 남음)
+    """
+    media_storage.delete(image.path)
+    image.delete()
+
+
+def list_feed_images(store_id, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    매장 피드 이미지 목록을 정렬 순서대로 페이지 단위로 반환하는 함수.
+    """
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    queryset = FeedImage.objects.filter(store_id=store_id).order_by('sort_order', 'id')
+    page_obj = Paginator(queryset, page_size).get_page(page)
+    return {
+        'images': [feed_image_entry(image) for image in page_obj],
+        'count': page_obj.paginator.count,
+        'page': page_obj.number,
+        'page_size': page_size,
+        'has_next': page_obj.has_next(),
+    }
+
+
+def register_existing_feed_files(store_id):
+    """
+    피드 폴더에는 있지만 FeedImage가 없는 이미지 파일을 등록하는 함수. (기존 데이터 이전용)
+    파일 이름({이름}_{uuid}{확장자})의 uuid를 그대로 id로 사용한다.
+
+    :return: 새로 등록한 개수
+    """
+    directory = os.path.join(settings.MEDIA_ROOT, feed_dir(store_id))
+    if not os.path.isdir(directory):
+        return 0
+
+    known_paths = set(FeedImage.objects.filter(store_id=store_id).values_list('path', flat=True))
+    sort_order = _next_sort_order(store_id)
+    new_images = []
+    for file in sorted(os.listdir(directory), key=lambda f: os.path.getmtime(os.path.join(directory, f))):
+        relative_path = f"{feed_dir(store_id)}/{file}"
+        if not file.lower().endswith(FEED_IMAGE_EXTENSIONS) or relative_path in known_paths:
+            continue
+
+        stem, ext = os.path.splitext(file)
+        name, _, uuid_part = stem.rpartition('_')
+        try:
+            image_uuid = uuid.UUID(uuid_part)
+        except ValueError:
+            name, image_uuid = stem, uuid.uuid4()
+
+        file_path = os.path.join(directory, file)
+        width, height = image_dimensions(file_path)
+        new_images.append(FeedImage(
+            store_id=store_id,
+            image_uuid=image_uuid,
+            name=name,
+            ext=ext,
+            path=relative_path,
+            size=os.path.getsize(file_path),
+            width=width,
+            height=height,
+            sort_order=sort_order,
+        ))
+        sort_order += 1
+
+    FeedImage.objects.bulk_create(new_images, ignore_conflicts=True)
+    return len(new_images)
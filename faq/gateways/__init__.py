@@ -0,0 +1,5 @@
+# __init__.py
+# 결제 게이트웨이(포트원, KCP) 클라이언트. 연결 재사용, 멱등 요청 재시도, 호출 지연 시간 지표
+from .base import GatewayClient, GatewayError, GatewayMetrics, gateway_metrics
+from .kcp import KcpGateway, get_kcp_gateway
+from .portone import PortOneGateway, get_portone_gateway
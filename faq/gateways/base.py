@@ -0,0 +1,152 @@
+# base.py
+# 결제 게이트웨이 클라이언트 공통 부분: 오류 타입, 재시도(백오프), 호출 지연 시간 지표
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http_client import CircuitOpenError, HttpClientError, get_http_client
+
+logger = logging.getLogger('faq')
+
+DEFAULT_MAX_ATTEMPTS = int(os.environ.get('GATEWAY_MAX_ATTEMPTS', 3))
+DEFAULT_BACKOFF_BASE = float(os.environ.get('GATEWAY_BACKOFF_BASE', 0.2))  # 초
+DEFAULT_BACKOFF_MAX = float(os.environ.get('GATEWAY_BACKOFF_MAX', 2.0))  # 초
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+METRIC_SAMPLE_SIZE = 1000
+
+
+class GatewayError(Exception):
+    """
+    결제 게이트웨이 호출 실패.
+
+    :param code: 게이트웨이 오류 코드 (포트원 code, KCP res_cd 등)
+    :param status_code: HTTP 상태 코드 (응답을 받지 못했으면 None)
+    """
+
+    def __init__(self, message, code=None, status_code=None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+class GatewayMetrics:
+    """
+    게이트웨이 호출별(제공자, 작업) 횟수/오류/지연 시간 집계. 최근 METRIC_SAMPLE_SIZE개로 백분위를 계산한다.
+    """
+
+    def __init__(self, sample_size=METRIC_SAMPLE_SIZE):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._retries = defaultdict(int)
+        self._samples = defaultdict(lambda: deque(maxlen=sample_size))
+
+    def record(self, provider, operation, latency, ok, attempts=1):
+        key = (provider, operation)
+        with self._lock:
+            self._counts[key] += 1
+            self._retries[key] += attempts - 1
+            if not ok:
+                self._errors[key] += 1
+            self._samples[key].append(latency)
+
+    def snapshot(self):
+        """
+        :return: {"portone.get_payment": {"count", "errors", "retries", "p50_ms", "p95_ms", "max_ms"}, ...}
+        """
+        with self._lock:
+            result = {}
+            for key, samples in self._samples.items():
+                ordered = sorted(samples)
+                result['.'.join(key)] = {
+                    'count': self._counts[key],
+                    'errors': self._errors[key],
+                    'retries': self._retries[key],
+                    'p50_ms': round(ordered[len(ordered) // 2] * 1000, 1),
+                    'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                    'max_ms': round(ordered[-1] * 1000, 1),
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._errors.clear()
+            self._retries.clear()
+            self._samples.clear()
+
+
+gateway_metrics = GatewayMetrics()
+
+
+class GatewayClient:
+    """
+    결제 게이트웨이 클라이언트 기본 클래스.
+
+    - 연결 재사용/타임아웃/서킷 브레이커는 공용 http_client를 사용한다.
+    - idempotent=True인 호출만 연결 오류, 타임아웃, 429/502/503/504에서 지수 백오프로 재시도한다.
+      (결제 승인처럼 중복 실행되면 안 되는 요청은 재시도하지 않음)
+    - 호출마다 provider/operation/status/latency를 로그로 남기고 gateway_metrics에 기록한다. 응답 본문은 남기지 않는다.
+    """
+    provider = None
+    default_base_url = ''
+
+    def __init__(self, base_url=None, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, metrics=gateway_metrics):
+        self.http = get_http_client(self.provider, base_url or self.default_base_url)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+
+    def _backoff(self, attempt):
+        # full jitter: 0 ~ min(max, base * 2^(attempt-1))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def request(self, operation, method, path, idempotent=False, **kwargs):
+        """
+        게이트웨이에 요청을 보내고 requests.Response를 반환하는 함수.
+
+        :raises GatewayError: 응답을 받지 못한 경우 (재시도 후)
+        """
+        attempts = self.max_attempts if idempotent else 1
+        started = time.monotonic()
+        response = None
+        error = None
+
+        for attempt in range(1, attempts + 1):
+            try:
+                response = self.http.request(method, path, **kwargs)
+                error = None
+            except CircuitOpenError as e:
+                error = e
+                break
+            except HttpClientError as e:
+                error = e
+
+            retryable = error is not None or response.status_code in RETRYABLE_STATUS_CODES
+            if not retryable or attempt == attempts:
+                break
+            time.sleep(self._backoff(attempt))
+
+        latency = time.monotonic() - started
+        status_code = response.status_code if error is None else None
+        ok = error is None and status_code < 400
+        self.metrics.record(self.provider, operation, latency, ok, attempt)
+        logger.info(
+            f"[gateway] provider={self.provider} op={operation} status={status_code or 'error'} "
+            f"latency_ms={latency * 1000:.1f} attempts={attempt}"
+        )
+
+        if error is not None:
+            raise GatewayError(f"{self.provider} {operation} 요청 실패: {error}") from error
+        return response
+
+    @staticmethod
+    def parse_json(response, operation):
+        try:
+            return response.json()
+        except ValueError as e:
+            raise GatewayError(f"{operation}: JSON 응답이 아닙니다.", status_code=response.status_code) from e
@@ -0,0 +1,182 @@
+# fake.py
+# 오프라인 부하 테스트용 프로세스 내 가짜 결제 게이트웨이 서버 (포트원 + KCP 일부 API)
+#
+# 사용 예:
+#     with FakeGatewayServer(latency=(0.01, 0.05), failure_rate=0.02) as fake:
+#         settings.HTTP_CLIENT_BASE_URLS = {'portone': fake.base_url, 'kcp': fake.base_url}
+#         ...
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class _FakeGatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length).decode('utf-8') if length else ''
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(raw or '{}')
+        return {key: values[0] for key, values in parse_qs(raw).items()}
+
+    def _handle(self, method):
+        fake = self.server.fake
+        body = self._read_body() if method == 'POST' else {}
+        fake.counts[f'{method} {self.path.split("?")[0]}'] += 1
+
+        low, high = fake.latency
+        if high:
+            time.sleep(random.uniform(low, high))
+        if fake.failure_rate and random.random() < fake.failure_rate:
+            self._send(503, {'code': -1, 'message': 'fake failure'})
+            return
+
+        status, payload = fake.route(method, self.path, body, self.headers.get('Authorization'))
+        self._send(status, payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+class FakeGatewayServer:
+    """
+    포트원/KCP API를 흉내 내는 로컬 HTTP 서버. 백그라운드 스레드에서 실행된다.
+
+    :param latency: 응답 지연 범위(초) (최소, 최대)
+    :param failure_rate: 503을 반환할 확률 (0~1)
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=(0, 0), failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.counts = Counter()
+        self.scheduled = {}  # merchant_uid → schedule
+        self._tokens = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _FakeGatewayHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ── 라우팅 ──────────────────────────────────────────────
+    def route(self, method, path, body, authorization):
+        path = path.split('?')[0]
+        if path == '/gw/enc/v1/payment':
+            return self._kcp(body)
+        if path == '/users/getToken':
+            return self._issue_token()
+
+        token = (authorization or '').replace('Bearer ', '')
+        with self._lock:
+            authorized = token in self._tokens
+        if not authorized:
+            return 401, {'code': -1, 'message': 'Unauthorized'}
+
+        if method == 'GET' and path.startswith('/payments/'):
+            return 200, {'code': 0, 'response': self._payment(path.rsplit('/', 1)[-1])}
+        if method == 'GET' and path.startswith('/subscribe/customers/'):
+            customer_uid = path.rsplit('/', 1)[-1]
+            return 200, {'code': 0, 'response': {
+                'customer_uid': customer_uid, 'card_name': '가짜카드', 'card_number': '1234********5678',
+            }}
+        if method == 'GET' and path.startswith('/subscribe/payments/schedule/'):
+            with self._lock:
+                schedule = self.scheduled.get(path.rsplit('/', 1)[-1])
+            if schedule is None:
+                return 404, {'code': 1, 'message': '예약 정보가 없습니다.'}
+            return 200, {'code': 0, 'response': {**schedule, 'schedule_status': 'scheduled'}}
+        if path == '/subscribe/payments/schedule':
+            return self._schedule(body)
+        if path == '/subscribe/payments/unschedule':
+            return self._unschedule(body)
+        return 404, {'code': -1, 'message': f'unknown path {path}'}
+
+    def _issue_token(self):
+        now = int(time.time())
+        token = f'fake-token-{random.getrandbits(64):016x}'
+        with self._lock:
+            self._tokens.add(token)
+        return 200, {'code': 0, 'response': {'access_token': token, 'now': now, 'expired_at': now + 1800}}
+
+    @staticmethod
+    def _payment(imp_uid):
+        return {
+            'imp_uid': imp_uid,
+            'merchant_uid': f'BASIC_{imp_uid}',
+            'customer_uid': f'customer_{imp_uid}',
+            'amount': 9900,
+            'status': 'paid',
+            'success': True,
+            'pg_provider': 'fake',
+        }
+
+    def _schedule(self, body):
+        schedules = body.get('schedules', [])
+        with self._lock:
+            duplicates = [s['merchant_uid'] for s in schedules if s['merchant_uid'] in self.scheduled]
+            if duplicates:
+                return 200, {'code': 1, 'message': f'이미 예약된 merchant_uid: {duplicates[0]}'}
+            for schedule in schedules:
+                self.scheduled[schedule['merchant_uid']] = {**schedule, 'customer_uid': body.get('customer_uid')}
+        return 200, {'code': 0, 'response': [
+            {**schedule, 'customer_uid': body.get('customer_uid'), 'schedule_status': 'scheduled'}
+            for schedule in schedules
+        ]}
+
+    def _unschedule(self, body):
+        customer_uid = body.get('customer_uid')
+        merchant_uids = set(body.get('merchant_uid') or [])
+        with self._lock:
+            removed = [
+                uid for uid, schedule in self.scheduled.items()
+                if schedule['customer_uid'] == customer_uid and (not merchant_uids or uid in merchant_uids)
+            ]
+            for uid in removed:
+                del self.scheduled[uid]
+        return 200, {'code': 0, 'response': [{'merchant_uid': uid, 'schedule_status': 'revoked'} for uid in removed]}
+
+    @staticmethod
+    def _kcp(body):
+        if body.get('action') == 'pay':
+            return 200, {'result': 'success', 'res_cd': '0000', 'order_no': body.get('order_no')}
+        key = f'fake-batch-{random.getrandbits(48):012x}'
+        return 200, {'res_cd': '0000', 'res_msg': '정상처리', 'billing_key': key, 'batch_key': key}
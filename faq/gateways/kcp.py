@@ -0,0 +1,90 @@
+# kcp.py
+# KCP 배치키(빌링키) 발급 및 정기 결제 API 클라이언트
+import threading
+from django.conf import settings
+from .base import GatewayClient, GatewayError
+
+KCP_API_BASE_URL = 'https://stg-spl.kcp.co.kr'
+KCP_PAYMENT_PATH = '/gw/enc/v1/payment'
+KCP_BATCH_KEY_TRAN_CD = '00300001'  # 배치키(빌링키) 발급 트랜잭션 코드
+KCP_SUCCESS_CODE = '0000'
+
+
+class KcpGateway(GatewayClient):
+    """
+    KCP 배치키 발급과 정기 결제 요청.
+    모두 상태를 바꾸는 요청이므로 재시도하지 않는다. res_cd가 0000이 아니면 GatewayError를 발생시킨다.
+    """
+    provider = 'kcp'
+
+    def __init__(self, **options):
+        options.setdefault('base_url', getattr(settings, 'KCP_API_BASE_URL', KCP_API_BASE_URL))
+        super().__init__(**options)
+
+    def _post(self, operation, payload, as_json=True):
+        body = {'json': payload} if as_json else {'data': payload}
+        response = self.request(operation, 'POST', KCP_PAYMENT_PATH, **body)
+        return self.parse_json(response, operation)
+
+    def _checked(self, operation, result):
+        if result.get('res_cd') != KCP_SUCCESS_CODE:
+            raise GatewayError(f"KCP {operation} 실패: {result.get('res_msg')}", code=result.get('res_cd'))
+        return result
+
+    def issue_billing_key(self, approval_key, order_no):
+        """
+        결제창 승인 키로 빌링키를 발급받는 함수.
+
+        :return: KCP 응답(dict, billing_key 포함)
+        """
+        return self._checked('issue_billing_key', self._post('issue_billing_key', {
+            'tran_cd': KCP_BATCH_KEY_TRAN_CD,
+            'site_cd': settings.KCP_SITE_CD,
+            'approval_key': approval_key,
+            'order_no': order_no,
+        }))
+
+    def issue_batch_key(self, kcp_cert_info, enc_data, enc_info):
+        """
+        인증 데이터로 배치키를 발급받는 함수.
+
+        :return: KCP 응답(dict, batch_key 포함)
+        """
+        return self._checked('issue_batch_key', self._post('issue_batch_key', {
+            'tran_cd': KCP_BATCH_KEY_TRAN_CD,
+            'kcp_cert_info': kcp_cert_info,
+            'site_cd': settings.KCP_TEST_SITE_CD,
+            'enc_data': enc_data,
+            'enc_info': enc_info,
+        }))
+
+    def pay(self, order_no, billing_key, amount):
+        """
+        빌링키로 정기 결제를 요청하는 함수.
+
+        :return: KCP 응답(dict). 성공 여부는 result == "success"
+        """
+        return self._post('pay', {
+            'site_cd': settings.KCP_SITE_CD,
+            'order_no': order_no,
+            'billing_key': billing_key,
+            'amount': amount,
+            'currency': 'KRW',
+            'action': 'pay',
+        }, as_json=False)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_kcp_gateway():
+    """
+    프로세스 공용 KcpGateway 인스턴스를 반환하는 함수.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = KcpGateway()
+    return _gateway
@@ -0,0 +1,119 @@
+# portone.py
+# 포트원(아임포트) REST API 클라이언트
+import threading
+from ..portone_token import PORTONE_API_BASE_URL, PortOneTokenError, get_portone_token_manager
+from .base import GatewayClient, GatewayError
+
+
+class PortOneGateway(GatewayClient):
+    """
+    포트원 결제 조회, 빌링키 고객 조회, 정기 결제 예약/취소.
+
+    - 액세스 토큰은 faq.portone_token의 캐시된 토큰을 사용한다. 401을 받으면 토큰을 버리고 한 번 다시 시도한다.
+    - 응답의 code가 0이 아니면 GatewayError를 발생시킨다. 토큰 발급 실패(PortOneTokenError)도 GatewayError로 바꾼다.
+    """
+    provider = 'portone'
+    default_base_url = PORTONE_API_BASE_URL
+
+    def __init__(self, token_manager=None, **options):
+        super().__init__(**options)
+        self.token_manager = token_manager or get_portone_token_manager()
+
+    def _token(self, operation):
+        try:
+            return self.token_manager.get_token()
+        except PortOneTokenError as e:
+            raise GatewayError(f"포트원 {operation} 실패: {e}") from e
+
+    def _call(self, operation, method, path, idempotent=False, **kwargs):
+        extra_headers = kwargs.pop('headers', {})
+        for auth_attempt in range(2):
+            headers = {**extra_headers, 'Authorization': f"Bearer {self._token(operation)}"}
+            response = self.request(operation, method, path, idempotent=idempotent, headers=headers, **kwargs)
+            if response.status_code != 401 or auth_attempt:
+                break
+            # 만료/폐기된 토큰: 캐시를 비우고 새 토큰으로 한 번 더 시도
+            self.token_manager.invalidate()
+
+        result = self.parse_json(response, operation)
+        if response.status_code >= 400 or result.get('code') != 0:
+            raise GatewayError(
+                f"포트원 {operation} 실패: {result.get('message')}",
+                code=result.get('code'), status_code=response.status_code,
+            )
+        return result.get('response')
+
+    def get_payment(self, imp_uid):
+        """
+        결제 정보를 조회하는 함수.
+
+        :return: 포트원 결제 정보(dict)
+        """
+        return self._call('get_payment', 'GET', f'/payments/{imp_uid}', idempotent=True)
+
+    def get_billing_customer(self, customer_uid):
+        """
+        빌링키(정기 결제 고객) 정보를 조회하는 함수.
+
+        :return: 카드 정보 등(dict)
+        """
+        return self._call('get_billing_customer', 'GET', f'/subscribe/customers/{customer_uid}', idempotent=True)
+
+    def schedule_payments(self, customer_uid, schedules):
+        """
+        정기 결제를 예약하는 함수. (merchant_uid 단위로 중복 예약이 거부되므로 재시도하지 않음)
+
+        :param schedules: [{"merchant_uid", "schedule_at", "amount", "name", ...}, ...]
+        :return: 예약 결과 목록
+        """
+        return self._call(
+            'schedule_payments', 'POST', '/subscribe/payments/schedule',
+            json={'customer_uid': customer_uid, 'schedules': schedules},
+        )
+
+    def get_schedule(self, merchant_uid):
+        """
+        merchant_uid로 예약 결제 정보를 조회하는 함수.
+
+        :return: 예약 정보(dict, schedule_status 포함)
+        """
+        return self._call('get_schedule', 'GET', f'/subscribe/payments/schedule/{merchant_uid}', idempotent=True)
+
+    def are_scheduled(self, merchant_uids):
+        """
+        merchant_uid가 모두 포트원에 예약되어 있는지 확인하는 함수. (중복 예약 거부 시 이전 예약 확인용)
+        """
+        try:
+            return all(
+                (self.get_schedule(uid) or {}).get('schedule_status') == 'scheduled'
+                for uid in merchant_uids
+            )
+        except GatewayError:
+            return False
+
+    def unschedule_payments(self, customer_uid, merchant_uids=None):
+        """
+        예약된 정기 결제를 취소하는 함수. 같은 요청을 반복해도 결과가 같으므로 재시도한다.
+
+        :param merchant_uids: 취소할 merchant_uid 목록 (없으면 해당 고객의 모든 예약)
+        """
+        payload = {'customer_uid': customer_uid}
+        if merchant_uids:
+            payload['merchant_uid'] = list(merchant_uids)
+        return self._call('unschedule_payments', 'POST', '/subscribe/payments/unschedule', idempotent=True, json=payload)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_portone_gateway():
+    """
+    프로세스 공용 PortOneGateway 인스턴스를 반환하는 함수.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = PortOneGateway()
+    return _gateway
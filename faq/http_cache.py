@@ -0,0 +1,85 @@
+# http_cache.py
+# QR 스캔으로 호출되는 공개(slug) API용 조건부 GET(ETag/Last-Modified)과 응답 캐시
+#
+# - ETag와 캐시 키는 Store.updated_at, menu_version, feed_version으로 만든다.
+#   매장/메뉴/피드가 바뀌면 버전이 바뀌므로 예전 캐시는 조회되지 않고 만료 시간이 지나면 사라진다.
+# - If-None-Match(또는 If-Modified-Since)가 현재 버전과 같으면 본문 없이 304를 반환한다.
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from .models import Store
+
+logger = logging.getLogger('faq')
+
+CACHE_KEY_PREFIX = 'public_store'
+
+
+def _timeout():
+    return getattr(settings, 'PUBLIC_STORE_CACHE_TIMEOUT', 300)
+
+
+def store_version(store):
+    """
+    공개 응답에 영향을 주는 매장 상태를 문자열 하나로 반환하는 함수.
+    """
+    updated_at = store.updated_at.timestamp() if store.updated_at else 0
+    return f"{store.store_id}:{updated_at}:{store.menu_version}:{store.feed_version}"
+
+
+def _version_digest(store, endpoint):
+    return hashlib.sha1(f"{endpoint}:{store_version(store)}".encode('utf-8')).hexdigest()
+
+
+def bump_feed_version(store_id):
+    """
+    피드 이미지가 바뀌었을 때 호출. 피드 응답의 ETag와 캐시 키가 바뀐다.
+    (If-Modified-Since만 보내는 클라이언트를 위해 updated_at도 함께 갱신)
+    """
+    Store.objects.filter(store_id=store_id).update(feed_version=F('feed_version') + 1, updated_at=timezone.now())
+
+
+def touch_store(store_id):
+    """
+    매장 응답에 포함되는 파생 데이터(이미지 썸네일 등)가 바뀌었을 때 호출. 매장 응답의 ETag와 캐시 키가 바뀐다.
+    """
+    Store.objects.filter(store_id=store_id).update(updated_at=timezone.now())
+
+
+def cached_store_response(request, store, endpoint, build_payload):
+    """
+    매장 버전 기반으로 304 또는 캐시된 JSON 본문을 반환하는 함수.
+
+    :param store: 응답 대상 Store
+    :param endpoint: 응답 종류 (예: 'detail', 'menus', 'feed')
+    :param build_payload: 캐시가 없을 때 응답 데이터를 만드는 함수
+    :return: HttpResponse (200 또는 304)
+    """
+    digest = _version_digest(store, endpoint)
+    etag = f'"{digest}"'
+    last_modified = int(store.updated_at.timestamp()) if store.updated_at else None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    cache_key = f"{CACHE_KEY_PREFIX}:{endpoint}:{digest}"
+    body = cache.get(cache_key)
+    if body is None:
+        body = JSONRenderer().render(build_payload())
+        cache.set(cache_key, body, _timeout())
+
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # 브라우저/QR 앱이 매번 재검증하도록 하여 변경 사항이 바로 보이게 함
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,193 @@
+# image_variants.py
+# 업로드 이미지(메뉴/배너/프로필/피드)의 크기별 WebP 파생 이미지 생성. 요청 스레드 밖(스레드 풀)에서 실행
+#
+# - 원본 옆 variants/ 폴더에 {파일명.확장자}_{크기}.webp로 저장한다. (예: menu_images/store_1/variants/coffee.jpg_thumb.webp)
+#   확장자까지 넣어 이름만 같은 coffee.jpg와 coffee.png의 파생 이미지가 겹치지 않게 한다.
+# - EXIF 회전 정보를 반영한 뒤 EXIF 없이 다시 인코딩한다.
+# - 파생 이미지가 이미 있으면 다시 만들지 않는다.
+# - 원본별로 만들어진 파생 이미지 목록을 캐시에 기록해 두고, 응답을 만들 때 저장소를 확인하지 않고 재사용한다.
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+logger = logging.getLogger('faq')
+
+# 파생 이미지 이름 → 최대 가로/세로 크기(px)
+VARIANT_SIZES = {
+    'thumb': 320,
+    'medium': 960,
+}
+WEBP_QUALITY = 80
+
+# 업로드 이미지 최대 크기 (serializer/피드 업로드 검증에 사용)
+MAX_IMAGE_UPLOAD_SIZE = int(os.environ.get('MAX_IMAGE_UPLOAD_SIZE', 10 * 1024 * 1024))  # 10MB
+
+DEFAULT_MAX_WORKERS = int(os.environ.get('IMAGE_VARIANT_MAX_WORKERS', 2))
+
+# 파생 이미지 목록 캐시. 다른 프로세스에서 생성 중일 수 있으므로 일부만 있는 목록은 짧게 보관
+MANIFEST_CACHE_PREFIX = 'image_variants'
+MANIFEST_TIMEOUT = 24 * 60 * 60
+PARTIAL_MANIFEST_TIMEOUT = 60
+
+
+def variant_name(name, label):
+    """
+    원본 저장소 경로에 대한 파생 이미지 경로를 반환하는 함수.
+    """
+    directory, filename = os.path.split(name)
+    return f"{directory}/variants/{filename}_{label}.webp" if directory else f"variants/{filename}_{label}.webp"
+
+
+def _manifest_key(name):
+    return f"{MANIFEST_CACHE_PREFIX}:{hashlib.sha1(name.encode('utf-8')).hexdigest()}"
+
+
+def _record_manifest(name, labels):
+    timeout = MANIFEST_TIMEOUT if len(labels) == len(VARIANT_SIZES) else PARTIAL_MANIFEST_TIMEOUT
+    cache.set(_manifest_key(name), labels, timeout)
+
+
+def existing_variants(name, storage=default_storage):
+    """
+    원본 이미지에 대해 만들어진 파생 이미지 크기 목록을 반환하는 함수.
+    캐시에 기록이 없을 때만 저장소를 확인하고, 그 결과를 기록해 둔다.
+    """
+    labels = cache.get(_manifest_key(name))
+    if labels is None:
+        labels = [label for label in VARIANT_SIZES if storage.exists(variant_name(name, label))]
+        _record_manifest(name, labels)
+    return labels
+
+
+def variant_urls(name, storage=default_storage):
+    """
+    생성이 끝난 파생 이미지의 URL을 반환하는 함수. 아직 없으면 빈 dict.
+
+    :return: {"thumb": url, "medium": url}
+    """
+    if not name:
+        return {}
+    name = str(name)
+    return {label: storage.url(variant_name(name, label)) for label in existing_variants(name, storage)}
+
+
+def build_variants(name, storage=default_storage):
+    """
+    원본 이미지로 크기별 WebP 파생 이미지를 만드는 함수.
+
+    :return: 새로 만든 파생 이미지 경로 목록
+    """
+    from PIL import Image, ImageOps
+
+    targets = {label: variant_name(name, label) for label in VARIANT_SIZES}
+    if all(storage.exists(target) for target in targets.values()):
+        _record_manifest(name, list(targets))
+        return []
+
+    created = []
+    with storage.open(name, 'rb') as source, Image.open(source) as image:
+        # 휴대폰 사진의 EXIF 회전 정보를 픽셀에 반영 (이후 EXIF는 저장하지 않음)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+
+        for label, size in VARIANT_SIZES.items():
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            variant.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+
+            target = targets[label]
+            if storage.exists(target):
+                storage.delete(target)
+            created.append(storage.save(target, ContentFile(buffer.getvalue())))
+    _record_manifest(name, list(targets))
+    return created
+
+
+def delete_variants(name, storage=default_storage):
+    """
+    원본 이미지가 삭제될 때 파생 이미지도 함께 삭제하는 함수.
+    """
+    if not name:
+        return
+    name = str(name)
+    for label in VARIANT_SIZES:
+        target = variant_name(name, label)
+        if storage.exists(target):
+            storage.delete(target)
+    cache.delete(_manifest_key(name))
+
+
+def _run(name, on_done):
+    try:
+        if build_variants(name) and on_done:
+            on_done()
+    except Exception as e:
+        logger.error(f"파생 이미지 생성 실패: {name}, 오류: {e}")
+
+
+class ImageVariantQueue:
+    """
+    파생 이미지 생성을 처리하는 프로세스 내 스레드 풀.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix='image-variant'
+        )
+
+    def schedule(self, name, on_done=None):
+        """
+        파생 이미지 생성을 예약하는 함수. 저장 트랜잭션이 커밋된 뒤에 실행된다.
+
+        :param name: 원본 이미지의 저장소 경로
+        :param on_done: 새 파생 이미지를 만든 뒤 호출할 함수 (응답 캐시 버전 갱신 등)
+        """
+        if not name:
+            return
+        transaction.on_commit(lambda: self._executor.submit(_run, str(name), on_done))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_image_variant_queue():
+    """
+    프로세스 공용 ImageVariantQueue 인스턴스를 반환하는 함수.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = ImageVariantQueue()
+    return _queue
+
+
+def schedule_variants(name, on_done=None):
+    get_image_variant_queue().schedule(name, on_done)
+
+
+def schedule_menu_image_variants(menus):
+    """
+    bulk_create로 저장한 메뉴(post_save 시그널 없음)의 이미지 파생 이미지 생성을 예약하는 함수.
+    새 파생 이미지를 만들 때마다 해당 매장 응답 캐시 버전을 갱신한다.
+    """
+    from .http_cache import touch_store
+
+    names_by_store = {}
+    for menu in menus:
+        if menu.image:
+            names_by_store.setdefault(menu.store_id, set()).add(menu.image.name)
+
+    for store_id, names in names_by_store.items():
+        for name in names:
+            schedule_variants(name, on_done=lambda store_id=store_id: touch_store(store_id))
@@ -0,0 +1,197 @@
+# import_jobs.py
+# RegisterDataView 업로드 파일(엑셀/이미지/ZIP)을 요청 스레드 밖에서 처리하는 로컬 작업 큐
+import logging
+import os
+import shutil
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .archive_processor import ArchiveLimitError, keep_upload_image, process_archive
+from .excel_processor import ExcelImportError, process_excel_and_save_to_db
+from .models import ImportJob, Store
+
+logger = logging.getLogger('faq')
+
+# 동시에 처리하는 작업 수. 나머지 작업은 큐에서 대기
+DEFAULT_MAX_WORKERS = int(os.environ.get('IMPORT_JOB_MAX_WORKERS', 2))
+
+# 처리가 끝난 파일 상태
+FINISHED_FILE_STATUSES = ("success", "error")
+
+ALLOWED_EXTENSIONS = {
+    "excel": [".xlsx", ".xls"],
+    "image": [".png", ".jpg", ".jpeg"],
+    "zip": [".zip"]
+}
+
+
+def upload_dir_for(job_id):
+    return os.path.join(settings.MEDIA_ROOT, 'temp_uploads', str(job_id))
+
+
+def process_uploaded_file(file_path, store_id, file_name=None):
+    """
+    업로드된 파일 하나를 확장자에 맞게 처리하고 결과(dict)를 반환하는 함수.
+
+    :param file_name: 결과에 표시할 원래 파일 이름 (없으면 file_path의 파일 이름)
+    """
+    file_name = file_name or os.path.basename(file_path)
+    ext = os.path.splitext(file_name)[1].lower()
+
+    try:
+        if ext in ALLOWED_EXTENSIONS["excel"]:
+            # 엑셀 파일 처리
+            result = process_excel_and_save_to_db(file_path, store_id) or {}
+            return {"file": file_name, "status": "success", "message": "엑셀 파일이 성공적으로 처리되었습니다.", **result}
+
+        if ext in ALLOWED_EXTENSIONS["image"]:
+            # 이미지 파일은 작업이 끝나면 임시 폴더가 지워지므로 매장 업로드 폴더로 옮겨 보관
+            with open(file_path, 'rb') as image_file:
+                keep_upload_image(store_id, file_name, File(image_file))
+            return {"file": file_name, "status": "success", "message": "이미지 파일이 성공적으로 업로드되었습니다."}
+
+        if ext in ALLOWED_EXTENSIONS["zip"]:
+            # ZIP 파일은 전체 해제 없이 항목별로 이미지 저장/엑셀 등록
+            result = process_archive(file_path, Store.objects.get(store_id=store_id))
+            return {"file": file_name, "status": "success", "message": f"ZIP 파일을 처리했습니다. (이미지 {result['images']}개, 메뉴 {result['created_count']}개)", **result}
+
+        # 지원되지 않는 파일 형식
+        return {"file": file_name, "status": "error", "message": "지원되지 않는 파일 형식입니다."}
+
+    except ExcelImportError as e:
+        logger.warning(f"엑셀 데이터 검증 실패: {file_name}, 오류: {e.errors}")
+        return {"file": file_name, "status": "error", "message": str(e), "errors": e.errors}
+
+    except ArchiveLimitError as e:
+        logger.warning(f"압축 파일 제한 초과: {file_name}, 오류: {e}")
+        return {"file": file_name, "status": "error", "message": str(e)}
+
+    except zipfile.BadZipFile:
+        logger.error(f"파일 손상: {file_name}")
+        return {"file": file_name, "status": "error", "message": "ZIP 파일이 손상되어 압축을 해제할 수 없습니다."}
+
+    except Exception as e:
+        logger.error(f"파일 처리 중 오류 발생: {file_name}, 오류: {e}")
+        return {"file": file_name, "status": "error", "message": "파일을 처리하는 동안 문제가 발생했습니다. \n 다시 시도하거나 관리자에게 문의하세요."}
+
+
+def run_import_job(job_id):
+    """
+    작업에 포함된 파일을 차례로 처리하면서 파일별 진행 상태를 DB에 기록하는 함수. (워커 스레드에서 실행)
+    다시 실행된 작업(requeue_import_jobs)은 처리가 끝나지 않은 파일부터 이어서 처리한다.
+    작업이 끝나면 업로드 파일을 임시 저장한 폴더를 지운다.
+    """
+    close_old_connections()
+    try:
+        # 같은 작업을 두 워커가 동시에 처리하지 않도록 PENDING → RUNNING을 한 번의 UPDATE로 선점
+        if not ImportJob.objects.filter(job_id=job_id, status="PENDING").update(status="RUNNING", updated_at=timezone.now()):
+            return
+        job = ImportJob.objects.get(job_id=job_id)
+
+        for index, entry in enumerate(job.results):
+            if entry["status"] in FINISHED_FILE_STATUSES:
+                continue
+            job.results[index] = {**entry, "status": "running"}
+            job.save(update_fields=['results', 'updated_at'])
+
+            file_path = os.path.join(job.upload_dir, entry.get("stored", entry["file"]))
+            result = process_uploaded_file(file_path, job.store_id, file_name=entry["file"])
+            job.results[index] = {**result, "stored": entry.get("stored", entry["file"])}
+            job.processed_files = index + 1
+            job.save(update_fields=['results', 'processed_files', 'updated_at'])
+
+        failed = all(result["status"] == "error" for result in job.results)
+        job.status = "FAILED" if failed else "SUCCESS"
+        job.save(update_fields=['status', 'updated_at'])
+        remove_upload_dir(job)
+
+    except Exception as e:
+        logger.error(f"데이터 등록 작업 실패: {job_id}, 오류: {e}", exc_info=True)
+        ImportJob.objects.filter(job_id=job_id).update(status="FAILED", updated_at=timezone.now())
+        job = ImportJob.objects.filter(job_id=job_id).first()
+        if job:
+            remove_upload_dir(job)
+    finally:
+        close_old_connections()
+
+
+def public_results(job):
+    """
+    응답에 포함할 파일별 결과. 임시 저장 이름(stored)은 내부용이므로 제외한다.
+    """
+    return [{key: value for key, value in entry.items() if key != "stored"} for entry in job.results]
+
+
+def remove_upload_dir(job):
+    """
+    작업의 임시 업로드 폴더를 지우는 함수.
+    """
+    if job.upload_dir and os.path.realpath(job.upload_dir).startswith(
+        os.path.realpath(os.path.join(settings.MEDIA_ROOT, 'temp_uploads')) + os.sep
+    ):
+        shutil.rmtree(job.upload_dir, ignore_errors=True)
+
+
+class ImportJobQueue:
+    """
+    프로세스 내 스레드 풀 기반 작업 큐. 외부 브로커 없이 동작하며 작업 상태는 ImportJob 테이블에 보관된다.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix='import-job'
+        )
+
+    def submit(self, job_id):
+        # 작업 생성 트랜잭션이 커밋된 뒤에 실행해야 워커가 작업 행을 읽을 수 있음
+        transaction.on_commit(lambda: self._executor.submit(run_import_job, job_id))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_import_job_queue():
+    """
+    프로세스 공용 ImportJobQueue 인스턴스를 반환하는 함수.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = ImportJobQueue()
+    return _queue
+
+
+def create_import_job(user, store, files):
+    """
+    업로드 파일을 작업 폴더에 저장하고 ImportJob을 만들어 큐에 넣는 함수.
+
+    :param files: request.FILES의 UploadedFile 목록
+    :return: 생성된 ImportJob
+    """
+    job = ImportJob(user=user, store=store)
+    job.upload_dir = upload_dir_for(job.job_id)
+    os.makedirs(job.upload_dir, exist_ok=True)
+
+    results = []
+    for file in files:
+        # 경로 조작을 막기 위해 파일 이름만 사용하고, 같은 이름의 파일이 서로 덮어쓰지 않도록 고유한 이름으로 저장
+        file_name = os.path.basename(file.name)
+        stored_name = f"{uuid.uuid4().hex}{os.path.splitext(file_name)[1].lower()}"
+        with open(os.path.join(job.upload_dir, stored_name), 'wb') as temp_file:
+            for chunk in file.chunks():
+                temp_file.write(chunk)
+        results.append({"file": file_name, "stored": stored_name, "status": "pending"})
+
+    job.results = results
+    job.total_files = len(results)
+    job.save()
+
+    get_import_job_queue().submit(job.job_id)
+    return job
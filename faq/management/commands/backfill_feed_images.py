@@ -0,0 +1,29 @@
+# backfill_feed_images.py
+# 기존 피드 폴더(uploads/store_<id>/feed)의 이미지 파일을 FeedImage 테이블에 등록
+# 실행: python manage.py backfill_feed_images [--store-id 1]
+from django.core.management.base import BaseCommand
+from faq.feed_catalog import register_existing_feed_files
+from faq.http_cache import bump_feed_version
+from faq.models import Store
+
+
+class Command(BaseCommand):
+    help = "피드 폴더의 기존 이미지 파일을 FeedImage 테이블에 등록합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--store-id', type=int, help="특정 매장만 처리")
+
+    def handle(self, *args, **options):
+        stores = Store.objects.all()
+        if options['store_id']:
+            stores = stores.filter(store_id=options['store_id'])
+
+        total = 0
+        for store_id in stores.values_list('store_id', flat=True).iterator():
+            created = register_existing_feed_files(store_id)
+            if created:
+                bump_feed_version(store_id)
+                self.stdout.write(f"store_{store_id}: {created}개 등록")
+            total += created
+
+        self.stdout.write(self.style.SUCCESS(f"피드 이미지 {total}개를 등록했습니다."))
@@ -0,0 +1,56 @@
+# build_image_variants.py
+# 기존 메뉴/배너/프로필/피드 이미지의 WebP 파생 이미지를 생성 (이미 있으면 건너뜀)
+# 파생 이미지 이름 규칙이 바뀐 뒤 한 번 실행하거나, 생성에 실패한 이미지를 다시 만들 때 사용
+# 실행: python manage.py build_image_variants [--store-id 1]
+from django.core.management.base import BaseCommand
+from faq.http_cache import bump_feed_version, touch_store
+from faq.image_variants import build_variants
+from faq.models import FeedImage, Menu, Store, User
+
+
+class Command(BaseCommand):
+    help = "기존 이미지의 파생 이미지를 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--store-id', type=int, help="특정 매장만 처리")
+
+    def handle(self, *args, **options):
+        menus = Menu.objects.exclude(image="").exclude(image__isnull=True)
+        stores = Store.objects.exclude(banner="").exclude(banner__isnull=True)
+        feed_images = FeedImage.objects.all()
+        users = User.objects.exclude(profile_photo="").exclude(profile_photo__isnull=True)
+        if options['store_id']:
+            menus = menus.filter(store_id=options['store_id'])
+            stores = stores.filter(store_id=options['store_id'])
+            feed_images = feed_images.filter(store_id=options['store_id'])
+            users = users.filter(stores__store_id=options['store_id'])
+
+        # (매장 ID, 원본 경로, 피드 여부)
+        sources = [
+            *((store_id, name, False) for store_id, name in menus.values_list('store_id', 'image').distinct()),
+            *((store_id, name, False) for store_id, name in stores.values_list('store_id', 'banner')),
+            *((store_id, name, True) for store_id, name in feed_images.values_list('store_id', 'path')),
+            *((None, name, False) for name in users.values_list('profile_photo', flat=True)),
+        ]
+
+        created = failed = 0
+        touched, feed_touched = set(), set()
+        for store_id, name, is_feed in sources:
+            try:
+                if not build_variants(name):
+                    continue
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{name}: {e}")
+                continue
+            created += 1
+            if store_id is not None:
+                (feed_touched if is_feed else touched).add(store_id)
+
+        # 공개 응답 캐시가 새 파생 이미지 URL을 포함하도록 매장 버전 갱신
+        for store_id in touched:
+            touch_store(store_id)
+        for store_id in feed_touched:
+            bump_feed_version(store_id)
+
+        self.stdout.write(self.style.SUCCESS(f"파생 이미지 생성 {created}건, 실패 {failed}건"))
@@ -0,0 +1,21 @@
+# prepare_question_log.py
+# 통계에서 조회하는 질문 로그 테이블(webhook_questionlog)에 agent_id 인덱스 생성 (배포 시 한 번 실행)
+# 실행: python manage.py prepare_question_log [--database question_log] [--wal]
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from analytics.question_log import prepare_question_log_table
+
+
+class Command(BaseCommand):
+    help = "질문 로그 테이블에 agent_id 인덱스를 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', help="DB 별칭 (기본값: settings.QUESTION_LOG_DATABASE 또는 default)")
+        parser.add_argument('--wal', action='store_true', help="SQLite DB면 저널 모드를 WAL로 변경")
+
+    def handle(self, *args, **options):
+        try:
+            applied = prepare_question_log_table(options['database'], enable_wal=options['wal'])
+        except DatabaseError as e:
+            raise CommandError(f"질문 로그 테이블 준비 실패: {e}")
+        self.stdout.write(self.style.SUCCESS(f"적용: {', '.join(applied)}"))
@@ -0,0 +1,67 @@
+# regenerate_qr_codes.py
+# 매장/기업/공공기관 QR 코드를 프로세스 풀에서 일괄 생성 (인코딩할 URL이 바뀐 것만 다시 만듦)
+# 실행: python manage.py regenerate_qr_codes [--kind store corp public] [--workers 4] [--force]
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from faq.models import Store
+from faq_corp.models import Corp
+from faq_public.models import Public
+from qr_codes import QR_DIRECTORY, qr_basename, qr_content_url, render_qr_files
+
+# kind → (모델, 기본 키 이름)
+QR_TARGETS = {
+    'store': (Store, 'store_id'),
+    'corp': (Corp, 'corp_id'),
+    'public': (Public, 'public_id'),
+}
+
+
+class Command(BaseCommand):
+    help = "매장/기업/공공기관 QR 코드(PNG, SVG, 크기별 PNG)를 일괄 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', nargs='+', choices=list(QR_TARGETS), default=list(QR_TARGETS), help="처리할 대상")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="프로세스 수")
+        parser.add_argument('--force', action='store_true', help="URL이 바뀌지 않았어도 다시 생성")
+
+    def handle(self, *args, **options):
+        # (kind, object_id, basename, content_url)
+        jobs = []
+        for kind in options['kind']:
+            model, pk_name = QR_TARGETS[kind]
+            for object_id, slug in model.objects.values_list(pk_name, 'slug').iterator():
+                jobs.append((kind, object_id, qr_basename(kind, object_id), qr_content_url(slug)))
+
+        rendered = failed = 0
+        updated_ids = {kind: [] for kind in QR_TARGETS}
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = {
+                executor.submit(render_qr_files, settings.MEDIA_ROOT, basename, url, options['force']): (kind, object_id)
+                for kind, object_id, basename, url in jobs
+            }
+            for future in as_completed(futures):
+                kind, object_id = futures[future]
+                try:
+                    _, changed = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{kind} {object_id}: QR 코드 생성 실패 ({e})")
+                    continue
+                if changed:
+                    rendered += 1
+                updated_ids[kind].append(object_id)
+
+        # qr_code 경로가 비어 있거나 다른 행만 갱신 (update()는 auto_now를 적용하지 않으므로 updated_at도 함께 갱신)
+        now = timezone.now()
+        for kind, object_ids in updated_ids.items():
+            model, pk_name = QR_TARGETS[kind]
+            for object_id in object_ids:
+                qr_code = f'{settings.MEDIA_URL}{QR_DIRECTORY}/{qr_basename(kind, object_id)}.png'
+                model.objects.filter(**{pk_name: object_id}).exclude(qr_code=qr_code).update(qr_code=qr_code, updated_at=now)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"QR 코드 {len(jobs)}개 중 {rendered}개를 새로 만들었습니다. (실패 {failed}개)"
+        ))
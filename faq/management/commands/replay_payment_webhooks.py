@@ -0,0 +1,54 @@
+# replay_payment_webhooks.py
+# 결제 웹훅 수신함의 이벤트를 다시 처리 (실패한 이벤트 재처리, 프로세스 종료로 남은 대기 이벤트 처리)
+# 실행: python manage.py replay_payment_webhooks [--state FAILED PENDING RENEWAL] [--stale-minutes 10]
+#       [--imp-uid ...] [--id 1 2 ...] [--dry-run]
+# 배포 직후와 cron으로 주기 실행: replay_payment_webhooks --state PENDING RENEWAL FAILED --stale-minutes 10
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from faq.models import PaymentWebhookEvent
+from faq.payment_webhooks import RETRYABLE_STATES, process_webhook_event
+
+
+class Command(BaseCommand):
+    help = "결제 웹훅 이벤트를 수신 순서대로 다시 처리합니다."
+
+    def add_arguments(self, parser):
+        # DONE/SKIPPED는 다시 처리하면 결제 상태가 두 번 반영되므로(구독 주기 중복 증가) 받지 않음
+        parser.add_argument('--state', nargs='+', default=['FAILED'], choices=RETRYABLE_STATES,
+                            help="다시 처리할 상태")
+        parser.add_argument('--stale-minutes', type=int,
+                            help="수신 후 이 시간(분)이 지난 이벤트만 처리 (처리 중인 이벤트 제외)")
+        parser.add_argument('--imp-uid', nargs='+', dest='imp_uids', help="특정 imp_uid만 처리")
+        parser.add_argument('--id', type=int, nargs='+', dest='ids', help="특정 이벤트 ID만 처리")
+        parser.add_argument('--dry-run', action='store_true', help="대상만 출력")
+
+    def handle(self, *args, **options):
+        events = PaymentWebhookEvent.objects.filter(state__in=options['state']).order_by('received_at', 'id')
+        if options['stale_minutes'] is not None:
+            events = events.filter(received_at__lt=timezone.now() - timedelta(minutes=options['stale_minutes']))
+        if options['imp_uids']:
+            events = events.filter(imp_uid__in=options['imp_uids'])
+        if options['ids']:
+            events = events.filter(pk__in=options['ids'])
+
+        event_ids = list(events.values_list('pk', flat=True))
+        if options['dry_run']:
+            for event in PaymentWebhookEvent.objects.filter(pk__in=event_ids).order_by('received_at', 'id'):
+                self.stdout.write(f"{event.pk} {event.imp_uid} {event.status} {event.state} {event.last_error}")
+            self.stdout.write(f"대상 {len(event_ids)}건")
+            return
+
+        # 대기 상태로 되돌린 뒤 수신 순서대로 처리 (같은 사용자의 이벤트는 drain 과정에서 순서대로 처리됨)
+        # RENEWAL은 결제 상태가 이미 반영되었으므로 되돌리지 않고 다음 예약만 다시 시도
+        PaymentWebhookEvent.objects.filter(pk__in=event_ids).exclude(state='RENEWAL').update(state='PENDING')
+        for event_id in event_ids:
+            process_webhook_event(event_id)
+
+        results = dict.fromkeys([state for state, _ in PaymentWebhookEvent.STATE_CHOICES], 0)
+        for state in PaymentWebhookEvent.objects.filter(pk__in=event_ids).values_list('state', flat=True):
+            results[state] += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"대상 {len(event_ids)}건: 완료 {results['DONE']}, 건너뜀 {results['SKIPPED']}, "
+            f"실패 {results['FAILED']}, 대기 {results['PENDING']}, 예약 대기 {results['RENEWAL']}"
+        ))
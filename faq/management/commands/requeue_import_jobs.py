@@ -0,0 +1,44 @@
+# requeue_import_jobs.py
+# 워커 재시작/배포로 멈춘 데이터 등록 작업(PENDING, RUNNING)을 다시 처리 (처리가 끝나지 않은 파일부터 이어서 처리)
+# 실행: python manage.py requeue_import_jobs [--stale-minutes 10] [--job-id ...] [--dry-run]
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from faq.import_jobs import run_import_job
+from faq.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = "멈춘 데이터 등록 작업을 이어서 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help="이 시간(분) 동안 진행 상태가 바뀌지 않은 작업만 처리")
+        parser.add_argument('--job-id', nargs='+', dest='job_ids', help="특정 작업만 처리")
+        parser.add_argument('--dry-run', action='store_true', help="대상만 출력")
+
+    def handle(self, *args, **options):
+        jobs = ImportJob.objects.filter(
+            status__in=["PENDING", "RUNNING"],
+            updated_at__lt=timezone.now() - timedelta(minutes=options['stale_minutes']),
+        ).order_by('created_at')
+        if options['job_ids']:
+            jobs = jobs.filter(job_id__in=options['job_ids'])
+
+        job_ids = list(jobs.values_list('job_id', flat=True))
+        if options['dry_run']:
+            for job in ImportJob.objects.filter(job_id__in=job_ids).order_by('created_at'):
+                self.stdout.write(f"{job.job_id} {job.status} {job.processed_files}/{job.total_files}")
+            self.stdout.write(f"대상 {len(job_ids)}건")
+            return
+
+        # 실행 중이던 워커가 사라진 작업: 대기 상태로 되돌린 뒤 이 프로세스에서 차례로 처리
+        ImportJob.objects.filter(job_id__in=job_ids, status="RUNNING").update(status="PENDING")
+        for job_id in job_ids:
+            run_import_job(job_id)
+
+        results = dict(ImportJob.objects.filter(job_id__in=job_ids).values_list('job_id', 'status'))
+        succeeded = sum(1 for status in results.values() if status == "SUCCESS")
+        self.stdout.write(self.style.SUCCESS(
+            f"대상 {len(job_ids)}건: 완료 {succeeded}, 실패 {len(job_ids) - succeeded}"
+        ))
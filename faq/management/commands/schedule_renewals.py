@@ -0,0 +1,26 @@
+# schedule_renewals.py
+# 남은 예약 결제가 적은 구독자의 다음 정기 결제를 한 번에 예약 (월간 cron)
+# 실행: python manage.py schedule_renewals [--threshold 2] [--months 12] [--user-id 1 2 ...]
+from django.core.management.base import BaseCommand
+from faq.utils import RENEWAL_THRESHOLD, SCHEDULE_MONTHS, schedule_renewals
+
+
+class Command(BaseCommand):
+    help = "남은 예약이 threshold개 이하인 활성 구독자의 다음 정기 결제를 예약합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=int, default=RENEWAL_THRESHOLD, help="남은 예약 개수 기준")
+        parser.add_argument('--months', type=int, default=SCHEDULE_MONTHS, help="새로 예약할 개월 수")
+        parser.add_argument('--user-id', type=int, nargs='+', dest='user_ids', help="특정 사용자만 처리")
+
+    def handle(self, *args, **options):
+        summary = schedule_renewals(
+            threshold=options['threshold'],
+            months=options['months'],
+            user_ids=options['user_ids'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"대상 {summary['users']}명, 새 예약 {summary['scheduled']}건, 실패 {len(summary['failed'])}명"
+        ))
+        if summary['failed']:
+            self.stderr.write(f"실패한 사용자: {summary['failed']}")
@@ -0,0 +1,142 @@
+# media_storage.py
+# 내용 주소 기반(content-addressed) 미디어 저장소. 같은 내용의 파일은 한 번만 저장하고 참조 수(MediaBlob)로 관리
+#
+# - 업로드를 임시 파일로 쓰면서 SHA-256을 함께 계산하고, cas/<앞 2자리>/<다음 2자리>/<해시><확장자>에 저장한다.
+# - 이미 같은 해시의 파일이 있으면 새로 쓰지 않고 참조 수만 늘린다.
+# - 참조 수는 파일을 가리키는 행 수와 같게 유지한다. save() 한 번이 참조 하나이고, 저장된 파일을 다른 행이
+#   함께 가리키게 하면 retain()으로 참조를 더한다. (행 삭제/교체 시 해제는 faq.signals)
+# - delete()/release()는 참조 수를 줄이고, 0이 되면 파일(과 파생 이미지)을 삭제한다.
+# - cas/ 밖의 기존 파일(이전 업로드 경로)은 일반 FileSystemStorage처럼 동작한다.
+import hashlib
+import logging
+import os
+import tempfile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+from .image_variants import delete_variants
+
+logger = logging.getLogger('faq')
+
+CAS_ROOT = 'cas'
+
+
+def blob_name(digest, ext):
+    """
+    해시와 확장자로 저장소 경로를 만드는 함수.
+    """
+    return f"{CAS_ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def is_blob_name(name):
+    return bool(name) and str(name).startswith(f"{CAS_ROOT}/")
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    같은 내용의 업로드를 한 파일로 저장하는 FileSystemStorage.
+    """
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        ext = os.path.splitext(name)[1].lower()
+        tmp_dir = self.path(f"{CAS_ROOT}/tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        # 임시 파일에 쓰면서 해시 계산 (파일 전체를 메모리에 올리지 않음)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+
+            sha256 = digest.hexdigest()
+            with transaction.atomic():
+                blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                    sha256=sha256,
+                    defaults={'name': blob_name(sha256, ext), 'size': size, 'ref_count': 1},
+                )
+                if not created:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+
+                # 처음 저장하는 내용이거나 파일이 사라진 경우에만 실제로 옮김
+                if created or not self.exists(blob.name):
+                    full_path = self.path(blob.name)
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    os.replace(tmp_path, full_path)
+                    tmp_path = None
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+            return blob.name
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def delete(self, name):
+        """
+        cas/ 파일은 참조 수를 줄이고 0이 되면 삭제, 그 밖의 파일은 바로 삭제하는 함수.
+        """
+        if not name:
+            return
+        if not is_blob_name(name):
+            self._remove(name)
+            return
+        self.release(name)
+
+    def retain(self, name, count=1):
+        """
+        cas/ 파일의 참조를 count만큼 늘리는 함수. 이미 저장된 파일을 다른 행이 함께 가리키게 할 때 사용한다.
+        호출하는 쪽이 그 파일의 참조를 하나 이상 갖고 있는 동안에만 호출해야 한다. (참조 수가 0이 되어 삭제되는 것 방지)
+        """
+        from .models import MediaBlob
+
+        if count > 0 and is_blob_name(name):
+            MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + count)
+
+    def release(self, name):
+        """
+        cas/ 파일의 참조를 하나 줄이는 함수.
+
+        :return: 파일이 실제로 삭제(예약)되었으면 True
+        """
+        from .models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return False
+            if blob is not None:
+                blob.delete()
+            # 참조가 남지 않은(또는 기록이 없는) 파일은 커밋 후 삭제
+            transaction.on_commit(lambda: self._remove_unreferenced(name))
+        return True
+
+    def _remove_unreferenced(self, name):
+        from .models import MediaBlob
+
+        # 커밋 사이에 같은 내용이 다시 업로드되어 새 기록이 생겼으면 파일을 남겨둠
+        if MediaBlob.objects.filter(name=name).exists():
+            return
+        self._remove(name)
+
+    def _remove(self, name):
+        super().delete(name)
+        delete_variants(name)
+
+
+media_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    """
+    미디어 필드(Menu.image, Store.banner, User.profile_photo)에 사용하는 저장소를 반환하는 함수.
+    """
+    return media_storage
@@ -0,0 +1,117 @@
+# menu_snapshot.py
+# Store.menu_price(메뉴 스냅샷 JSON) 관리. 뷰와 엑셀 처리 모듈, Menu 시그널이 함께 사용하므로 views에 두지 않음
+#
+# - 메뉴 하나가 저장/삭제되면 시그널에서 해당 항목만 menu_number 기준으로 갱신한다.
+# - 대량 변경(bulk_create, 카테고리 삭제 등)은 deferred_snapshot() 안에서 실행하고 마지막에 한 번만 다시 만든다.
+# - 스냅샷이 바뀔 때마다 Store.menu_version을 1씩 올린다.
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Menu, Store
+
+logger = logging.getLogger('faq')
+
+_deferred = threading.local()
+
+
+def menu_snapshot_entry(menu):
+    """
+    메뉴 하나를 menu_price 항목(dict)으로 변환하는 함수.
+    """
+    return {
+        'menu_number': menu.menu_number,
+        'name': menu.name,
+        'price': float(menu.price),
+        'category': menu.category,
+        'image': str(menu.image.url) if menu.image else None,
+        'allergy': menu.allergy or ""
+    }
+
+
+def _write_snapshot(store_id, entries):
+    # Store.save()를 거치지 않고 필요한 필드만 갱신 (버전은 DB에서 원자적으로 증가)
+    menu_price = json.dumps(entries, ensure_ascii=False)
+    Store.objects.filter(store_id=store_id).update(
+        menu_price=menu_price,
+        menu_version=F('menu_version') + 1,
+        updated_at=timezone.now(),
+    )
+    return menu_price
+
+
+def _build_entries(store_id):
+    menus = Menu.objects.filter(store_id=store_id).only('menu_number', 'name', 'price', 'category', 'image', 'allergy')
+    return [menu_snapshot_entry(menu) for menu in menus]
+
+
+def rebuild_menu_price(store):
+    """
+    매장의 전체 메뉴로 Store.menu_price 필드를 다시 만드는 함수.
+    """
+    with transaction.atomic():
+        store.menu_price = _write_snapshot(store.store_id, _build_entries(store.store_id))
+    store.refresh_from_db(fields=['menu_version', 'updated_at'])
+
+
+def _load_entries(menu_price):
+    """
+    저장된 스냅샷을 읽는 함수. menu_number가 없는 예전 형식이거나 손상된 경우 None을 반환한다.
+    """
+    if not menu_price:
+        return []
+    try:
+        entries = json.loads(menu_price)
+    except json.JSONDecodeError:
+        logger.error("menu_price 필드가 유효한 JSON 형식이 아닙니다. 전체 메뉴로 다시 만듭니다.")
+        return None
+    if not isinstance(entries, list) or any(not isinstance(entry, dict) or 'menu_number' not in entry for entry in entries):
+        return None
+    return entries
+
+
+def apply_menu_change(menu, deleted=False):
+    """
+    메뉴 하나의 생성/수정/삭제를 menu_price 스냅샷에 반영하는 함수. (호출한 쪽의 트랜잭션 안에서 실행)
+    """
+    if getattr(_deferred, 'depth', 0):
+        return
+
+    with transaction.atomic():
+        # 같은 매장의 메뉴가 동시에 바뀌어도 항목이 유실되지 않도록 매장 행을 잠금
+        store = Store.objects.select_for_update().only('store_id', 'menu_price').filter(store_id=menu.store_id).first()
+        if store is None:
+            # 매장 삭제로 인한 메뉴 연쇄 삭제
+            return
+
+        entries = _load_entries(store.menu_price)
+        if entries is None:
+            _write_snapshot(store.store_id, _build_entries(store.store_id))
+            return
+
+        index = next((i for i, entry in enumerate(entries) if entry['menu_number'] == menu.menu_number), None)
+        if deleted:
+            if index is not None:
+                entries.pop(index)
+        elif index is not None:
+            entries[index] = menu_snapshot_entry(menu)
+        else:
+            entries.append(menu_snapshot_entry(menu))
+
+        _write_snapshot(store.store_id, entries)
+
+
+@contextmanager
+def deferred_snapshot(store):
+    """
+    블록 안의 메뉴 변경은 시그널에서 반영하지 않고, 블록이 끝날 때 스냅샷을 한 번만 다시 만드는 컨텍스트 매니저.
+    """
+    _deferred.depth = getattr(_deferred, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _deferred.depth -= 1
+    rebuild_menu_price(store)
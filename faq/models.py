@@ -5,6 +5,7 @@ import os, uuid, json
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from .media_storage import get_media_storage
 
 
 # ✅ **파일 저장 경로 설정 함수**
@@ -55,7 +56,7 @@ class User(AbstractBaseUser):
     phone = models.CharField(max_length=20, unique=True)
     email = models.EmailField(max_length=30, blank=True, null=True)
     profile_photo = models.ImageField(
-        upload_to=profile_photo_upload_path, blank=True, null=True
+        upload_to=profile_photo_upload_path, storage=get_media_storage, blank=True, null=True
     )
     created_at = models.DateTimeField(auto_now_add=True, blank=True, null=True)
     marketing = models.CharField(
@@ -106,8 +107,10 @@ class Store(models.Model):
     store_name = models.CharField(max_length=20, unique=True)
     store_address = models.TextField(blank=True, null=True)
     store_tel = models.TextField(blank=True, null=True)
-    banner = models.ImageField(upload_to=banner_upload_path, blank=True, null=True)
+    banner = models.ImageField(upload_to=banner_upload_path, storage=get_media_storage, blank=True, null=True)
     menu_price = models.TextField(blank=True, null=True)
+    menu_version = models.PositiveIntegerField(default=0)  # menu_price가 바뀔 때마다 증가 (faq.menu_snapshot)
+    feed_version = models.PositiveIntegerField(default=0)  # 피드 이미지가 바뀔 때마다 증가 (faq.http_cache)
     opening_hours = models.TextField(blank=True, null=True)
     qr_code = models.CharField(max_length=100, blank=True, null=True)
     agent_id = models.CharField(max_length=100, blank=True, null=True)
@@ -167,7 +170,7 @@ class Menu(models.Model):
     name = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     category = models.CharField(max_length=100)
-    image = models.ImageField(upload_to=menu_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=menu_image_upload_path, storage=get_media_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, blank=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, blank=True, null=True)
     spicy = models.CharField(max_length=50, choices=SPICY_CATEGORIES, default="0")
@@ -265,5 +268,112 @@ class PaymentHistory(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # 결제 내역 키셋 페이지네이션 (faq.pagination)
+            models.Index(fields=["user", "status", "created_at"]),
+        ]
+
+
+# ✅ **결제 웹훅 수신함 모델** (PaymentWebhookView가 저장만 하고 바로 응답, faq.payment_webhooks에서 처리)
+class PaymentWebhookEvent(models.Model):
+    STATE_CHOICES = [
+        ("PENDING", "대기"),
+        ("RENEWAL", "다음 결제 예약 대기"),  # 결제 상태는 반영했고 다음 정기 결제 예약만 남음
+        ("DONE", "완료"),
+        ("SKIPPED", "건너뜀"),
+        ("FAILED", "실패"),
+    ]
+
+    imp_uid = models.CharField(max_length=255)
+    merchant_uid = models.CharField(max_length=255)
+    status = models.CharField(max_length=50)  # 포트원 결제 상태 (paid, failed, cancelled 등)
+    # 수신 시점에 merchant_uid로 찾은 사용자. 같은 사용자의 이벤트는 수신 순서대로 처리
+    user = models.ForeignKey(
+        "User", on_delete=models.SET_NULL, null=True, blank=True, related_name="payment_webhook_events"
+    )
+    payload = models.JSONField(default=dict)  # 웹훅 원본
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default="PENDING")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
 
+    def __str__(self):
+        return f"{self.imp_uid} ({self.status}) - {self.state}"
 
+    class Meta:
+        ordering = ["received_at", "id"]
+        constraints = [
+            # 포트원 재전송으로 같은 이벤트가 여러 번 와도 한 번만 저장
+            models.UniqueConstraint(fields=["imp_uid", "status"], name="unique_payment_webhook_event"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "state", "received_at"]),
+            models.Index(fields=["state", "received_at"]),
+        ]
+
+
+# ✅ **데이터 등록 작업 모델** (RegisterDataView 업로드를 백그라운드에서 처리)
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ("PENDING", "대기"),
+        ("RUNNING", "처리 중"),
+        ("SUCCESS", "완료"),
+        ("FAILED", "실패"),
+    ]
+
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        "User", on_delete=models.CASCADE, related_name="import_jobs"
+    )
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="import_jobs")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    upload_dir = models.CharField(max_length=255)  # 업로드 파일을 임시 저장한 폴더
+    total_files = models.PositiveIntegerField(default=0)
+    processed_files = models.PositiveIntegerField(default=0)
+    # 파일별 진행 상태: [{"file": ..., "status": "pending|running|success|error", "message": ...}, ...]
+    results = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.job_id} ({self.status})"
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+# ✅ **피드 이미지 모델** (uploads/store_<id>/feed 폴더의 이미지 목록)
+class FeedImage(models.Model):
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="feed_images")
+    image_uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    name = models.CharField(max_length=255)  # 표시용 이름 (이름 변경 시 이 값만 수정)
+    ext = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)  # MEDIA_ROOT 기준 상대 경로
+    size = models.PositiveIntegerField(default=0)  # 바이트
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    sort_order = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.store_id} - {self.name}{self.ext}"
+
+    class Meta:
+        ordering = ["sort_order", "id"]
+        indexes = [
+            models.Index(fields=["store", "sort_order", "id"]),
+        ]
+
+
+# ✅ **미디어 파일 모델** (faq.media_storage: 같은 내용의 파일은 한 번만 저장하고 참조 수로 관리)
+class MediaBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)  # 저장소 경로 (cas/..)
+    size = models.BigIntegerField(default=0)  # 바이트
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
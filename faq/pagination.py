@@ -0,0 +1,73 @@
+# pagination.py
+# (created_at, id) 기준 키셋(커서) 페이지네이션. OFFSET 없이 마지막 행 다음부터 읽으므로 내역이 길어져도 비용이 같다.
+import base64
+from datetime import datetime
+from django.db.models import BooleanField, Case, Q, Value, When
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at, pk):
+    """
+    마지막 행의 (created_at, id)를 URL에 넣을 수 있는 커서 문자열로 만드는 함수.
+    """
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    커서 문자열을 (created_at, id)로 되돌리는 함수. 잘못된 커서면 ValidationError를 발생시킨다.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({"cursor": "잘못된 커서입니다."})
+
+
+def parse_page_size(value):
+    """
+    ?page_size 값을 1 ~ MAX_PAGE_SIZE 범위의 정수로 바꾸는 함수.
+    """
+    try:
+        page_size = int(value) if value else DEFAULT_PAGE_SIZE
+    except (TypeError, ValueError):
+        raise ValidationError({"page_size": "정수여야 합니다."})
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def keyset_page(queryset, where, cursor, page_size, pinned=None):
+    """
+    where에 맞는 행을 (created_at, id) 내림차순으로 커서 다음 페이지만큼 가져오는 함수. created_at이 없는 행은 제외된다.
+
+    :param where: 페이지로 나눌 행 조건(Q)
+    :param cursor: 이전 페이지의 next_cursor (없으면 첫 페이지)
+    :param pinned: 첫 페이지에서 같은 쿼리로 함께 가져와 맨 앞에 둘 행 하나의 조건(Q, where와 겹치지 않아야 함)
+    :return: (행 목록, pinned 행 또는 None, next_cursor 또는 None)
+    """
+    condition = where & Q(created_at__isnull=False)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        condition &= Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+    # 한 행 더 읽어서 다음 페이지가 있는지 확인
+    limit = page_size + 1
+    if pinned is not None and not cursor:
+        queryset = queryset.filter(condition | pinned).annotate(
+            is_pinned=Case(When(pinned, then=Value(True)), default=Value(False), output_field=BooleanField())
+        ).order_by("-is_pinned", "-created_at", "-id")
+        limit += 1
+    else:
+        pinned = None
+        queryset = queryset.filter(condition).order_by("-created_at", "-id")
+
+    rows = list(queryset[:limit])
+    pinned_row = rows.pop(0) if pinned is not None and rows and rows[0].is_pinned else None
+    if len(rows) <= page_size:
+        return rows, pinned_row, None
+    rows = rows[:page_size]
+    return rows, pinned_row, encode_cursor(rows[-1].created_at, rows[-1].pk)
@@ -0,0 +1,253 @@
+# payment_webhooks.py
+# 포트원 결제 웹훅 수신함. 웹훅은 저장 후 바로 응답하고, 처리(결제 검증, 구독 갱신, 다음 예약)는 워커 스레드에서 한다.
+#
+# - (imp_uid, status) 유니크 제약으로 재전송된 웹훅은 한 번만 저장된다. 아직 처리되지 않은(PENDING, RENEWAL)
+#   또는 실패한(FAILED) 이벤트가 재전송되면 다시 큐에 넣는다.
+# - 같은 사용자의 이벤트는 사용자 행을 잠근 상태에서 수신 순서대로 처리한다. (여러 프로세스에서도 순서 유지)
+# - 결제 상태 반영과 다음 정기 결제 예약은 단계를 나눈다. 상태 반영이 커밋된 뒤 예약하고, 예약(포트원 호출)이
+#   실패하면 이벤트를 RENEWAL로 남겨 예약만 다시 시도한다. (상태 반영은 다시 실행하지 않음)
+# - 실패한 이벤트나 프로세스 종료로 남은 이벤트는 `python manage.py replay_payment_webhooks`로 다시 처리한다.
+#   (주기 실행 예: replay_payment_webhooks --state PENDING RENEWAL FAILED --stale-minutes 10)
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dateutil.relativedelta import relativedelta
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import PaymentHistory, PaymentWebhookEvent, Subscription, User
+from .utils import schedule_renewals, verify_payment
+
+logger = logging.getLogger('faq')
+
+# 재전송되면 다시 큐에 넣는 상태 (DONE, SKIPPED는 다시 처리해도 결과가 같음)
+RETRYABLE_STATES = ("PENDING", "RENEWAL", "FAILED")
+
+# 처리 레인 수. 사용자 ID로 레인을 고르므로 같은 사용자의 이벤트는 항상 같은 레인에서 차례로 처리됨
+DEFAULT_LANES = int(os.environ.get('PAYMENT_WEBHOOK_LANES', 4))
+
+
+class WebhookSkipped(Exception):
+    """처리할 대상이 없어 건너뛰는 이벤트 (재시도해도 결과가 같음)"""
+
+
+def receive_webhook_event(payload):
+    """
+    웹훅을 수신함에 저장하고 처리 작업을 큐에 넣는 함수. 이미 받은 (imp_uid, status)면 저장하지 않고,
+    그 이벤트가 아직 처리되지 않았거나 실패한 상태면 다시 큐에 넣는다.
+
+    :param payload: 웹훅 요청 데이터(dict, imp_uid/merchant_uid/status 포함)
+    :return: (PaymentWebhookEvent, created)
+    """
+    merchant_uid = payload["merchant_uid"]
+    user_id = (
+        PaymentHistory.objects.filter(merchant_uid=merchant_uid).values_list("user_id", flat=True).first()
+    )
+    with transaction.atomic():
+        event, created = PaymentWebhookEvent.objects.get_or_create(
+            imp_uid=payload["imp_uid"],
+            status=payload["status"],
+            defaults={"merchant_uid": merchant_uid, "user_id": user_id, "payload": payload},
+        )
+        if created:
+            get_webhook_event_queue().submit(event)
+        elif event.state in RETRYABLE_STATES:
+            # 재전송: 이전 처리가 실패했거나 프로세스 종료로 큐에서 사라졌을 수 있으므로 다시 처리
+            updates = {}
+            if event.state == "FAILED":
+                updates["state"] = "PENDING"
+            if event.user_id is None and user_id is not None:
+                updates["user_id"] = user_id
+            if updates:
+                PaymentWebhookEvent.objects.filter(pk=event.pk, state=event.state).update(**updates)
+                for field, value in updates.items():
+                    setattr(event, field, value)
+            get_webhook_event_queue().submit(event)
+    return event, created
+
+
+def apply_payment_webhook(event):
+    """
+    웹훅 이벤트 하나를 반영하는 함수. (결제 이력 상태, 구독 주기, 다음 결제일)
+    다음 정기 결제 예약은 포트원 호출이 실패해도 반영한 상태가 롤백되지 않도록 schedule_user_renewal()에서 따로 한다.
+
+    :return: 결제가 성공하여 다음 정기 결제 예약을 확인해야 하면 True
+    """
+    try:
+        payment_history = PaymentHistory.objects.select_related("billing_key", "user").get(
+            merchant_uid=event.merchant_uid
+        )
+    except PaymentHistory.DoesNotExist:
+        raise WebhookSkipped("결제 이력을 찾을 수 없음")
+    # 수신 시점에 결제 이력이 없어 사용자를 모르던 이벤트 (다음 예약 단계에서 사용)
+    event.user_id = payment_history.user_id
+
+    # 포트원 결제 검증
+    if not verify_payment(event.imp_uid):
+        raise ValueError("결제 검증 실패")
+
+    # ✅ 결제 상태 업데이트
+    payment_history.status = event.status
+    payment_history.imp_uid = event.imp_uid  # 실제 imp_uid 업데이트
+    payment_history.created_at = timezone.now()  # 실제 created_at 업데이트
+    payment_history.save()
+
+    if event.status != "paid":
+        return False
+
+    # 결제가 성공한 경우 추가 처리
+    billing_key = payment_history.billing_key
+    billing_key.subscription_cycle += 1
+    billing_key.save()
+
+    # ✅ 구독 정보 가져오기
+    subscription = Subscription.objects.filter(user=payment_history.user, is_active=True).first()
+    if subscription:
+        # ✅ 가장 가까운 scheduled_at을 가져와 `next_billing_date` 설정
+        next_billing = PaymentHistory.objects.filter(
+            user=payment_history.user,
+            billing_key=billing_key,
+            status="scheduled"
+        ).order_by("scheduled_at").first()
+
+        subscription.next_billing_date = (
+            next_billing.scheduled_at.date() if next_billing
+            else timezone.now().date() + relativedelta(months=1)
+        )
+        subscription.save(update_fields=["next_billing_date"])
+    else:
+        logger.warning(f"구독 정보가 없음: user_id={payment_history.user_id}")
+    return True
+
+
+def schedule_user_renewal(user_id):
+    """
+    결제 상태를 반영한 뒤(RENEWAL) 다음 정기 결제 예약이 남은 사용자의 예약을 처리하는 함수.
+    남은 예약이 RENEWAL_THRESHOLD개 이하일 때만 예약하므로(schedule_renewals) 여러 번 호출해도 중복 예약되지 않는다.
+    실패하면 이벤트를 RENEWAL로 남겨 재전송이나 replay_payment_webhooks에서 예약만 다시 시도한다.
+    """
+    event_ids = list(
+        PaymentWebhookEvent.objects.filter(user_id=user_id, state="RENEWAL").values_list("pk", flat=True)
+    )
+    if not event_ids:
+        return
+
+    events = PaymentWebhookEvent.objects.filter(pk__in=event_ids, state="RENEWAL")
+    summary = schedule_renewals(user_ids=[user_id])
+    if user_id in summary["failed"]:
+        events.update(attempts=F("attempts") + 1, last_error="다음 정기 결제 예약 실패", processed_at=timezone.now())
+        return
+    events.update(state="DONE", last_error="", processed_at=timezone.now())
+
+
+def _process_locked(event):
+    """
+    잠금을 잡은 트랜잭션 안에서 이벤트를 처리하고 결과 상태를 기록하는 함수.
+    처리 중 오류가 나면 처리 내용만 롤백하고 FAILED를 기록한다. 다음 예약이 남았으면 RENEWAL을 기록한다.
+    """
+    event.attempts += 1
+    try:
+        with transaction.atomic():
+            needs_renewal = apply_payment_webhook(event)
+        event.state, event.last_error = ("RENEWAL" if needs_renewal else "DONE"), ""
+    except WebhookSkipped as e:
+        event.state, event.last_error = "SKIPPED", str(e)
+    except Exception as e:
+        logger.error(f"결제 웹훅 처리 실패: imp_uid={event.imp_uid}, status={event.status}, {e}", exc_info=True)
+        event.state, event.last_error = "FAILED", str(e)
+    event.processed_at = timezone.now()
+    event.save(update_fields=["state", "user", "attempts", "last_error", "processed_at"])
+
+
+def drain_user_events(user_id):
+    """
+    사용자의 대기 중인 이벤트를 수신 순서대로 모두 처리하고, 상태 반영이 커밋된 뒤 다음 정기 결제를 예약하는 함수.
+    사용자 행을 잠그므로 다른 프로세스가 같은 사용자의 이벤트를 동시에 처리하지 않는다.
+
+    :return: 처리한 이벤트 수
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            User.objects.select_for_update().filter(pk=user_id).first()
+            event = (
+                PaymentWebhookEvent.objects.filter(user_id=user_id, state="PENDING")
+                .order_by("received_at", "id")
+                .first()
+            )
+            if event is None:
+                break
+            _process_locked(event)
+        processed += 1
+
+    schedule_user_renewal(user_id)
+    return processed
+
+
+def process_webhook_event(event_id):
+    """
+    이벤트 하나를 처리하는 함수. 사용자가 있는 이벤트는 해당 사용자의 앞선 이벤트부터 처리한다.
+    """
+    event = PaymentWebhookEvent.objects.filter(pk=event_id).first()
+    if event is None:
+        return
+    if event.user_id:
+        drain_user_events(event.user_id)
+        return
+
+    with transaction.atomic():
+        event = PaymentWebhookEvent.objects.select_for_update().filter(pk=event_id, state="PENDING").first()
+        if event:
+            _process_locked(event)
+    # 처리 중에 결제 이력으로 사용자를 찾은 경우
+    if event and event.user_id:
+        schedule_user_renewal(event.user_id)
+
+
+def _run(event_id):
+    # 워커 스레드용 래퍼: DB 연결 정리
+    close_old_connections()
+    try:
+        process_webhook_event(event_id)
+    except Exception as e:
+        logger.error(f"결제 웹훅 작업 실패: event_id={event_id}, {e}", exc_info=True)
+    finally:
+        close_old_connections()
+
+
+class WebhookEventQueue:
+    """
+    사용자별 순서를 지키는 프로세스 내 작업 큐. 레인마다 스레드 하나가 제출 순서대로 처리한다.
+    """
+
+    def __init__(self, lanes=DEFAULT_LANES):
+        self._lanes = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'payment-webhook-{index}')
+            for index in range(max(1, lanes))
+        ]
+
+    def _lane_for(self, event):
+        key = event.user_id if event.user_id is not None else event.pk
+        return self._lanes[key % len(self._lanes)]
+
+    def submit(self, event):
+        # 이벤트 저장 트랜잭션이 커밋된 뒤에 실행해야 워커가 이벤트 행을 읽을 수 있음
+        lane = self._lane_for(event)
+        transaction.on_commit(lambda: lane.submit(_run, event.pk))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_webhook_event_queue():
+    """
+    프로세스 공용 WebhookEventQueue 인스턴스를 반환하는 함수.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WebhookEventQueue()
+    return _queue
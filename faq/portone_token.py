@@ -0,0 +1,139 @@
+# portone_token.py
+# 포트원(아임포트) API 액세스 토큰 관리. 만료 직전까지 Django 캐시에 보관하고 모든 결제 흐름이 같은 토큰을 사용
+#
+# - 토큰은 expired_at - REFRESH_MARGIN 초까지 캐시에 둔다. (PortOne 토큰 유효기간 30분)
+# - 갱신은 한 번에 한 곳에서만 한다(single-flight). 프로세스 안에서는 threading.Lock,
+#   프로세스/서버 간에는 cache.add() 잠금을 사용한다.
+#   여러 프로세스가 토큰을 공유하려면 공용 캐시(Redis, Memcached 등)를 CACHES에 설정해야 한다.
+# - 갱신을 기다리다 WAIT_TIMEOUT을 넘기면 잠금 없이 직접 발급한다. (결제 요청이 멈추지 않도록)
+import logging
+import os
+import threading
+import time
+import uuid
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from http_client import HttpClientError, get_http_client
+
+logger = logging.getLogger('faq')
+
+PORTONE_API_BASE_URL = 'https://api.iamport.kr'
+TOKEN_CACHE_KEY = 'portone:access_token'
+LOCK_CACHE_KEY = 'portone:access_token:lock'
+
+REFRESH_MARGIN = int(os.environ.get('PORTONE_TOKEN_REFRESH_MARGIN', 60))  # 만료 몇 초 전에 갱신할지
+LOCK_TIMEOUT = int(os.environ.get('PORTONE_TOKEN_LOCK_TIMEOUT', 10))  # 갱신 잠금 유지 시간(초)
+WAIT_TIMEOUT = float(os.environ.get('PORTONE_TOKEN_WAIT_TIMEOUT', 5))  # 다른 곳의 갱신을 기다리는 최대 시간(초)
+POLL_INTERVAL = 0.05
+
+
+class PortOneTokenError(Exception):
+    """
+    포트원 토큰 발급 실패
+    """
+
+
+def fetch_portone_token():
+    """
+    포트원 /users/getToken으로 새 토큰을 발급받는 함수.
+
+    :return: (액세스 토큰, 남은 유효 시간(초))
+    """
+    try:
+        response = get_http_client('portone', PORTONE_API_BASE_URL).post(
+            '/users/getToken',
+            json={
+                "imp_key": settings.PORTONE_IMP_KEY,
+                "imp_secret": settings.PORTONE_IMP_SECRET,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()["response"]
+    except (HttpClientError, requests.RequestException, ValueError, KeyError, TypeError) as e:
+        raise PortOneTokenError(f"포트원 API 토큰 발급 실패: {str(e)}") from e
+
+    # 서버 시각(now) 기준으로 남은 시간을 계산하여 서버 간 시계 차이의 영향을 받지 않게 함
+    expires_in = int(data.get("expired_at", 0)) - int(data.get("now", time.time()))
+    return data["access_token"], expires_in
+
+
+class PortOneTokenManager:
+    """
+    포트원 액세스 토큰을 캐시하고 single-flight로 갱신하는 관리자.
+    """
+
+    def __init__(self, token_cache=cache, fetch=fetch_portone_token):
+        self.cache = token_cache
+        self.fetch = fetch
+        self._local_lock = threading.Lock()
+
+    def _cached_token(self):
+        entry = self.cache.get(TOKEN_CACHE_KEY)
+        if entry and entry.get('refresh_at', 0) > time.time():
+            return entry['token']
+        return None
+
+    def _refresh(self):
+        token, expires_in = self.fetch()
+        ttl = max(1, expires_in - REFRESH_MARGIN)
+        self.cache.set(TOKEN_CACHE_KEY, {'token': token, 'refresh_at': time.time() + ttl}, timeout=ttl)
+        logger.debug(f"포트원 토큰 갱신 (다음 갱신까지 {ttl}초)")
+        return token
+
+    def get_token(self):
+        """
+        유효한 액세스 토큰을 반환하는 함수. 필요한 경우에만 새로 발급한다.
+
+        :raises PortOneTokenError: 발급 실패
+        """
+        token = self._cached_token()
+        if token:
+            return token
+
+        # 같은 프로세스의 다른 스레드는 여기서 기다렸다가 갱신된 토큰을 사용
+        with self._local_lock:
+            token = self._cached_token()
+            if token:
+                return token
+
+            owner = uuid.uuid4().hex
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                if self.cache.add(LOCK_CACHE_KEY, owner, timeout=LOCK_TIMEOUT):
+                    try:
+                        # 잠금을 얻는 사이 다른 프로세스가 갱신했을 수 있음
+                        return self._cached_token() or self._refresh()
+                    finally:
+                        if self.cache.get(LOCK_CACHE_KEY) == owner:
+                            self.cache.delete(LOCK_CACHE_KEY)
+
+                time.sleep(POLL_INTERVAL)
+                token = self._cached_token()
+                if token:
+                    return token
+
+            logger.warning("포트원 토큰 갱신 대기 시간 초과. 잠금 없이 발급합니다.")
+            return self._refresh()
+
+    def invalidate(self):
+        """
+        캐시된 토큰을 버리는 함수. (포트원이 401을 반환한 경우 등)
+        """
+        self.cache.delete(TOKEN_CACHE_KEY)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_portone_token_manager():
+    """
+    프로세스 공용 PortOneTokenManager 인스턴스를 반환하는 함수.
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = PortOneTokenManager()
+    return _manager
@@ -3,6 +3,7 @@ from .models import User, Store, ServiceRequest, Menu, BillingKey, Subscription,
 from django.contrib.auth.hashers import make_password
 from django.conf import settings
 from datetime import date
+from .image_variants import MAX_IMAGE_UPLOAD_SIZE, variant_urls
 import re
 import logging
 
@@ -21,7 +22,7 @@ def validate_file(value, allowed_extensions, max_file_size, error_message_prefix
 
     # 파일 크기 확인
     if value.size > max_file_size:
-        return f"{error_message_prefix} 파일 크기는 {max_file_size // (1000 * 1024 * 1024)}MB 이하이어야 합니다."
+        return f"{error_message_prefix} 파일 크기는 {max_file_size // (1024 * 1024)}MB 이하이어야 합니다."
 
     return None  # 오류가 없는 경우
 
@@ -46,6 +47,13 @@ class PaymentHistorySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+# 결제 내역 목록용 시리얼라이저 (사용자/빌링키 정보 제외)
+class PaymentHistoryListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PaymentHistory
+        fields = ["id", "merchant_uid", "merchant_name", "amount", "status", "created_at", "scheduled_at"]
+
+
 # 유저 관련 시리얼라이저
 class UserSerializer(serializers.ModelSerializer):
     billing_key = BillingKeySerializer(required=False, allow_null=True)
@@ -135,13 +143,22 @@ class UserSerializer(serializers.ModelSerializer):
     # 프로필 사진 검증 (파일 형식과 크기)
     def validate_profile_photo(self, value):
         error_message = validate_file(
-            value, ["png", "jpg", "jpeg"], 1000 * 1024 * 1024, "프로필 사진"
+            value, ["png", "jpg", "jpeg"], MAX_IMAGE_UPLOAD_SIZE, "프로필 사진"
         )
         if error_message:
             raise serializers.ValidationError(error_message)
         return value
 
 
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        # 프로필 사진 썸네일/WebP URL (생성 전이면 빈 dict)
+        representation["profile_photo_variants"] = variant_urls(
+            instance.profile_photo.name if instance.profile_photo else None
+        )
+        return representation
+
+
     def create(self, validated_data):
         """
         사용자 생성: 비밀번호가 None이면 설정하지 않음
@@ -163,7 +180,24 @@ class StoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Store
         fields = "__all__"
-        
+        # 메뉴 스냅샷과 응답 캐시 버전은 메뉴/피드 변경 시 서버에서만 갱신 (faq.menu_snapshot, faq.http_cache)
+        read_only_fields = ["menu_price", "menu_version", "feed_version"]
+
+    def update(self, instance, validated_data):
+        """
+        요청에 포함된 필드만 저장. 전체 저장은 그 사이 다른 요청이 갱신한 menu_price/menu_version 등을
+        불러온 시점의 값으로 되돌릴 수 있다.
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        # 배너 썸네일/WebP URL (생성 전이면 빈 dict)
+        representation["banner_variants"] = variant_urls(instance.banner.name if instance.banner else None)
+        return representation
 
     # 배너 이미지 검증 (빈 값은 허용하며, 파일 형식과 크기 검증)
     def validate_banner(self, value):
@@ -171,7 +205,7 @@ class StoreSerializer(serializers.ModelSerializer):
             return value
 
         error_message = validate_file(
-            value, ["png", "jpg", "jpeg"], 1000 * 1024 * 1024, "배너 사진"
+            value, ["png", "jpg", "jpeg"], MAX_IMAGE_UPLOAD_SIZE, "배너 사진"
         )
         if error_message:
             raise serializers.ValidationError({"banner": error_message})
@@ -314,10 +348,10 @@ class MenuSerializer(serializers.ModelSerializer):
             logger.debug("Image field is None")
             return None
 
-        # 이미지 크기 제한 (예: 5MB 이하)
-        if value.size > 5 * 1024 * 1024 * 1024:
+        # 이미지 크기 제한
+        if value.size > MAX_IMAGE_UPLOAD_SIZE:
             raise serializers.ValidationError(
-                "이미지 파일 크기는 5MB를 초과할 수 없습니다."
+                f"이미지 파일 크기는 {MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)}MB를 초과할 수 없습니다."
             )
 
         # 지원하지 않는 형식 확인 (예: JPG, PNG만 허용)
@@ -334,4 +368,16 @@ class MenuSerializer(serializers.ModelSerializer):
         if instance.image:
             # 이미지 URL에 MEDIA_URL을 추가하여 반환
             representation["image"] = f"{settings.MEDIA_URL}{instance.image}"
+        # 목록 화면용 썸네일/WebP URL (생성 전이면 빈 dict)
+        representation["image_variants"] = variant_urls(instance.image.name if instance.image else None)
         return representation
+
+
+class MenuBulkCreateSerializer(MenuSerializer):
+    """
+    일괄 생성용 메뉴 serializer. 매장은 뷰에서 지정하고(항목별 조회 없음), menu_number는 DB가 부여한다.
+    """
+    store = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta(MenuSerializer.Meta):
+        read_only_fields = ["menu_number"]
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.utils.timezone import now
-from .models import User, ServiceRequest
+from .models import User, ServiceRequest, Menu, Store, FeedImage
+from .http_cache import bump_feed_version, touch_store
+from .image_variants import schedule_variants
+from .media_storage import is_blob_name, media_storage
+from .menu_snapshot import apply_menu_change
 from .excel_processor import process_excel_and_save_to_db  # 엑셀 처리 함수 import
 from .utils import send_slack_notification  # Slack 알림 함수 import
 import logging, os
@@ -25,3 +29,123 @@ def send_ServiceRequest_notification(sender, instance, created, **kwargs):
             f"- *등록 시간*: {now().strftime('%Y-%m-%d %H:%M')}\n"
         )
         send_slack_notification(message)
+
+
+# 메뉴 생성/수정/삭제 시 Store.menu_price 스냅샷의 해당 항목만 갱신
+@receiver(post_save, sender=Menu)
+def update_menu_snapshot_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    apply_menu_change(instance)
+
+
+@receiver(post_delete, sender=Menu)
+def update_menu_snapshot_on_delete(sender, instance, **kwargs):
+    apply_menu_change(instance, deleted=True)
+
+
+# 미디어 필드의 저장소 참조 관리: 불러온 시점의 파일 이름을 기억해 두었다가, 저장 후 다른 파일로 바뀌었거나
+# 행이 삭제되면 이전 cas/ 파일의 참조를 해제한다. (행 하나가 참조 하나를 가짐, faq.media_storage)
+# QuerySet.update()는 시그널을 보내지 않으므로 미디어 필드는 save()로 바꿔야 한다.
+MEDIA_FIELDS = {Menu: 'image', Store: 'banner', User: 'profile_photo'}
+_UNKNOWN = object()
+
+
+def _media_name(value):
+    return getattr(value, 'name', value) or None
+
+
+def loaded_media_name(instance):
+    """
+    행을 불러왔을(또는 마지막으로 저장했을) 때의 미디어 파일 이름. 알 수 없으면 _UNKNOWN.
+    """
+    return getattr(instance, '_loaded_media_name', _UNKNOWN)
+
+
+def _remember_media_name(sender, instance, **kwargs):
+    field_name = MEDIA_FIELDS[sender]
+    # 지연 로딩(only/defer)된 필드는 읽으면 쿼리가 발생하므로 기록하지 않음
+    if field_name in instance.__dict__:
+        instance._loaded_media_name = _media_name(instance.__dict__[field_name])
+    else:
+        instance._loaded_media_name = _UNKNOWN
+
+
+def _load_media_name_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    field_name = MEDIA_FIELDS[sender]
+    if raw or instance._state.adding or loaded_media_name(instance) is not _UNKNOWN:
+        return
+    if update_fields is not None and field_name not in update_fields:
+        return
+    instance._loaded_media_name = _media_name(
+        sender.objects.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+    )
+
+
+def media_changed(instance):
+    """
+    마지막 save()에서 미디어 필드가 새 파일로 바뀌었는지 여부. (파생 이미지 생성 여부 판단)
+    """
+    return getattr(instance, '_media_changed', False)
+
+
+def _release_replaced_media(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    field_name = MEDIA_FIELDS[sender]
+    instance._media_changed = False
+    if raw or (update_fields is not None and field_name not in update_fields):
+        return
+    previous = None if created else loaded_media_name(instance)
+    current = _media_name(getattr(instance, field_name))
+    instance._media_changed = previous != current
+    if previous is not _UNKNOWN and previous != current and is_blob_name(previous):
+        media_storage.release(previous)
+    instance._loaded_media_name = current
+
+
+def _release_deleted_media(sender, instance, **kwargs):
+    name = loaded_media_name(instance)
+    if name is _UNKNOWN:
+        name = _media_name(getattr(instance, MEDIA_FIELDS[sender]))
+    if is_blob_name(name):
+        media_storage.release(name)
+
+
+for _model in MEDIA_FIELDS:
+    post_init.connect(_remember_media_name, sender=_model, dispatch_uid=f'remember_media_name_{_model.__name__}')
+    pre_save.connect(_load_media_name_before_save, sender=_model, dispatch_uid=f'load_media_name_{_model.__name__}')
+    post_save.connect(_release_replaced_media, sender=_model, dispatch_uid=f'release_replaced_media_{_model.__name__}')
+    post_delete.connect(_release_deleted_media, sender=_model, dispatch_uid=f'release_deleted_media_{_model.__name__}')
+
+
+# 이미지 업로드 시 썸네일/WebP 파생 이미지를 요청 처리 후 백그라운드에서 생성
+# (생성이 끝나면 공개 응답 캐시가 새 이미지 URL을 포함하도록 매장 버전 갱신)
+# 이미지가 바뀌지 않은 저장(이름 수정 등)에서는 예약하지 않음. 미디어 필드 receiver가 먼저 연결되어 있어야 함
+@receiver(post_save, sender=Menu)
+def build_menu_image_variants(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image or not media_changed(instance):
+        return
+    store_id = instance.store_id
+    schedule_variants(instance.image.name, on_done=lambda: touch_store(store_id))
+
+
+@receiver(post_save, sender=Store)
+def build_banner_variants(sender, instance, raw=False, **kwargs):
+    if raw or not instance.banner or not media_changed(instance):
+        return
+    store_id = instance.store_id
+    schedule_variants(instance.banner.name, on_done=lambda: touch_store(store_id))
+
+
+@receiver(post_save, sender=User)
+def build_profile_photo_variants(sender, instance, raw=False, **kwargs):
+    if raw or not instance.profile_photo or not media_changed(instance):
+        return
+    schedule_variants(instance.profile_photo.name)
+
+
+@receiver(post_save, sender=FeedImage)
+def build_feed_image_variants(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    store_id = instance.store_id
+    schedule_variants(instance.path, on_done=lambda: bump_feed_version(store_id))
@@ -0,0 +1,21 @@
+# store_resolver.py
+# 공개 식별자(가게명 또는 slug) → Store 조회. 가게명과 slug를 한 번의 Q(store_name)|Q(slug) 쿼리로 찾음
+#
+# 프로세스 내 캐시는 두지 않는다. 매장 응답의 ETag는 updated_at/menu_version/feed_version으로 만들어지고
+# 이 값들은 QuerySet.update()로 바뀌므로(시그널 없음) 매장 객체를 캐시하면 이전 버전을 응답하게 되고,
+# store_id만 캐시하면 기본 키 조회가 한 번 남아 쿼리 수가 줄지 않는다.
+from django.db.models import Q
+from .models import Store
+
+
+def resolve_store(identifier):
+    """
+    가게명 또는 slug에 해당하는 매장을 반환하는 함수. 가게명이 일치하는 매장을 우선한다.
+
+    :return: Store 또는 None
+    """
+    if not identifier:
+        return None
+
+    candidates = list(Store.objects.filter(Q(store_name=identifier) | Q(slug=identifier))[:2])
+    return next((s for s in candidates if s.store_name == identifier), None) or next(iter(candidates), None)
@@ -1,3 +1,559 @@
-from django.test import TestCase
+import base64
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from analytics.ingest import iter_csv_rows, source_csv_files
+from analytics.normalize import TokenCache, normalize_utterances
+from analytics.render import ChartRenderer, data_digest, render_chart
+from analytics.service import StatisticsService
+from analytics.stats_store import UtteranceStatsStore, csv_sources
+from faq.gateways import PortOneGateway
+from faq.gateways.fake import FakeGatewayServer
+from faq.import_jobs import create_import_job, run_import_job
+from faq.models import BillingKey, Menu, PaymentHistory, PaymentWebhookEvent, Store, User
+from faq.pagination import keyset_page
+from faq.payment_webhooks import drain_user_events, process_webhook_event, receive_webhook_event
+from faq.portone_token import PortOneTokenManager
+from faq.utils import schedule_payments_for_user, schedule_renewals, scheduled_merchant_uid
+from http_client import reset_http_clients
 
-# Create your tests here.
+logger = logging.getLogger('faq')
+
+HAS_KONLPY = find_spec('konlpy') is not None
+HAS_MATPLOTLIB = find_spec('matplotlib') is not None
+
+MENUS = ['아메리카노', '카페라떼', '바닐라라떼', '치즈케이크', '크로플', '딸기스무디', '김치찌개', '불고기 정식']
+TEMPLATES = [
+    '{menu} 가격이 얼마예요?',
+    '{menu} 있나요?',
+    '{menu} 추천해 주세요',
+    '{menu} 포장 되나요?',
+    '영업시간이 어떻게 되나요?',
+    '주차 가능한가요?',
+]
+
+
+def synthetic_utterances(distinct):
+    """
+    서로 다른 한국어 발화 distinct개를 만드는 함수.
+    """
+    base = list(dict.fromkeys(template.format(menu=menu) for template in TEMPLATES for menu in MENUS))
+    return [base[i % len(base)] + ('' if i < len(base) else f' {i // len(base)}') for i in range(distinct)]
+
+
+def write_history_csvs(folder_path, rows_per_file, files, utterances, seed=42, weights=None):
+    """
+    실제 대화 기록과 같은 열 배치(2열 agent_id, 6열 user_utterances)의 합성 CSV를 만드는 함수.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for index in range(files):
+        path = os.path.join(folder_path, f'history_{index}.csv')
+        pd.DataFrame({
+            'session_id': range(rows_per_file),
+            'agent_id': [f'agent-{index % 3}'] * rows_per_file,
+            'created_at': ['2024-01-01 12:00'] * rows_per_file,
+            'channel': ['kakao'] * rows_per_file,
+            'intent': ['faq'] * rows_per_file,
+            'user_utterances': rng.choices(utterances, weights=weights, k=rows_per_file),
+        }).to_csv(path, index=False, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def create_owner_store(username, phone='010-0000-0000'):
+    """
+    매장 주인 사용자와 매장을 만드는 함수.
+    """
+    user = User.objects.create_user(username=username, phone=phone)
+    store = Store.objects.create(user=user, store_name=f'{username} 매장', slug=f'{username}-store')
+    return user, store
+
+
+def traced_peak(func):
+    """
+    func 실행 중 파이썬 할당 메모리의 최대치(바이트)와 반환값을 돌려주는 함수.
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+class CsvStreamingIngestTests(SimpleTestCase):
+    """
+    analytics.ingest 스트리밍 수집: 병합 DataFrame이나 merged_output_*.csv 없이 청크 단위로 읽는지 확인
+    """
+    ROWS_PER_FILE = 25_000
+    FILES = 4
+    CHUNK_ROWS = 1_000
+    # 청크 하나(1000행)를 읽는 데 필요한 메모리에 여유를 둔 상한
+    PEAK_MEMORY_BOUND = 4 * 1024 * 1024
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.folder_path = tmp_dir.name
+        # 행마다 다른 긴 발화: 전체를 한 번에 읽으면 파일 크기에 비례해 메모리가 늘어남
+        utterances = [f'아메리카노 가격이 얼마예요? {i} ' + '가' * 40 for i in range(self.ROWS_PER_FILE)]
+        self.paths = write_history_csvs(self.folder_path, self.ROWS_PER_FILE, self.FILES, utterances)
+
+    def test_streaming_reads_every_row(self):
+        rows = list(iter_csv_rows(source_csv_files(self.folder_path), chunksize=self.CHUNK_ROWS))
+        self.assertEqual(len(rows), self.ROWS_PER_FILE * self.FILES)
+        self.assertEqual({agent_id for agent_id, _ in rows}, {'agent-0', 'agent-1', 'agent-2'})
+
+    def test_peak_memory_is_bounded_by_chunk_size(self):
+        def consume():
+            return sum(1 for _ in iter_csv_rows(self.paths, chunksize=self.CHUNK_ROWS))
+
+        stream_peak, count = traced_peak(consume)
+        self.assertEqual(count, self.ROWS_PER_FILE * self.FILES)
+        self.assertLess(stream_peak, self.PEAK_MEMORY_BOUND)
+
+        # 비교 기준: 예전 방식처럼 모든 파일을 읽어 병합
+        full_peak, _ = traced_peak(lambda: pd.concat([pd.read_csv(path) for path in self.paths]))
+        self.assertLess(stream_peak * 5, full_peak)
+
+    def test_stats_store_does_not_write_merged_output(self):
+        stats_store = UtteranceStatsStore(self.folder_path)
+        stats_store.sync('csv', csv_sources(self.folder_path), Counter)
+
+        self.assertEqual(sum(item['count'] for item in stats_store.most_common(None)), self.ROWS_PER_FILE * self.FILES)
+        self.assertFalse(any(name.startswith('merged_output_') for name in os.listdir(self.folder_path)))
+        self.assertEqual(stats_store.agent_ids(), ['agent-0', 'agent-1', 'agent-2'])
+
+
+class StatisticsServiceTenantTests(SimpleTestCase):
+    """
+    통계 대상(tenant)별로 집계 상태와 그래프 경로가 분리되는지 확인
+    """
+
+    def test_paths_are_scoped_by_tenant(self):
+        store = StatisticsService('store', history_root='history', statistics_root='stats', statistics_url='/stats/')
+        corp = StatisticsService('corp', history_root='history', statistics_root='stats', statistics_url='/stats/')
+
+        self.assertNotEqual(store.state_path(7), corp.state_path(7))
+        self.assertNotEqual(store.image_path(7), corp.image_path(7))
+        self.assertEqual(store.image_url(7), '/stats/store/7/most_common_utterances.png')
+        self.assertEqual(corp.image_url(7, digest='a' * 64), f"/stats/corp/7/most_common_utterances.png?v={'a' * 12}")
+
+    def test_unknown_tenant_is_rejected(self):
+        with self.assertRaises(ValueError):
+            StatisticsService('unknown')
+
+
+class MenuBulkCreateQueryTests(TestCase):
+    """
+    메뉴 일괄 생성: 메뉴 수와 관계없이 같은 수의 쿼리로 처리되는지 확인
+    (매장 조회 1회, bulk_create 1회, menu_price 스냅샷 1회)
+    """
+
+    def setUp(self):
+        self.user, self.store = create_owner_store('owner')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('menus-bulk-create')
+
+    def payload(self, count, offset=0):
+        return {'menus': [
+            {'slug': self.store.slug, 'name': f'{MENUS[i % len(MENUS)]} {offset + i}', 'price': '4500', 'category': '음료'}
+            for i in range(count)
+        ]}
+
+    def test_query_count_does_not_grow_with_menu_count(self):
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.post(self.url, self.payload(1), format='json')
+        self.assertEqual(response.status_code, 201)
+
+        with self.assertNumQueries(len(single.captured_queries)):
+            response = self.client.post(self.url, self.payload(50, offset=1), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created_menus']), 50)
+        self.assertEqual(Menu.objects.filter(store=self.store).count(), 51)
+
+        self.store.refresh_from_db()
+        self.assertEqual(len(json.loads(self.store.menu_price)), 51)
+
+
+class ImportJobImageUploadTests(TestCase):
+    """
+    데이터 등록 작업: 단독으로 올린 이미지가 임시 업로드 폴더 삭제 후에도 남는지 확인
+    """
+    IMAGE_BYTES = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        media_root = self.settings(MEDIA_ROOT=tmp_dir.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.user, self.store = create_owner_store('uploader')
+
+    def test_standalone_image_is_kept_after_job_finishes(self):
+        upload = SimpleUploadedFile('menu.png', self.IMAGE_BYTES, content_type='image/png')
+        job = create_import_job(self.user, self.store, [upload])
+
+        # 워커 스레드용 연결 정리는 테스트 트랜잭션을 닫으므로 제외
+        with mock.patch('faq.import_jobs.close_old_connections'):
+            run_import_job(job.job_id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'SUCCESS')
+        self.assertEqual(job.results[0]['status'], 'success')
+        self.assertFalse(os.path.exists(job.upload_dir))
+
+        kept_path = os.path.join(settings.MEDIA_ROOT, 'uploads', f'store_{self.store.store_id}', 'images', 'menu.png')
+        with open(kept_path, 'rb') as kept:
+            self.assertEqual(kept.read(), self.IMAGE_BYTES)
+
+
+class PaymentWebhookInboxTests(TestCase):
+    """
+    결제 웹훅 수신함: 재전송 중복 제거, 재전송 시 재처리, 사용자별 처리 순서, 다음 정기 결제 예약 재시도 확인
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='subscriber', phone='010-1111-2222')
+        # 워커 큐에 넣는 대신 제출된 이벤트만 기록
+        patcher = mock.patch('faq.payment_webhooks.get_webhook_event_queue')
+        self.queue = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def payload(self, imp_uid='imp_1', status='paid'):
+        return {'imp_uid': imp_uid, 'merchant_uid': f'BASIC_{imp_uid}', 'status': status}
+
+    def create_event(self, imp_uid, state='PENDING'):
+        return PaymentWebhookEvent.objects.create(
+            imp_uid=imp_uid, merchant_uid=f'BASIC_{imp_uid}', status='paid', user=self.user, state=state,
+        )
+
+    def test_redelivered_event_is_stored_once(self):
+        first, created = receive_webhook_event(self.payload())
+        self.assertTrue(created)
+        PaymentWebhookEvent.objects.filter(pk=first.pk).update(state='DONE')
+
+        second, created = receive_webhook_event(self.payload())
+        self.assertFalse(created)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(PaymentWebhookEvent.objects.filter(imp_uid='imp_1', status='paid').count(), 1)
+        # 처리가 끝난 이벤트는 다시 큐에 넣지 않음
+        self.assertEqual(self.queue.submit.call_count, 1)
+
+        # 같은 imp_uid라도 상태가 다르면 별도 이벤트
+        _, created = receive_webhook_event(self.payload(status='cancelled'))
+        self.assertTrue(created)
+
+    def test_redelivered_failed_event_is_requeued_as_pending(self):
+        event = self.create_event('imp_failed', state='FAILED')
+
+        _, created = receive_webhook_event(self.payload('imp_failed'))
+
+        self.assertFalse(created)
+        self.queue.submit.assert_called_once()
+        event.refresh_from_db()
+        self.assertEqual(event.state, 'PENDING')
+
+    def test_redelivered_renewal_event_is_requeued_without_reapplying(self):
+        event = self.create_event('imp_renewal', state='RENEWAL')
+
+        _, created = receive_webhook_event(self.payload('imp_renewal'))
+
+        self.assertFalse(created)
+        self.queue.submit.assert_called_once()
+        event.refresh_from_db()
+        self.assertEqual(event.state, 'RENEWAL')
+
+    def test_user_events_are_processed_in_received_order(self):
+        for imp_uid in ['imp_a', 'imp_b', 'imp_c']:
+            self.create_event(imp_uid)
+
+        applied = []
+
+        def apply(event):
+            applied.append(event.imp_uid)
+            if event.imp_uid == 'imp_b':
+                raise ValueError('결제 검증 실패')
+            return False
+
+        with mock.patch('faq.payment_webhooks.apply_payment_webhook', side_effect=apply):
+            processed = drain_user_events(self.user.pk)
+
+        # 중간 이벤트가 실패해도 다음 이벤트는 순서대로 처리
+        self.assertEqual(processed, 3)
+        self.assertEqual(applied, ['imp_a', 'imp_b', 'imp_c'])
+        states = dict(PaymentWebhookEvent.objects.values_list('imp_uid', 'state'))
+        self.assertEqual(states, {'imp_a': 'DONE', 'imp_b': 'FAILED', 'imp_c': 'DONE'})
+
+    def test_renewal_is_retried_without_reapplying_payment(self):
+        event = self.create_event('imp_paid')
+        summaries = [
+            {'users': 1, 'scheduled': 0, 'failed': [self.user.pk]},
+            {'users': 1, 'scheduled': 12, 'failed': []},
+        ]
+
+        with mock.patch('faq.payment_webhooks.apply_payment_webhook', return_value=True) as apply, \
+                mock.patch('faq.payment_webhooks.schedule_renewals', side_effect=summaries) as schedule:
+            drain_user_events(self.user.pk)
+            event.refresh_from_db()
+            self.assertEqual(event.state, 'RENEWAL')
+            self.assertEqual(event.attempts, 2)
+
+            # 재전송 또는 replay_payment_webhooks: 예약만 다시 시도
+            process_webhook_event(event.pk)
+
+        event.refresh_from_db()
+        self.assertEqual(event.state, 'DONE')
+        apply.assert_called_once()
+        self.assertEqual(schedule.call_count, 2)
+        schedule.assert_called_with(user_ids=[self.user.pk])
+
+
+class RenewalSchedulingTests(TestCase):
+    """
+    정기 결제 예약: 가짜 게이트웨이 서버(FakeGatewayServer)로 예약 거부 시 롤백, 같은 달 재예약 시 중복 방지,
+    사용자당 한 번만 예약되는지 확인
+    """
+    SCHEDULE_PATH = 'POST /subscribe/payments/schedule'
+
+    def setUp(self):
+        self.fake = FakeGatewayServer().start()
+        self.addCleanup(self.fake.stop)
+        gateway_settings = self.settings(
+            HTTP_CLIENT_BASE_URLS={'portone': self.fake.base_url}, PORTONE_IMP_KEY='fake', PORTONE_IMP_SECRET='fake',
+        )
+        gateway_settings.enable()
+        self.addCleanup(gateway_settings.disable)
+        # 공용 HTTP 클라이언트가 가짜 서버 주소로 다시 만들어지도록 비움
+        reset_http_clients()
+        self.addCleanup(reset_http_clients)
+
+        token_manager = PortOneTokenManager(token_cache=LocMemCache('portone-test', {}))
+        patcher = mock.patch('faq.utils.get_portone_gateway', return_value=PortOneGateway(token_manager=token_manager))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_subscriber(self, username, is_active=True):
+        user = User.objects.create_user(username=username, phone='010-2222-3333')
+        billing_key = BillingKey.objects.create(
+            user=user, customer_uid=f'customer_{username}', merchant_uid=f'BASIC_{username}',
+            plan='BASIC', amount=9900, is_active=is_active,
+        )
+        return user, billing_key
+
+    def test_rows_are_rolled_back_when_gateway_rejects_schedule(self):
+        user, billing_key = self.create_subscriber('rejected')
+        # 첫 달 merchant_uid가 이미 다른 고객으로 예약되어 있으면 포트원이 예약 전체를 거부함
+        taken = scheduled_merchant_uid(billing_key, timezone.now() + relativedelta(months=1))
+        self.fake.scheduled[taken] = {'merchant_uid': taken, 'customer_uid': 'customer_other'}
+
+        with self.assertRaises(ValidationError):
+            schedule_payments_for_user(user)
+
+        self.assertFalse(PaymentHistory.objects.filter(user=user).exists())
+        self.assertEqual(list(self.fake.scheduled), [taken])
+
+    def test_same_month_is_not_scheduled_twice(self):
+        user, _ = self.create_subscriber('renewal')
+
+        self.assertEqual(schedule_renewals()['scheduled'], 12)
+        # 같은 달에 다시 실행: 남은 예약이 충분하므로 건너뜀
+        self.assertEqual(schedule_renewals()['users'], 0)
+
+        # 포트원에는 예약됐지만 DB 커밋이 실패한 경우: 같은 merchant_uid로 다시 예약하면 기존 예약을 DB에 반영
+        PaymentHistory.objects.filter(user=user, status='scheduled').delete()
+        self.assertEqual(schedule_payments_for_user(user), 12)
+
+        merchant_uids = list(PaymentHistory.objects.filter(user=user).values_list('merchant_uid', flat=True))
+        self.assertEqual(len(merchant_uids), 12)
+        self.assertEqual(set(merchant_uids), set(self.fake.scheduled))
+        self.assertEqual(self.fake.counts[self.SCHEDULE_PATH], 2)
+
+    def test_each_user_is_scheduled_once_per_run(self):
+        # BillingKey.user가 OneToOneField라 한 사용자에게 빌링키 행을 두 개 만들 수 없으므로,
+        # 사용자별로 활성 빌링키 하나만 골라 한 번씩 예약 요청을 보내는지 확인
+        self.create_subscriber('first')
+        self.create_subscriber('second')
+        self.create_subscriber('inactive', is_active=False)
+
+        summary = schedule_renewals()
+
+        self.assertEqual(summary, {'users': 2, 'scheduled': 24, 'failed': []})
+        self.assertEqual(self.fake.counts[self.SCHEDULE_PATH], 2)
+        customers = Counter(schedule['customer_uid'] for schedule in self.fake.scheduled.values())
+        self.assertEqual(customers, {'customer_first': 12, 'customer_second': 12})
+
+
+class PaymentHistoryPaginationTests(TestCase):
+    """
+    결제 내역 키셋 페이지네이션: 같은 created_at 행이 페이지 경계에서 빠지거나 겹치지 않는지,
+    결제예정 내역이 첫 페이지에만 오는지, 잘못된 커서 처리와 페이지 조회 쿼리 수 확인
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='payer', phone='010-3333-4444')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('payment_history_page')
+
+        created_at = timezone.now()
+        # created_at이 모두 같아도 id로 순서가 정해져야 함
+        self.paid_ids = [
+            self.create_history(f'paid_{i}', 'paid', created_at=created_at).pk for i in range(5)
+        ]
+        self.upcoming = self.create_history(
+            'scheduled_1', 'scheduled', created_at=created_at, scheduled_at=created_at + relativedelta(months=1),
+        )
+        self.create_history(
+            'scheduled_2', 'scheduled', created_at=created_at, scheduled_at=created_at + relativedelta(months=2),
+        )
+
+    def create_history(self, merchant_uid, status, **fields):
+        return PaymentHistory.objects.create(
+            user=self.user, imp_uid=f'imp_{merchant_uid}', merchant_uid=merchant_uid, amount=9900, status=status,
+            **fields,
+        )
+
+    def test_pages_continue_across_equal_created_at(self):
+        seen, upcoming, cursor = [], [], None
+        while True:
+            params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            seen += [item['id'] for item in response.data['payment_data']]
+            upcoming.append(response.data['upcoming_payment'])
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, sorted(self.paid_ids, reverse=True))
+        # 결제예정 내역은 가장 가까운 하나만, 첫 페이지에만 포함
+        self.assertEqual(len(upcoming), 3)
+        self.assertEqual(upcoming[0]['id'], self.upcoming.pk)
+        self.assertEqual(upcoming[1:], [None, None])
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ['not-a-cursor', base64.urlsafe_b64encode(b'garbage').decode()]:
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('cursor', response.data)
+
+    def test_page_is_fetched_in_one_query(self):
+        pinned = Q(pk=self.upcoming.pk)
+        with self.assertNumQueries(1):
+            rows, pinned_row, cursor = keyset_page(
+                PaymentHistory.objects.filter(user=self.user), Q(status='paid'), None, 2, pinned=pinned,
+            )
+        self.assertEqual(pinned_row, self.upcoming)
+        self.assertEqual(len(rows), 2)
+
+        with self.assertNumQueries(1):
+            rows, pinned_row, _ = keyset_page(
+                PaymentHistory.objects.filter(user=self.user), Q(status='paid'), cursor, 2, pinned=pinned,
+            )
+        self.assertIsNone(pinned_row)
+        self.assertEqual([row.pk for row in rows], sorted(self.paid_ids, reverse=True)[2:4])
+
+
+@tag('benchmark')
+class AnalyticsBenchmarkTests(SimpleTestCase):
+    """
+    analytics 단계별(수집 → 정규화 → 집계 → 렌더링) 성능 측정. 합성 한국어 발화 사용.
+    일반 실행에서 제외하려면: python manage.py test --exclude-tag benchmark
+    측정 시간은 'faq' 로거(INFO)로 기록한다. 실행 환경에 따라 달라지므로 시간 비교는 검증하지 않는다.
+    """
+    ROWS_PER_FILE = 10_000
+    FILES = 4
+    DISTINCT = 1_000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._tmp_dir = tempfile.TemporaryDirectory()
+        cls.tmp_path = cls._tmp_dir.name
+        cls.history_folder = os.path.join(cls.tmp_path, 'history')
+        os.makedirs(cls.history_folder)
+        # 뒤쪽 발화일수록 덜 자주 등장하도록 가중치
+        utterances = synthetic_utterances(cls.DISTINCT)
+        weights = [1 / (rank + 1) for rank in range(cls.DISTINCT)]
+        write_history_csvs(cls.history_folder, cls.ROWS_PER_FILE, cls.FILES, utterances, weights=weights)
+        cls.timings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp_dir.cleanup()
+        for label, elapsed in cls.timings.items():
+            logger.info(f"[benchmark] {label}: {elapsed:.3f}s")
+        super().tearDownClass()
+
+    def measure(self, label, func, *args, **kwargs):
+        started_at = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.timings[label] = time.perf_counter() - started_at
+        return result
+
+    def utterances(self):
+        return [utterance for _, utterance in iter_csv_rows(source_csv_files(self.history_folder))]
+
+    def test_ingest(self):
+        utterances = self.measure('수집 (CSV 청크 스트리밍)', self.utterances)
+        self.assertEqual(len(utterances), self.ROWS_PER_FILE * self.FILES)
+
+    @skipUnless(HAS_KONLPY, "konlpy가 설치되어 있지 않습니다.")
+    def test_normalize_cold_and_warm_cache(self):
+        unique_utterances = list(dict.fromkeys(self.utterances()))
+        cache = TokenCache(path=os.path.join(self.tmp_path, 'normalize_cache.sqlite3'))
+
+        cold = self.measure('정규화 (캐시 없음)', normalize_utterances, unique_utterances, cache=cache)
+        warm = self.measure('정규화 (캐시 적중)', normalize_utterances, unique_utterances, cache=cache)
+
+        self.assertEqual(cold, warm)
+
+    @skipUnless(HAS_KONLPY, "konlpy가 설치되어 있지 않습니다.")
+    def test_count(self):
+        from analytics.utterances import count_utterances
+
+        utterances = self.utterances()
+        cache = TokenCache(path=os.path.join(self.tmp_path, 'count_cache.sqlite3'))
+        with mock.patch('analytics.normalize._token_cache', cache):
+            counts = self.measure('집계 (count_utterances)', count_utterances, utterances)
+
+        self.assertLessEqual(sum(counts.values()), len(utterances))
+        self.assertTrue(counts)
+
+    @skipUnless(HAS_MATPLOTLIB, "matplotlib이 설치되어 있지 않습니다.")
+    def test_render_skips_unchanged_data(self):
+        data = [{"utterance": utterance, "count": 100 - i} for i, utterance in enumerate(synthetic_utterances(5))]
+        output_image_path = os.path.join(self.tmp_path, 'most_common_utterances.png')
+
+        self.measure('렌더링 (그래프 1회)', render_chart, data, output_image_path, data_digest(data))
+        self.assertTrue(os.path.exists(output_image_path))
+
+        # 같은 데이터면 프로세스 풀을 만들지 않고 완료된 Future를 반환
+        renderer = ChartRenderer()
+        future = self.measure('렌더링 (데이터 같음)', renderer.submit, data, output_image_path)
+        self.assertTrue(future.done())
+        self.assertIsNone(renderer._executor)
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from ..views.payment_views import SubscriptionViewSet
 from ..views import (
     PaymentHistoryView,
+    PaymentHistoryPageView,
     PaymentCompleteMobileView,
     PaymentChangeCompleteMobileView,
     PaymentWebhookView,
@@ -16,6 +17,7 @@ router.register(r'subscription', SubscriptionViewSet, basename='subscription')
 urlpatterns = [
     # ✅ 기존 개별 API 엔드포인트들
     path('payment-history/', PaymentHistoryView.as_view(), name='payment_history'),
+    path('payment-history/page/', PaymentHistoryPageView.as_view(), name='payment_history_page'),
     path('payment-webhook/', PaymentWebhookView.as_view(), name='payment_webhook'),
     path('payment-complete/', PaymentCompleteMobileView.as_view(), name='payment_complete'),
     path('payment-change-complete/', PaymentChangeCompleteMobileView.as_view(), name='payment_change_complete'),
@@ -4,6 +4,7 @@ from ..views import (
     GenerateQrCodeView, 
     QrCodeImageView,
     RegisterDataView,
+    ImportJobStatusView,
     RequestServiceView, 
     StatisticsView,
 )
@@ -13,6 +14,7 @@ urlpatterns = [
     path('qrCodeImage/', QrCodeImageView.as_view(), name='qr_code_image'),
     path('request-service/', RequestServiceView.as_view(), name='request_service'),
     path('register-data/', RegisterDataView.as_view(), name='register_data'),
+    path('register-data/<uuid:job_id>/', ImportJobStatusView.as_view(), name='import_job_status'),
     path('statistics/', StatisticsView.as_view(), name='statistics'),
 
 ]
@@ -1,11 +1,14 @@
 # utils.py
-import requests, logging
-from django.conf import settings
+import logging
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery
 from django.utils import timezone
 from slack_sdk.webhook import WebhookClient
 from dateutil.relativedelta import relativedelta
 from rest_framework.exceptions import ValidationError
 from .models import BillingKey, PaymentHistory
+from .gateways import GatewayError, get_portone_gateway
+from .portone_token import get_portone_token_manager
 
 # 로깅 설정
 logger = logging.getLogger("faq")
@@ -37,46 +40,27 @@ def send_slack_notification(message):
 
 def get_portone_access_token():
     """
-    포트원 API 토큰 발급 요청 함수.
+    포트원 API 액세스 토큰을 반환하는 함수.
+    만료 직전까지 캐시된 토큰을 재사용하고, 필요할 때만 /users/getToken으로 새로 발급한다. (faq.portone_token)
 
     :return: 액세스 토큰 문자열
-    :raises: 요청 실패 시 예외 발생
+    :raises: 발급 실패 시 예외 발생
     """
-    try:
-        response = requests.post(
-            "https://api.iamport.kr/users/getToken",
-            json={
-                "imp_key": settings.PORTONE_IMP_KEY,
-                "imp_secret": settings.PORTONE_IMP_SECRET,
-            },
-        )
-        response.raise_for_status()
-        access_token = response.json()["response"]["access_token"]
-        return access_token
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"포트원 API 토큰 발급 실패: {str(e)}")
+    return get_portone_token_manager().get_token()
 
 
-def verify_payment(imp_uid, access_token):
+def verify_payment(imp_uid):
     """
     포트원 결제 검증 함수.
 
     :param imp_uid: 포트원의 결제 고유 ID
-    :param access_token: 포트원 API 액세스 토큰
     :return: 결제 정보(JSON) 또는 None
     """
-    url = f"https://api.iamport.kr/payments/{imp_uid}"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
-
-    print(f"🔍 요청 URL: {url}")
-    print(f"🔍 응답 코드: {response.status_code}")
-    print(f"🔍 응답 본문: {response.json()}")
-
-    if response.status_code == 200:
-        return response.json().get("response")
-
-    return None
+    try:
+        return get_portone_gateway().get_payment(imp_uid)
+    except GatewayError as e:
+        logger.warning(f"포트원 결제 조회 실패: imp_uid={imp_uid}, {e}")
+        return None
 
 
 def format_card_number(raw_card_number):
@@ -117,13 +101,7 @@ def get_card_info(user):
         return {"card_name": "Unknown Bank", "card_number": "카드 정보 조회 실패"}
 
     try:
-        access_token = get_portone_access_token()
-        response = requests.get(
-            f"https://api.iamport.kr/subscribe/customers/{billing_key.customer_uid}",
-            headers={"Authorization": access_token},
-        )
-        response.raise_for_status()
-        card_data = response.json().get("response", {})
+        card_data = get_portone_gateway().get_billing_customer(billing_key.customer_uid) or {}
 
         # 카드 번호 마스킹 처리
         raw_card_number = card_data.get("card_number", "카드 정보 없음")
@@ -134,71 +112,140 @@ def get_card_info(user):
             "card_number": formatted_card_number,
         }
 
-    except requests.exceptions.RequestException as e:
+    except GatewayError:
         return {"card_name": "Unknown Bank", "card_number": "카드 정보 조회 실패"}
     
     
-# 예약 결제 test
-def schedule_payments_for_user(user):
+# 정기 결제 예약
+SCHEDULE_MONTHS = 12  # 한 번에 예약하는 개월 수
+RENEWAL_THRESHOLD = 2  # 남은 예약이 이 개수 이하이면 다음 예약 등록
+
+
+def scheduled_merchant_uid(billing_key, schedule_date):
     """
-    사용자의 정기 결제를 매일 자동으로 예약하는 함수.
+    예약 결제의 merchant_uid. 결제 월로 정해지므로 같은 달을 다시 예약해도 같은 값이 된다. (중복 예약 방지)
     """
+    return f"{billing_key.merchant_uid}_{schedule_date:%Y%m}"
 
-    billing_key = BillingKey.objects.filter(user=user, is_active=True).first()
-    if not billing_key:
-        raise ValidationError("활성화된 BillingKey가 없습니다.")
 
-    access_token = get_portone_access_token()
+def _schedule_for_billing_key(billing_key, months=SCHEDULE_MONTHS):
+    """
+    빌링키 하나의 다음 정기 결제를 예약하는 함수.
 
-    last_scheduled_payment = (
-        PaymentHistory.objects.filter(user=user, status="scheduled")
-        .order_by("-scheduled_at")
-        .first()
-    )
+    - 빌링키 행을 잠근 상태에서 예약 행을 bulk_create하고, 포트원이 예약을 승인한 뒤에 커밋한다.
+      포트원 호출이 실패하면 트랜잭션이 롤백되어 "scheduled" 행이 남지 않는다.
+    - merchant_uid는 결제 월 기준이므로 이미 있는 예약은 건너뛴다. (같은 사용자에 대한 중복 호출에 안전)
 
-    if last_scheduled_payment:
-        start_date = last_scheduled_payment.scheduled_at + relativedelta(months=1)
-    else:
-        start_date = timezone.now() + relativedelta(months=1)
-
-    schedules = []
-
-    for i in range(12):  # 1년 동안 예약
-        schedule_date = start_date + relativedelta(months=i)
-        merchant_uid = f"{billing_key.merchant_uid}_{i+2}"
-
-        PaymentHistory.objects.create(
-            user=user,
-            billing_key=billing_key,
-            imp_uid=f"scheduled_{merchant_uid}",
-            merchant_uid=merchant_uid,
-            merchant_name=f"{billing_key.plan} 구독 결제 (예약)",
-            amount=billing_key.amount,
-            status="scheduled",
-            scheduled_at=schedule_date,
-            created_at=timezone.now(),
+    :return: 새로 예약한 개수
+    """
+    user = billing_key.user
+    with transaction.atomic():
+        # 같은 사용자의 동시 예약(웹훅 중복 수신 등)을 직렬화
+        BillingKey.objects.select_for_update().filter(pk=billing_key.pk).first()
+
+        last_scheduled_at = PaymentHistory.objects.filter(
+            user=user, status="scheduled"
+        ).aggregate(last=Max("scheduled_at"))["last"]
+        start_date = (last_scheduled_at or timezone.now()) + relativedelta(months=1)
+
+        candidates = {}
+        for i in range(months):
+            schedule_date = start_date + relativedelta(months=i)
+            candidates[scheduled_merchant_uid(billing_key, schedule_date)] = schedule_date
+
+        existing = set(
+            PaymentHistory.objects.filter(merchant_uid__in=candidates).values_list("merchant_uid", flat=True)
         )
+        name = f"{billing_key.plan} 구독 결제 (예약)"
+        now = timezone.now()
+        rows = [
+            PaymentHistory(
+                user=user,
+                billing_key=billing_key,
+                imp_uid=f"scheduled_{merchant_uid}",
+                merchant_uid=merchant_uid,
+                merchant_name=name,
+                amount=billing_key.amount,
+                status="scheduled",
+                scheduled_at=schedule_date,
+                created_at=now,
+            )
+            for merchant_uid, schedule_date in candidates.items()
+            if merchant_uid not in existing
+        ]
+        if not rows:
+            return 0
+
+        PaymentHistory.objects.bulk_create(rows)
+
+        schedules = [
+            {
+                "merchant_uid": row.merchant_uid,
+                "schedule_at": int(row.scheduled_at.timestamp()),
+                "amount": float(billing_key.amount),
+                "name": name,
+                "buyer_email": user.email,
+                "buyer_name": user.name,
+                "buyer_tel": user.phone,
+            }
+            for row in rows
+        ]
+        gateway = get_portone_gateway()
+        try:
+            gateway.schedule_payments(billing_key.customer_uid, schedules)
+        except GatewayError as e:
+            # 이전 시도에서 포트원에는 예약됐지만 DB 커밋이 실패한 경우: 이미 예약된 것으로 보고 행만 저장
+            merchant_uids = [row.merchant_uid for row in rows]
+            if e.code is None or not gateway.are_scheduled(merchant_uids):
+                raise ValidationError(f"스케줄 등록 실패: {e}")
+            logger.warning(f"포트원에 이미 예약된 결제를 DB에 반영합니다: {merchant_uids}")
+
+    return len(rows)
+
+
+def schedule_payments_for_user(user, months=SCHEDULE_MONTHS):
+    """
+    사용자의 다음 정기 결제(기본 12개월)를 예약하는 함수.
 
-        schedule = {
-            "merchant_uid": merchant_uid,
-            "schedule_at": int(schedule_date.timestamp()),
-            "amount": float(billing_key.amount),
-            "name": f"{billing_key.plan} 구독 결제 (예약)",
-            "buyer_email": user.email,
-            "buyer_name": user.name,
-            "buyer_tel": user.phone,
-        }
-        schedules.append(schedule)
+    :return: 새로 예약한 개수
+    """
+    billing_key = BillingKey.objects.filter(user=user, is_active=True).select_related("user").order_by("pk").first()
+    if not billing_key:
+        raise ValidationError("활성화된 BillingKey가 없습니다.")
 
-    schedule_url = "https://api.iamport.kr/subscribe/payments/schedule"
-    schedule_data = {"customer_uid": billing_key.customer_uid, "schedules": schedules}
+    return _schedule_for_billing_key(billing_key, months)
 
-    schedule_response = requests.post(
-        schedule_url, json=schedule_data, headers={"Authorization": access_token}
-    )
-    schedule_result = schedule_response.json()
-    #print(f"📥 스케줄 응답 데이터: {schedule_result}")
 
-    if schedule_result.get("code") != 0:
-        raise ValidationError(f"스케줄 등록 실패: {schedule_result.get('message')}")
+def schedule_renewals(threshold=RENEWAL_THRESHOLD, months=SCHEDULE_MONTHS, user_ids=None):
+    """
+    남은 예약이 threshold개 이하인 활성 빌링키를 한 번에 찾아 다음 정기 결제를 예약하는 함수. (월간 cron)
+    사용자별로 트랜잭션이 나뉘므로 한 사용자의 실패가 다른 사용자에 영향을 주지 않는다.
+    활성 빌링키가 여러 개인 사용자도 한 번만 결제되도록, schedule_payments_for_user()와 같은 빌링키
+    (활성 빌링키 중 가장 먼저 등록된 것) 하나만 예약한다.
 
+    :return: {"users": 대상 사용자 수, "scheduled": 새 예약 수, "failed": [user_id, ...]}
+    """
+    first_active_key = (
+        BillingKey.objects.filter(user=OuterRef("user"), is_active=True).order_by("pk").values("pk")[:1]
+    )
+    billing_keys = (
+        BillingKey.objects.filter(is_active=True, pk=Subquery(first_active_key))
+        .annotate(remaining=Count(
+            "user__payment_history",
+            filter=Q(user__payment_history__status="scheduled", user__payment_history__scheduled_at__gte=timezone.now()),
+        ))
+        .filter(remaining__lte=threshold)
+        .select_related("user")
+    )
+    if user_ids is not None:
+        billing_keys = billing_keys.filter(user_id__in=user_ids)
+
+    summary = {"users": 0, "scheduled": 0, "failed": []}
+    for billing_key in billing_keys.iterator():
+        summary["users"] += 1
+        try:
+            summary["scheduled"] += _schedule_for_billing_key(billing_key, months)
+        except Exception as e:
+            logger.error(f"정기 결제 예약 실패: user_id={billing_key.user_id}, {e}")
+            summary["failed"].append(billing_key.user_id)
+    return summary
@@ -5,5 +5,5 @@ from .auth_views import OAuthLoginAPIView, SocialSignupView, OAuthJWTTokenView
 from .user_views import UserProfileView, UserProfilePhotoUpdateView, PushTokenView, SendPushNotificationView
 from .store_views import StoreViewSet, FeedViewSet
 from .menu_views import MenuViewSet
-from .utility_views import GenerateQrCodeView, QrCodeImageView, StatisticsView, RegisterDataView, RequestServiceView
-from .payment_views import SubscriptionViewSet, KcpPaymentAPIView, KcpApprovalAPIView, PaymentHistoryView, PaymentCompleteMobileView, PaymentChangeCompleteMobileView, PaymentWebhookView
+from .utility_views import GenerateQrCodeView, QrCodeImageView, StatisticsView, RegisterDataView, ImportJobStatusView, RequestServiceView
+from .payment_views import SubscriptionViewSet, KcpPaymentAPIView, KcpApprovalAPIView, PaymentHistoryView, PaymentHistoryPageView, PaymentCompleteMobileView, PaymentChangeCompleteMobileView, PaymentWebhookView
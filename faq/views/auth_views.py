@@ -14,9 +14,11 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-import random, logging, os, shutil, requests, re
+import random, logging, os, shutil, re
+from http_client import HttpClientError, get_http_client, verify_recaptcha
 from send_sms import send_aligo_sms
-from ..models import User, Store, ServiceRequest, Menu, Subscription, PaymentHistory
+from ..feed_catalog import delete_feed_image
+from ..models import User, Store, ServiceRequest, Menu, Subscription, PaymentHistory, FeedImage
 from ..serializers import (
     UserSerializer,
     StoreSerializer,
@@ -189,17 +191,8 @@ class LoginView(APIView):
         """
         CAPTCHA 검증 로직 (Google reCAPTCHA v3 사용)
         """
-        url = "https://www.google.com/recaptcha/api/siteverify"
-        data = {"secret": settings.RECAPTCHA_V3_SECRET_KEY, "response": token}
-        response = requests.post(url, data=data).json()
-        print(f"google capcha response : {response}")
-        success = response.get("success", False)
-        score = response.get("score", 0)
-
-        # reCAPTCHA 점수 확인 로그 추가
-        print(f"[reCAPTCHA] Success: {success}, Score: {score}")
-
-        return success, score
+        # 공용 HTTP 클라이언트 사용 (연결 재사용, 타임아웃, 서킷 브레이커)
+        return verify_recaptcha(settings.RECAPTCHA_V3_SECRET_KEY, token)
 
 
 # Other User APIs
@@ -546,7 +539,7 @@ class DeactivateAccountView(APIView):
         for store in stores:
             store.store_name = f"익명화된 가게_{store.store_id}"  # 가게 이름 익명화
             store.slug = f"deleted-store_{store.store_id}"  # 간단한 익명화 처리
-            store.save()
+            store.save(update_fields=["store_name", "slug", "updated_at"])
 
             # 가게의 메뉴 익명화 처리
             menus = Menu.objects.filter(store=store)
@@ -570,8 +563,22 @@ class DeactivateAccountView(APIView):
     def delete_user_folder(self, user):
         """
         탈퇴한 사용자의 파일이 저장된 폴더를 삭제.
+        내용 주소 저장소(cas/)의 파일은 이미지 필드를 비워 참조를 해제하므로(faq.signals), 다른 사용자가
+        같은 파일을 쓰고 있으면 남겨둔다.
         """
 
+        # 배너/프로필 사진 참조 해제 (메뉴 이미지는 anonymize_stores에서 해제됨)
+        for store in Store.objects.filter(user=user).exclude(banner="").exclude(banner__isnull=True):
+            store.banner = None
+            store.save(update_fields=["banner", "updated_at"])
+        if user.profile_photo:
+            user.profile_photo = None
+            user.save(update_fields=["profile_photo"])
+
+        # 피드 이미지 참조 해제
+        for feed_image in FeedImage.objects.filter(store__user=user):
+            delete_feed_image(feed_image)
+
         stores = Store.objects.filter(user=user)
         for store in stores:
 
@@ -771,7 +778,7 @@ class OAuthLoginAPIView(APIView):
                 "redirect_uri": oauth_settings[provider]["redirect_uri"],
                 "code": code,
             }
-            token_response = requests.post(
+            token_response = get_http_client(f"oauth_{provider}").post(
                 oauth_settings[provider]["token_url"], data=token_data
             )
             token_json = token_response.json()
@@ -867,6 +874,13 @@ class OAuthLoginAPIView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
+        except HttpClientError as e:
+            logger.warning(f"OAuthLoginAPIView 외부 API 호출 실패: {str(e)}")
+            return Response(
+                {"error": "소셜 로그인 서비스에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
         except Exception as e:
             print(f"❌ [OAuthLoginAPIView] 서버 오류 발생: {str(e)}")
             logger.error(f"OAuthLoginAPIView 서버 오류: {str(e)}")
@@ -883,7 +897,7 @@ class OAuthLoginAPIView(APIView):
             headers = {"Authorization": f"Bearer {access_token}"}
 
             if provider == "kakao":
-                response = requests.get(
+                response = get_http_client("oauth_kakao").get(
                     "https://kapi.kakao.com/v2/user/me", headers=headers
                 )
                 data = response.json()
@@ -905,7 +919,7 @@ class OAuthLoginAPIView(APIView):
                 }
 
             elif provider == "naver":
-                response = requests.get(
+                response = get_http_client("oauth_naver").get(
                     "https://openapi.naver.com/v1/nid/me", headers=headers
                 )
                 data = response.json().get("response", {})
@@ -8,9 +8,13 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated, AllowAny
-import logging, json
+import logging
+from ..http_cache import cached_store_response
+from ..image_variants import schedule_menu_image_variants
+from ..menu_snapshot import deferred_snapshot, rebuild_menu_price
 from ..models import Store, Menu
-from ..serializers import MenuSerializer
+from ..serializers import MenuSerializer, MenuBulkCreateSerializer
+from ..store_resolver import resolve_store
 
 logger = logging.getLogger('faq')
 
@@ -71,18 +75,16 @@ class MenuViewSet(ViewSet):
         decoded_value = unquote(slug_or_name)
 
         try:
-            # 1) store_name으로 검색
-            store = Store.objects.filter(store_name=decoded_value).first()
-            # 2) 없으면 slug로 검색
-            if not store:
-                store = Store.objects.filter(slug=decoded_value).first()
+            # store_name 또는 slug로 검색 (store_name 우선)
+            store = resolve_store(decoded_value)
 
             if not store:
                 return Response({"error": "스토어를 찾을 수 없습니다."}, status=404)
 
-            menus = Menu.objects.filter(store=store)
-            serializer = MenuSerializer(menus, many=True)
-            return Response(serializer.data, status=200)
+            # 메뉴가 바뀌지 않았으면 304 또는 캐시된 응답 반환
+            return cached_store_response(
+                request, store, 'menus', lambda: MenuSerializer(Menu.objects.filter(store=store), many=True).data
+            )
 
         except Exception as e:
             # 예상치 못한 예외 처리
@@ -92,35 +94,53 @@ class MenuViewSet(ViewSet):
 
     def create(self, request):
         """
-        메뉴 생성
+        메뉴 생성 (일괄 생성과 같은 경로로 처리)
+        """
+        return self._create_menus(request)
+
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        메뉴 일괄 생성
+        - 매장은 slug별로 한 번만 조회하고, 모든 메뉴를 먼저 검증한 뒤 한 번의 bulk_create로 저장
+        - menu_number는 DB가 부여하며, 매장별 menu_price 스냅샷은 마지막에 한 번만 다시 만듦
         """
+        return self._create_menus(request)
+
+
+    def _create_menus(self, request):
         menus = self.extract_menus_from_request(request, 'create')
         if not menus:
             return Response({'error': '메뉴 데이터가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        created_menus = []
+        # slug별 매장 조회 결과를 재사용
+        stores = {}
+        slugs = []
+        for menu_data in menus:
+            store_slug = unquote(menu_data.pop('slug', None) or '')
+            if store_slug not in stores:
+                stores[store_slug] = Store.objects.filter(slug=store_slug, user=request.user).first()
+            if stores[store_slug] is None:
+                return Response({'error': '스토어를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+            slugs.append(store_slug)
+
+        serializer = MenuBulkCreateSerializer(data=menus, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        new_menus = [
+            Menu(store=stores[store_slug], **validated_data)
+            for store_slug, validated_data in zip(slugs, serializer.validated_data)
+        ]
         with transaction.atomic():
-            for menu_data in menus:
-                store_slug = unquote(menu_data.get('slug'))
-                try:
-                    store = Store.objects.get(slug=store_slug, user=request.user)
-                except Store.DoesNotExist:
-                    return Response({'error': '스토어를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
-
-                last_menu = Menu.objects.filter(store=store).order_by('-menu_number').first()
-                menu_data['menu_number'] = (last_menu.menu_number + 1) if last_menu else 1
-                menu_data['store'] = store.store_id
-
-                serializer = MenuSerializer(data=menu_data)
-                if serializer.is_valid():
-                    created_menu = serializer.save()
-                    created_menus.append(serializer.data)
-                else:
-                    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-            update_menu_price_field(store)
-
-        return Response({'created_menus': created_menus}, status=status.HTTP_201_CREATED)
+            created_menus = Menu.objects.bulk_create(new_menus)
+            for store in stores.values():
+                rebuild_menu_price(store)
+            schedule_menu_image_variants(created_menus)
+
+        created_data = MenuBulkCreateSerializer(created_menus, many=True).data
+        return Response({'created_menus': created_data}, status=status.HTTP_201_CREATED)
     
 
 
@@ -206,8 +226,9 @@ class MenuViewSet(ViewSet):
 
         try:
             store = Store.objects.get(slug=slug, user=request.user)
-            Menu.objects.filter(store=store, category=category).delete()
-            update_menu_price_field(store)
+            # 메뉴별 시그널 대신 삭제 후 스냅샷을 한 번만 다시 만듦
+            with transaction.atomic(), deferred_snapshot(store):
+                Menu.objects.filter(store=store, category=category).delete()
 
             return Response({'message': f'카테고리 "{category}" 삭제 성공.'}, status=status.HTTP_204_NO_CONTENT)
 
@@ -220,6 +241,10 @@ class MenuViewSet(ViewSet):
         요청 데이터에서 메뉴를 추출
         """
         menus = []
+        # JSON 요청: {"menus": [{"slug": ..., "name": ..., ...}, ...]}
+        if isinstance(request.data.get('menus'), list):
+            return [dict(menu_data) for menu_data in request.data['menus'] if isinstance(menu_data, dict)]
+
         if 'slug' in request.data:
             menu_data = {
                 'slug': request.data.get('slug'),
@@ -247,21 +272,3 @@ class MenuViewSet(ViewSet):
                 index += 1
         return menus
 
-
-def update_menu_price_field(store):
-    """
-    Store의 menu_price 필드를 업데이트
-    """
-    menus = Menu.objects.filter(store=store)
-    menu_price_data = [
-        {
-            'name': menu.name,
-            'price': float(menu.price),
-            'category': menu.category,
-            'image': str(menu.image.url) if menu.image else None,
-            'allergy': menu.allergy or ""
-        }
-        for menu in menus
-    ]
-    store.menu_price = json.dumps(menu_price_data, ensure_ascii=False)
-    store.save()
@@ -6,12 +6,17 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-import logging, os, uuid, json
-from django.conf import settings
+import logging, os, json
 from django.shortcuts import get_object_or_404
 from urllib.parse import unquote
+from ..feed_catalog import (
+    DEFAULT_PAGE_SIZE, delete_feed_image, feed_image_entry, find_feed_image, list_feed_images, save_feed_image,
+)
+from ..http_cache import bump_feed_version, cached_store_response
+from ..image_variants import MAX_IMAGE_UPLOAD_SIZE
 from ..models import Store
 from ..serializers import StoreSerializer
+from ..store_resolver import resolve_store
 
 logger = logging.getLogger('faq')
 
@@ -62,17 +67,14 @@ class StoreViewSet(ViewSet):
         # URL에 한글이나 공백이 있을 수 있으므로 디코딩
         decoded_param = unquote(slug_param)
 
-        # 1) store_name으로 먼저 검색
-        store = Store.objects.filter(store_name=decoded_param).first()
-        # 2) 없으면 slug로 검색
-        if not store:
-            store = Store.objects.filter(slug=decoded_param).first()
+        # store_name 또는 slug로 검색 (store_name 우선)
+        store = resolve_store(decoded_param)
 
         if not store:
             return Response({"error": "해당 매장을 찾을 수 없습니다."}, status=404)
 
-        serializer = StoreSerializer(store)
-        return Response(serializer.data, status=200)
+        # 매장 정보가 바뀌지 않았으면 304 또는 캐시된 응답 반환
+        return cached_store_response(request, store, 'detail', lambda: StoreSerializer(store).data)
         
 
     def update(self, request, pk=None):
@@ -153,6 +155,21 @@ class FeedViewSet(ViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @staticmethod
+    def _page_params(request):
+        """
+        page, page_size 쿼리 파라미터를 정수로 반환 (잘못된 값은 기본값 사용)
+        """
+        try:
+            page = int(request.query_params.get('page', 1))
+        except (TypeError, ValueError):
+            page = 1
+        try:
+            page_size = int(request.query_params.get('page_size', DEFAULT_PAGE_SIZE))
+        except (TypeError, ValueError):
+            page_size = DEFAULT_PAGE_SIZE
+        return page, page_size
+
     @action(detail=False, methods=['get'])
     def list_images(self, request):
         """
@@ -172,28 +189,8 @@ class FeedViewSet(ViewSet):
                 logger.error("Either slug or store_id must be provided.")
                 return Response({'error': 'store_id 중 하나가 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            feed_dir = os.path.join(settings.MEDIA_ROOT, f"uploads/store_{store_id}/feed")
-            logger.debug(f"Feed directory path: {feed_dir}")
-
-            if not os.path.exists(feed_dir):
-                logger.info(f"Feed directory does not exist. Creating directory: {feed_dir}")
-                os.makedirs(feed_dir, exist_ok=True)
-
-            files = os.listdir(feed_dir)
-            logger.debug(f"Files found in feed directory: {files}")
-
-            image_files = [
-                {
-                    'id': os.path.splitext(file)[0].rsplit('_', 1)[-1],
-                    'name': os.path.splitext(file)[0].rsplit('_', 1)[0],
-                    'ext' : os.path.splitext(file)[1],
-                    'path': os.path.join('uploads', f'store_{store_id}/feed', file).replace("\\", "/")
-                }
-                for file in files if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))
-            ]
-            logger.debug(f"Image files to return: {image_files}")
-
-            return Response({'images': image_files}, status=status.HTTP_200_OK)
+            page, page_size = self._page_params(request)
+            return Response(list_feed_images(store.store_id, page, page_size), status=status.HTTP_200_OK)
         except Store.DoesNotExist:
             logger.error("Store does not exist for provided slug or store_id.")
             return Response({'error': '스토어를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
@@ -207,7 +204,7 @@ class FeedViewSet(ViewSet):
     def list_images_by_slug(self, request):
         """
         특정 매장(가게명 혹은 slug 기반)의 피드 출력 API
-        - 예: /api/store/list_images_by_slug?slug=무물 떡볶이
+        - 예: /api/store/list_images_by_slug?slug=무물 떡볶이&page=1&page_size=100
         """
         slug_or_name = request.query_params.get('slug')
         if not slug_or_name:
@@ -217,43 +214,21 @@ class FeedViewSet(ViewSet):
         decoded_param = unquote(slug_or_name)
 
         try:
-            # 1) store_name으로 먼저 검색
-            store = Store.objects.filter(store_name=decoded_param).first()
-            # 2) 없으면 slug로 검색
-            if not store:
-                store = Store.objects.filter(slug=decoded_param).first()
+            # store_name 또는 slug로 검색 (store_name 우선)
+            store = resolve_store(decoded_param)
 
             if not store:
                 logger.error("Store does not exist for provided store_name or slug.")
                 return Response({'error': '스토어를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
 
-            store_id = store.store_id
-            logger.debug(f"Store found. Store ID: {store_id}")
-
-            feed_dir = os.path.join(settings.MEDIA_ROOT, f"uploads/store_{store_id}/feed")
-            logger.debug(f"Feed directory path: {feed_dir}")
-
-            # 폴더가 없으면 생성
-            if not os.path.exists(feed_dir):
-                logger.info(f"Feed directory does not exist. Creating directory: {feed_dir}")
-                os.makedirs(feed_dir, exist_ok=True)
-
-            files = os.listdir(feed_dir)
-            logger.debug(f"Files found in feed directory: {files}")
+            logger.debug(f"Store found. Store ID: {store.store_id}")
 
-            image_files = [
-                {
-                    'id': os.path.splitext(file)[0].rsplit('_', 1)[-1],
-                    'name': os.path.splitext(file)[0].rsplit('_', 1)[0],
-                    'ext': os.path.splitext(file)[1],
-                    'path': os.path.join('uploads', f'store_{store_id}/feed', file).replace("\\", "/")
-                }
-                for file in files
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))
-            ]
-            logger.debug(f"Image files to return: {image_files}")
-
-            return Response({'images': image_files}, status=status.HTTP_200_OK)
+            # 피드가 바뀌지 않았으면 304 또는 캐시된 응답 반환
+            page, page_size = self._page_params(request)
+            return cached_store_response(
+                request, store, f'feed:{page}:{page_size}',
+                lambda: list_feed_images(store.store_id, page, page_size)
+            )
 
         except Exception as e:
             logger.exception(f"Unexpected error occurred: {e}")
@@ -269,25 +244,27 @@ class FeedViewSet(ViewSet):
         if not store_id:
             return Response({'error': 'store_id가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        upload_dir = os.path.join(settings.MEDIA_ROOT, f"uploads/store_{store_id}/feed")
-        os.makedirs(upload_dir, exist_ok=True)
-
         file = request.FILES.get('file')
         if not file:
             return Response({'error': '파일이 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        unique_filename = f"{os.path.splitext(file.name)[0]}_{uuid.uuid4()}{os.path.splitext(file.name)[1]}"
-        file_path = os.path.join(upload_dir, unique_filename)
+        if file.size > MAX_IMAGE_UPLOAD_SIZE:
+            return Response(
+                {'error': f'이미지 파일 크기는 {MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)}MB를 초과할 수 없습니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not Store.objects.filter(store_id=store_id).exists():
+            return Response({'error': '스토어를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
 
-        with open(file_path, 'wb+') as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
+        image = save_feed_image(store_id, file)
+        bump_feed_version(store_id)
 
-        relative_path = os.path.relpath(file_path, settings.MEDIA_ROOT).replace("\\", "/")
         return Response({
             'success': True,
-            'file_path': relative_path,
-            'stored_name': unique_filename
+            'file_path': image.path,
+            'stored_name': os.path.basename(image.path),
+            'image': feed_image_entry(image),
         }, status=status.HTTP_201_CREATED)
     
 
@@ -295,7 +272,7 @@ class FeedViewSet(ViewSet):
     @action(detail=False, methods=['delete'])
     def delete_image(self, request):
         """
-        피드 이미지 삭제
+        피드 이미지 삭제 (id는 이미지 uuid 또는 저장된 파일 이름)
         """
         image_id = request.data.get('id')
         store_id = request.data.get('store_id')
@@ -303,9 +280,10 @@ class FeedViewSet(ViewSet):
         if not image_id or not store_id:
             return Response({'error': 'id와 store_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        file_path = os.path.join(settings.MEDIA_ROOT, f"uploads/store_{store_id}/feed/{image_id}")
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        image = find_feed_image(store_id, image_id)
+        if image:
+            delete_feed_image(image)
+            bump_feed_version(store_id)
             return Response({'success': True}, status=status.HTTP_200_OK)
         return Response({'error': '이미지를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -313,6 +291,9 @@ class FeedViewSet(ViewSet):
 
     @action(detail=False, methods=['put'])
     def rename_image(self, request):
+        """
+        피드 이미지 이름 변경 (파일은 그대로 두고 표시용 이름만 변경)
+        """
         logger.debug(f"Received request data for rename_image: {request.data}")
 
         image_id = request.data.get('id')
@@ -323,19 +304,14 @@ class FeedViewSet(ViewSet):
             logger.error("Missing required parameters.")
             return Response({'error': 'id, name, store_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        base_dir = os.path.join(settings.MEDIA_ROOT, f"uploads/store_{store_id}/feed")
-        old_file_path = os.path.join(base_dir, image_id)
-        if not os.path.exists(old_file_path):
-            logger.error(f"File not found: {old_file_path}")
+        image = find_feed_image(store_id, image_id)
+        if not image:
+            logger.error(f"Feed image not found: store_id={store_id}, id={image_id}")
             return Response({'error': '파일을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
 
-        new_file_name = f"{new_name}_{uuid.uuid4()}{os.path.splitext(image_id)[1]}"
-        new_file_path = os.path.join(base_dir, new_file_name)
-        os.rename(old_file_path, new_file_path)
-
-        logger.debug(f"File renamed to: {new_file_name}")
-        return Response({'success': True, 'new_name': new_file_name}, status=status.HTTP_200_OK)
-    
-    
-        
+        image.name = new_name
+        image.save(update_fields=['name', 'updated_at'])
+        bump_feed_version(store_id)
 
+        logger.debug(f"Feed image renamed to: {new_name}")
+        return Response({'success': True, 'new_name': os.path.basename(image.path), 'image': feed_image_entry(image)}, status=status.HTTP_200_OK)
@@ -83,7 +83,7 @@ class UserProfileView(APIView):
         if store:
             store.store_name = data.get('business_name', store.store_name)
             store.store_address = data.get('business_address', store.store_address)
-            store.save()
+            store.save(update_fields=['store_name', 'store_address', 'updated_at'])
             logger.debug(f"Store updated for user {user.username}: {store}")
         
         billing_key_data = BillingKeySerializer(user.billing_key).data if user.billing_key else None
@@ -11,7 +11,8 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-import random, logging, requests
+import random, logging
+from http_client import verify_recaptcha
 from send_sms import send_aligo_sms
 from ..models import Public_User, Public, Public_Department, Public_ServiceRequest, Public_Complaint
 from ..serializers import (
@@ -166,17 +167,8 @@ class LoginView(APIView):
         """
         CAPTCHA 검증 로직 (Google reCAPTCHA v3 사용)
         """
-        url = "https://www.google.com/recaptcha/api/siteverify"
-        data = {"secret": settings.RECAPTCHA_V3_SECRET_KEY, "response": token}
-        response = requests.post(url, data=data).json()
-        print(f"google capcha response : {response}")
-        success = response.get("success", False)
-        score = response.get("score", 0)
-
-        # reCAPTCHA 점수 확인 로그 추가
-        print(f"[reCAPTCHA] Success: {success}, Score: {score}")
-
-        return success, score
+        # 공용 HTTP 클라이언트 사용 (연결 재사용, 타임아웃, 서킷 브레이커)
+        return verify_recaptcha(settings.RECAPTCHA_V3_SECRET_KEY, token)
 
 
 
@@ -7,12 +7,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.conf import settings
-import logging, os, qrcode
+import logging, os
+from qr_codes import ensure_qr_code, qr_basename, qr_content_url, qr_file_urls
 from ..models import Public
 from ..serializers import (PublicRequestServiceSerializer)
-from ..merged_csv import merge_csv_files
-from ..analyze_utterances import get_most_common_utterances
-from ..analyze_utterances import save_most_common_utterances_graph
+from analytics.views import BaseStatisticsView
 
 # 디버깅을 위한 로거 설정
 logger = logging.getLogger('faq')
@@ -38,46 +37,18 @@ class GenerateQrCodeView(APIView):
             #logger.debug(f"Store not found for public_id: {public_id}, user: {request.user.username}")
             return Response({'error': '스토어를 찾을 수 없습니다.'}, status=404)
 
-        qr_url = f'https://mumulai.com/storeIntroduction/{public.slug}'
+        qr_url = qr_content_url(public.slug)
         #logger.debug(f"QR Content URL to encode: {qr_url}")
 
         try:
-            # QR 코드 생성
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=10,
-                border=4
-            )
-            qr.add_data(qr_url)
-            qr.make(fit=True)
-
-            # QR 코드 이미지 저장 경로 설정
-            qr_filename = f'public_qr_{public_id}.png'
-            qr_directory = os.path.join(settings.MEDIA_ROOT, 'qr_codes')
-            qr_path = os.path.join(qr_directory, qr_filename)
-
-            #logger.debug(f"QR code directory path: {qr_directory}")
-            #logger.debug(f"QR code file path: {qr_path}")
-
-            # 디렉토리가 없으면 생성
-            if not os.path.exists(qr_directory):
-                os.makedirs(qr_directory)
-                #logger.debug(f"QR code directory created at: {qr_directory}")
-
-            # QR 코드 이미지 저장
-            img = qr.make_image(fill='black', back_color='white')
-            img.save(qr_path)
-            #logger.debug(f"QR code image saved at: {qr_path}")
-
-            # 데이터베이스에 QR 코드 경로를 저장
-            public.qr_code = f'{settings.MEDIA_URL}qr_codes/{qr_filename}'
-            public.save()
-            #logger.debug(f"Store updated with QR code path: {public.qr_code}")
+            # QR 코드 생성 (인코딩할 URL이 바뀐 경우에만 다시 만들고, 아니면 기존 파일 사용)
+            qr_code, _ = ensure_qr_code(public, 'public', public.public_id, qr_url)
+            qr_files = qr_file_urls(settings.MEDIA_URL, qr_basename('public', public.public_id))
 
             return Response({
                 'message': 'QR 코드가 성공적으로 생성되었습니다.',
-                'qr_code_url': request.build_absolute_uri(public.qr_code),  # 절대 URL 반환
+                'qr_code_url': request.build_absolute_uri(qr_code),  # 절대 URL 반환
+                'qr_code_files': {key: request.build_absolute_uri(url) for key, url in qr_files.items()},  # SVG, 크기별 PNG
                 'qr_content_url': qr_url  # QR 코드에 인코딩된 실제 URL 반환
             }, status=201)
         except Exception as e:
@@ -235,50 +206,7 @@ class RequestServiceView(APIView):
 
 
 # Statistics APIs
-class StatisticsView(APIView):
+class StatisticsView(BaseStatisticsView):
     authentication_classes = [PublicUserJWTAuthentication]
-    permission_classes = [IsAuthenticated]  # 인증된 사용자만 접근 가능
-
-    def post(self, request, *args, **kwargs):
-        try:
-            # 사용자별 CSV 파일 폴더 경로 지정
-            folder_path = f'conversation_history/{request.user.user_id}'
-
-            # 사용자 폴더가 존재하는지 확인
-            if not os.path.exists(folder_path):
-                logger.debug(f"{folder_path} 경로가 존재하지 않습니다.")
-                return Response({"status": "no folder", "message": "사용자 데이터 폴더가 존재하지 않습니다."})
-            
-            # CSV 파일 병합 함수 호출
-            merged_file_path = merge_csv_files(folder_path)
-            
-            # 병합된 파일이 없으면 파일 없음 메시지 반환
-            if not merged_file_path or not os.path.exists(merged_file_path):
-                logger.debug("병합된 파일이 존재하지 않습니다.")
-                return Response({"status": "no file", "message": "해당 파일이 존재하지 않습니다."}, status=status.HTTP_404_NOT_FOUND)
-            
-            # 가장 많이 언급된 user_utterances 가져오기
-            most_common_utterances = get_most_common_utterances(merged_file_path)
-            
-            # 이미지 저장 경로 설정
-            statistics_folder = f'media/statistics/{request.user.user_id}'
-            os.makedirs(statistics_folder, exist_ok=True)  # 폴더 생성
-            output_image_path = os.path.join(statistics_folder, 'most_common_utterances.png')
-            
-            # 그래프 이미지 생성 및 저장
-            save_most_common_utterances_graph(most_common_utterances, output_image_path)
-            
-            # 이미지 URL을 응답에 포함
-            response_data = {
-                "status": "success",
-                "data": most_common_utterances,
-                "image_url": f"/media/statistics/{request.user.user_id}/most_common_utterances.png"
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            # 오류 메시지 로그 출력
-            logger.error(f"오류 발생: {str(e)}")
-            return Response({"status": "error", "message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    tenant = 'public'
 
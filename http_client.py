@@ -0,0 +1,217 @@
+# http_client.py
+# 외부 API 호출용 공용 HTTP 클라이언트 (reCAPTCHA, OAuth, SMS 등)
+#
+# - 대상별로 requests.Session을 하나씩 두고 keep-alive 연결을 재사용한다.
+# - 모든 요청에 연결/읽기 타임아웃을 적용한다. (기본 3초 / 10초)
+# - 연속 실패(연결 오류, 타임아웃, 5xx)가 쌓이면 서킷 브레이커가 열려 일정 시간 동안 바로 실패한다.
+#   외부 장애 중에 워커가 응답을 기다리며 묶이지 않게 하기 위함
+# - base_url을 설정(HTTP_CLIENT_BASE_URLS)으로 바꿀 수 있어 로컬 스텁 서버로 테스트할 수 있다.
+import logging
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('faq')
+
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3))
+DEFAULT_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+DEFAULT_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+DEFAULT_FAILURE_THRESHOLD = int(os.environ.get('HTTP_CIRCUIT_FAILURE_THRESHOLD', 5))
+DEFAULT_RESET_TIMEOUT = float(os.environ.get('HTTP_CIRCUIT_RESET_TIMEOUT', 30))
+
+
+class HttpClientError(Exception):
+    """
+    외부 API 호출 실패 (연결 오류, 타임아웃, 서킷 열림)
+    """
+
+
+class CircuitOpenError(HttpClientError):
+    """
+    서킷 브레이커가 열려 있어 호출하지 않음
+    """
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커.
+
+    - closed: 정상 호출. 연속 실패가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 호출하지 않고 바로 실패
+    - half-open: reset_timeout이 지나면 한 번만 시험 호출. 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """
+        호출해도 되는지 반환하는 함수. half-open에서는 한 요청만 통과시킨다.
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    대상 서비스 하나에 대한 HTTP 클라이언트.
+
+    :param name: 로그/설정에 쓰는 이름 (예: 'recaptcha')
+    :param base_url: 상대 경로 요청에 붙일 주소
+    :param timeout: (연결, 읽기) 타임아웃 초
+    """
+
+    def __init__(self, name, base_url='', timeout=None, pool_size=DEFAULT_POOL_SIZE,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout or (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        # 재시도는 호출하는 쪽에서 결정 (결제처럼 멱등하지 않은 요청이 있으므로 여기서는 하지 않음)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, path):
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        """
+        요청을 보내고 requests.Response를 반환하는 함수.
+        4xx는 그대로 반환하고, 연결 오류/타임아웃/5xx는 실패로 기록한다.
+
+        :raises CircuitOpenError: 서킷이 열려 있는 경우
+        :raises HttpClientError: 연결 오류 또는 타임아웃
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name}: 외부 API 장애로 잠시 호출을 중단했습니다.")
+
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            logger.warning(f"[{self.name}] {method} {path} 실패 ({time.monotonic() - started:.2f}s): {e}")
+            raise HttpClientError(f"{self.name}: {e}") from e
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            logger.warning(f"[{self.name}] {method} {path} → {response.status_code} ({time.monotonic() - started:.2f}s)")
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _configured_base_url(name, default):
+    try:
+        from django.conf import settings
+        return getattr(settings, 'HTTP_CLIENT_BASE_URLS', {}).get(name, default)
+    except Exception:
+        return default
+
+
+def get_http_client(name, base_url='', **options):
+    """
+    이름별 공용 HttpClient를 반환하는 함수. (프로세스당 하나, 스레드 간 공유)
+    settings.HTTP_CLIENT_BASE_URLS = {"recaptcha": "http://127.0.0.1:8001"} 처럼 주소를 바꿀 수 있다.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = HttpClient(name, _configured_base_url(name, base_url), **options)
+                _clients[name] = client
+    return client
+
+
+def reset_http_clients():
+    """
+    공용 클라이언트를 모두 닫고 비우는 함수. (테스트/설정 변경용)
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+# ── 자주 쓰는 외부 API ──────────────────────────────────────────────
+RECAPTCHA_BASE_URL = 'https://www.google.com'
+
+
+def verify_recaptcha(secret, token):
+    """
+    Google reCAPTCHA v3 토큰을 검증하는 함수.
+    외부 API 장애(타임아웃, 서킷 열림) 시에는 기다리지 않고 검증 실패로 처리한다.
+
+    :return: (성공 여부, 점수)
+    """
+    try:
+        response = get_http_client('recaptcha', RECAPTCHA_BASE_URL).post(
+            '/recaptcha/api/siteverify', data={"secret": secret, "response": token}
+        )
+        result = response.json()
+    except (HttpClientError, ValueError) as e:
+        logger.warning(f"[reCAPTCHA] 검증 요청 실패: {e}")
+        return False, 0
+
+    success = result.get("success", False)
+    score = result.get("score", 0)
+    logger.debug(f"[reCAPTCHA] Success: {success}, Score: {score}")
+    return success, score
@@ -0,0 +1,159 @@
+# qr_codes.py
+# 매장(faq) / 공공기관(faq_public) / 기업(faq_corp) 공용 QR 코드 생성
+#
+# - QR 코드는 인코딩할 URL이 바뀔 때(slug 변경)만 다시 만든다. URL 해시는 qr_codes/<이름>.json에 기록한다.
+# - 기존 경로의 PNG(qr_codes/<이름>.png) 외에 SVG와 여러 크기의 PNG(<이름>_<크기>.png)를 함께 만든다.
+# - render_qr_files()는 Django 없이 동작하므로 관리 명령(regenerate_qr_codes)의 프로세스 풀에서 그대로 사용한다.
+import hashlib
+import json
+import logging
+import os
+import uuid
+
+logger = logging.getLogger('faq')
+
+QR_CONTENT_BASE_URL = 'https://mumulai.com'
+QR_DIRECTORY = 'qr_codes'
+QR_PNG_SIZES = (256, 512, 1024)
+
+# 렌더링 설정이 바뀌면 올려서 기존 QR 코드를 모두 다시 만들게 함
+QR_RENDER_VERSION = 1
+
+# 앱별 QR 파일 이름 접두어
+QR_PREFIXES = {
+    'store': 'qr_',
+    'corp': 'corp_qr_',
+    'public': 'public_qr_',
+}
+
+
+def qr_content_url(slug, page='storeIntroduction'):
+    """
+    QR 코드에 인코딩할 소개 페이지 URL을 반환하는 함수.
+    """
+    return f'{QR_CONTENT_BASE_URL}/{page}/{slug}'
+
+
+def qr_basename(kind, object_id):
+    return f'{QR_PREFIXES[kind]}{object_id}'
+
+
+def _content_hash(content_url):
+    return hashlib.sha256(f'{QR_RENDER_VERSION}:{content_url}'.encode('utf-8')).hexdigest()
+
+
+def qr_file_names(basename):
+    """
+    QR_DIRECTORY 기준 파일 이름 목록을 반환하는 함수.
+
+    :return: {"png": ..., "svg": ..., "256": ..., "512": ..., "1024": ...}
+    """
+    names = {'png': f'{basename}.png', 'svg': f'{basename}.svg'}
+    for size in QR_PNG_SIZES:
+        names[str(size)] = f'{basename}_{size}.png'
+    return names
+
+
+def _is_current(directory, basename, content_hash):
+    manifest_path = os.path.join(directory, f'{basename}.json')
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifest.get('hash') != content_hash:
+        return False
+    return all(os.path.exists(os.path.join(directory, name)) for name in qr_file_names(basename).values())
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _save_atomic(directory, name, save):
+    """
+    임시 파일에 저장한 뒤 교체하여, 읽는 쪽이 쓰는 중인 파일을 보지 않도록 하는 함수.
+    """
+    path = os.path.join(directory, name)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def render_qr_files(media_root, basename, content_url, force=False):
+    """
+    QR 코드 파일(PNG, SVG, 크기별 PNG)을 만드는 함수. URL이 바뀌지 않았으면 아무것도 하지 않는다.
+
+    :param media_root: MEDIA_ROOT 경로
+    :param basename: 파일 이름 (확장자 제외, 예: qr_1)
+    :param content_url: QR 코드에 인코딩할 URL
+    :param force: True면 URL이 같아도 다시 만듦
+    :return: (basename, 새로 만들었는지 여부)
+    """
+    import qrcode
+    from qrcode.image.svg import SvgPathImage
+    from PIL import Image
+
+    directory = os.path.join(media_root, QR_DIRECTORY)
+    content_hash = _content_hash(content_url)
+    if not force and _is_current(directory, basename, content_hash):
+        return basename, False
+
+    os.makedirs(directory, exist_ok=True)
+    names = qr_file_names(basename)
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=4
+    )
+    qr.add_data(content_url)
+    qr.make(fit=True)
+
+    # 기존 경로의 PNG (기존과 같은 설정)
+    image = qr.make_image(fill='black', back_color='white').get_image().convert('1')
+    _save_atomic(directory, names['png'], lambda path: image.save(path, format='PNG'))
+
+    # 크기별 PNG: 모듈 경계가 흐려지지 않도록 NEAREST로 크기 조정
+    for size in QR_PNG_SIZES:
+        resized = image.resize((size, size), Image.NEAREST)
+        _save_atomic(directory, names[str(size)], lambda path: resized.save(path, format='PNG'))
+
+    svg = qr.make_image(image_factory=SvgPathImage)
+    _save_atomic(directory, names['svg'], lambda path: svg.save(path))
+
+    # 해시 기록은 마지막에 (중간에 실패하면 다음 호출에서 다시 만듦)
+    manifest = {'hash': content_hash, 'url': content_url, 'files': names}
+    _save_atomic(directory, f'{basename}.json', lambda path: _write_json(path, manifest))
+    return basename, True
+
+
+def qr_file_urls(media_url, basename):
+    """
+    QR 코드 파일 URL 목록을 반환하는 함수.
+
+    :return: {"png": ..., "svg": ..., "256": ..., ...}
+    """
+    return {key: f'{media_url}{QR_DIRECTORY}/{name}' for key, name in qr_file_names(basename).items()}
+
+
+def ensure_qr_code(instance, kind, object_id, content_url, force=False):
+    """
+    QR 코드를 (필요할 때만) 만들고 instance.qr_code 경로를 맞추는 함수.
+
+    :param instance: qr_code 필드가 있는 Store / Corp / Public
+    :return: (qr_code 경로, 새로 만들었는지 여부)
+    """
+    from django.conf import settings
+
+    basename = qr_basename(kind, object_id)
+    _, rendered = render_qr_files(settings.MEDIA_ROOT, basename, content_url, force=force)
+
+    qr_code = f'{settings.MEDIA_URL}{QR_DIRECTORY}/{basename}.png'
+    if instance.qr_code != qr_code:
+        instance.qr_code = qr_code
+        # update_fields에 넣지 않으면 auto_now가 적용되지 않아 응답 캐시(ETag) 버전이 바뀌지 않음
+        instance.save(update_fields=['qr_code', 'updated_at'])
+    return qr_code, rendered
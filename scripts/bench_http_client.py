@@ -0,0 +1,83 @@
+# bench_http_client.py
+# 공용 HTTP 클라이언트(http_client)를 로컬 스텁 서버로 확인 (연결 재사용, 타임아웃, 서킷 브레이커)
+# 실행: python scripts/bench_http_client.py [요청 수]
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 현재 스크립트의 디렉토리 기준으로 Django 프로젝트 루트 경로 설정
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+from http_client import CircuitOpenError, HttpClient, HttpClientError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /ok: 즉시 200, /slow: 읽기 타임아웃보다 늦게 응답, /error: 500
+    """
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    connections = set()
+
+    def do_POST(self):
+        StubHandler.connections.add(self.client_address)
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+
+        if self.path == '/slow':
+            time.sleep(2)
+        status = 500 if self.path == '/error' else 200
+        body = b'{"success": true, "score": 0.9}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main(request_count):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    client = HttpClient('stub', base_url, timeout=(1, 0.5), failure_threshold=3, reset_timeout=1)
+
+    # 1) 연결 재사용: 요청 수와 관계없이 연결은 1개
+    started = time.perf_counter()
+    for _ in range(request_count):
+        client.post('/ok', data={'response': 'token'}).json()
+    elapsed = time.perf_counter() - started
+    print(f"/ok {request_count}회: {elapsed:.3f}s, 사용한 연결 수 {len(StubHandler.connections)}")
+
+    # 2) 타임아웃: 느린 응답은 읽기 타임아웃(0.5초) 후 실패
+    started = time.perf_counter()
+    try:
+        client.post('/slow')
+    except HttpClientError as e:
+        print(f"/slow: {time.perf_counter() - started:.2f}s 후 실패 ({type(e).__name__})")
+
+    # 3) 서킷 브레이커: 연속 실패 후에는 호출하지 않고 바로 실패
+    for _ in range(3):
+        client.post('/error')
+    started = time.perf_counter()
+    try:
+        client.post('/ok')
+    except CircuitOpenError:
+        print(f"서킷 열림: {(time.perf_counter() - started) * 1000:.2f}ms 만에 실패")
+
+    # reset_timeout 후 시험 호출 성공 → 닫힘
+    time.sleep(1.1)
+    client.post('/ok')
+    print(f"reset_timeout 이후 상태: {client.breaker.state}")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,65 @@
+# bench_payment_gateway.py
+# 가짜 게이트웨이 서버(faq.gateways.fake)로 결제 게이트웨이 클라이언트 부하 테스트 (외부 네트워크 없이 실행)
+# 실행: python scripts/bench_payment_gateway.py [--requests 2000] [--concurrency 16] [--latency-ms 20] [--failure-rate 0.02]
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 현재 스크립트의 디렉토리 기준으로 Django 프로젝트 루트 경로 설정
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+from faq.gateways.fake import FakeGatewayServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--failure-rate', type=float, default=0.02)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    with FakeGatewayServer(latency=(latency / 2, latency), failure_rate=args.failure_rate) as fake:
+        from django.conf import settings
+        settings.configure(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            HTTP_CLIENT_BASE_URLS={'portone': fake.base_url, 'kcp': fake.base_url},
+            PORTONE_IMP_KEY='fake', PORTONE_IMP_SECRET='fake',
+            KCP_SITE_CD='fake', KCP_TEST_SITE_CD='fake',
+        )
+
+        from faq.gateways import GatewayError, gateway_metrics, get_kcp_gateway, get_portone_gateway
+        portone = get_portone_gateway()
+        kcp = get_kcp_gateway()
+
+        def payment_flow(i):
+            # 결제 조회(멱등, 재시도) → 카드 조회(멱등) → 정기 결제 예약(재시도 없음) → KCP 결제(재시도 없음)
+            try:
+                portone.get_payment(f'imp_{i}')
+                portone.get_billing_customer(f'customer_{i % 100}')
+                portone.schedule_payments(f'customer_{i % 100}', [
+                    {'merchant_uid': f'bench_{i}', 'schedule_at': int(time.time()) + 86400, 'amount': 9900, 'name': 'bench'},
+                ])
+                kcp.pay(f'order_{i}', f'batch_{i % 100}', 9900)
+                return True
+            except GatewayError:
+                return False
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(payment_flow, range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    print(f"결제 흐름 {args.requests}회 / 동시 {args.concurrency}: {elapsed:.2f}s "
+          f"({args.requests / elapsed:.0f} flow/s), 실패 {results.count(False)}회")
+    print(f"토큰 발급 요청: {fake.counts['POST /users/getToken']}회")
+    print(json.dumps(gateway_metrics.snapshot(), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# bench_question_rows.py
+# webhook_questionlog 질문을 병합 데이터에 추가하는 방식 비교 (행 단위 pd.concat vs 일괄 생성)
+# 실행: python scripts/bench_question_rows.py [질문 개수]
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+
+# 현재 스크립트의 디렉토리 기준으로 Django 프로젝트 루트 경로 설정
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+from analytics.question_log import extract_questions, question_rows_from_logs
+
+AGENT_ID = 'bench-agent'
+
+
+def create_question_db(db_path, question_count):
+    questions = [{"question": f"영업시간이 어떻게 되나요? {i}"} for i in range(question_count)]
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE webhook_questionlog (id INTEGER PRIMARY KEY, agent_id TEXT, questions TEXT)")
+        conn.execute(
+            "INSERT INTO webhook_questionlog (agent_id, questions) VALUES (?, ?)",
+            (AGENT_ID, json.dumps(questions, ensure_ascii=False)),
+        )
+
+
+def legacy_append(merged_df, db_path):
+    # 기존 merge_csv_files의 행 단위 추가 방식
+    with sqlite3.connect(db_path) as conn:
+        query = "SELECT questions FROM webhook_questionlog WHERE agent_id = ?"
+        webhook_data = pd.read_sql(query, conn, params=(AGENT_ID,))
+
+    questions = extract_questions(webhook_data['questions'].iloc[0])
+    for question in questions:
+        new_row = {'agent_id': AGENT_ID, 'user_utterances': question}
+        merged_df = pd.concat([merged_df, pd.DataFrame([new_row])], ignore_index=True)
+    return merged_df
+
+
+def bulk_append(merged_df, db_path):
+    # analytics.question_log.fetch_questions와 같은 조회 결과({agent_id: questions JSON})를 만든 뒤 일괄 생성
+    with sqlite3.connect(db_path) as conn:
+        query = "SELECT questions FROM webhook_questionlog WHERE agent_id = ? LIMIT 1"
+        questions_by_agent = {AGENT_ID: conn.execute(query, (AGENT_ID,)).fetchone()[0]}
+
+    question_rows = question_rows_from_logs(questions_by_agent)
+    return pd.concat([merged_df, question_rows], ignore_index=True)
+
+
+def measure(func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started_at, result
+
+
+if __name__ == "__main__":
+    question_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.sqlite3')
+        create_question_db(db_path, question_count)
+        merged_df = pd.DataFrame({'agent_id': [AGENT_ID] * 100, 'user_utterances': ['메뉴 추천해주세요'] * 100})
+
+        legacy_seconds, legacy_df = measure(legacy_append, merged_df, db_path)
+        bulk_seconds, bulk_df = measure(bulk_append, merged_df, db_path)
+
+    assert len(legacy_df) == len(bulk_df) == len(merged_df) + question_count
+    print(f"질문 {question_count}개 추가")
+    print(f"- 행 단위 pd.concat: {legacy_seconds:.3f}s")
+    print(f"- 일괄 생성 후 1회 병합: {bulk_seconds:.3f}s")
+    print(f"- 속도 향상: {legacy_seconds / bulk_seconds:.1f}배")
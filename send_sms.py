@@ -1,6 +1,6 @@
-import requests
 import logging
 from django.conf import settings
+from http_client import get_http_client
 
 logger = logging.getLogger('faq')
 
@@ -22,7 +22,7 @@ def send_aligo_sms(receiver, message):
     }
 
     try:
-        response = requests.post('https://apis.aligo.in/send/', data=data)
+        response = get_http_client('aligo', 'https://apis.aligo.in').post('/send/', data=data)
         response_data = response.json()
         if response_data.get('result_code') == "1":  # 성공 코드
             logger.info(f"SMS 발송 성공: {response_data}")